@@ -0,0 +1,65 @@
+"""hot path indexes
+
+Secondary indexes for the lookups and sorts issued by the service layer.
+Active room assignments use partial indexes (check_out IS NULL).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:33:03.786152
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_attendance_course_date', 'attendance', ['course_id', 'date'], unique=False)
+    op.create_index('ix_chat_messages_room_sent', 'chat_messages', ['room_id', 'sent_at'], unique=False)
+    op.create_index('ix_chat_room_members_user_room', 'chat_room_members', ['user_id', 'room_id'], unique=False)
+    op.create_index('ix_courses_department', 'courses', ['department'], unique=False)
+    op.create_index('ix_courses_faculty_id', 'courses', ['faculty_id'], unique=False)
+    op.create_index('ix_enrollments_course_student', 'enrollments', ['course_id', 'student_id'], unique=False)
+    op.create_index('ix_enrollments_student_course', 'enrollments', ['student_id', 'course_id'], unique=False)
+    op.create_index('ix_leaves_applicant_created', 'leaves', ['applicant_id', 'created_at'], unique=False)
+    op.create_index('ix_leaves_created_at', 'leaves', ['created_at'], unique=False)
+    op.create_index('ix_maintenance_requests_created_at', 'maintenance_requests', ['created_at'], unique=False)
+    op.create_index('ix_maintenance_requests_room_created', 'maintenance_requests', ['room_id', 'created_at'], unique=False)
+    op.create_index('ix_results_student_year', 'results', ['student_id', 'year'], unique=False)
+    op.create_index('ix_room_assignments_active_room', 'room_assignments', ['room_id'], unique=False, postgresql_where=sa.text('check_out IS NULL'), sqlite_where=sa.text('check_out IS NULL'))
+    op.create_index('ix_room_assignments_active_student', 'room_assignments', ['student_id'], unique=False, postgresql_where=sa.text('check_out IS NULL'), sqlite_where=sa.text('check_out IS NULL'))
+    op.create_index('ix_rooms_building', 'rooms', ['building'], unique=False)
+    op.create_index('ix_rooms_status', 'rooms', ['status'], unique=False)
+    op.create_index('ix_timetable_slots_course_day_start', 'timetable_slots', ['course_id', 'day', 'start_time'], unique=False)
+    op.create_index('ix_users_created_at', 'users', ['created_at'], unique=False)
+    op.create_index('ix_users_role_created', 'users', ['role', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_role_created', table_name='users')
+    op.drop_index('ix_users_created_at', table_name='users')
+    op.drop_index('ix_timetable_slots_course_day_start', table_name='timetable_slots')
+    op.drop_index('ix_rooms_status', table_name='rooms')
+    op.drop_index('ix_rooms_building', table_name='rooms')
+    op.drop_index('ix_room_assignments_active_student', table_name='room_assignments', postgresql_where=sa.text('check_out IS NULL'), sqlite_where=sa.text('check_out IS NULL'))
+    op.drop_index('ix_room_assignments_active_room', table_name='room_assignments', postgresql_where=sa.text('check_out IS NULL'), sqlite_where=sa.text('check_out IS NULL'))
+    op.drop_index('ix_results_student_year', table_name='results')
+    op.drop_index('ix_maintenance_requests_room_created', table_name='maintenance_requests')
+    op.drop_index('ix_maintenance_requests_created_at', table_name='maintenance_requests')
+    op.drop_index('ix_leaves_created_at', table_name='leaves')
+    op.drop_index('ix_leaves_applicant_created', table_name='leaves')
+    op.drop_index('ix_enrollments_student_course', table_name='enrollments')
+    op.drop_index('ix_enrollments_course_student', table_name='enrollments')
+    op.drop_index('ix_courses_faculty_id', table_name='courses')
+    op.drop_index('ix_courses_department', table_name='courses')
+    op.drop_index('ix_chat_room_members_user_room', table_name='chat_room_members')
+    op.drop_index('ix_chat_messages_room_sent', table_name='chat_messages')
+    op.drop_index('ix_attendance_course_date', table_name='attendance')
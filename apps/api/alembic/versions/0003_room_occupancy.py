@@ -0,0 +1,61 @@
+"""room occupancy
+
+Rooms count their active assignments in `occupied`, kept between 0 and
+capacity by a check constraint, and their status is recomputed from it
+(rooms under maintenance keep that status). A student can hold only one
+active assignment.
+
+Rooms double-booked before this revision fail the check constraint, and
+students with two active assignments fail the unique index: check the extra
+assignments out first.
+
+STARTUP_SCHEMA_MODE=create cannot add the column to an existing rooms table;
+databases it created without alembic_version (an old ums_dev.db, say) get
+here with `alembic stamp 0001 && alembic upgrade head`.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 12:05:41.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = sa.text('check_out IS NULL')
+
+
+def upgrade() -> None:
+    op.add_column('rooms', sa.Column('occupied', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        "UPDATE rooms SET occupied = (SELECT count(*) FROM room_assignments "
+        "WHERE room_assignments.room_id = rooms.id AND room_assignments.check_out IS NULL)"
+    )
+    op.execute(
+        "UPDATE rooms SET status = CASE WHEN occupied >= capacity THEN 'OCCUPIED' ELSE 'AVAILABLE' END "
+        "WHERE status <> 'MAINTENANCE'"
+    )
+    with op.batch_alter_table('rooms') as batch_op:
+        batch_op.create_check_constraint('ck_rooms_occupancy', 'occupied >= 0 AND occupied <= capacity')
+    op.drop_index('ix_room_assignments_active_student', table_name='room_assignments',
+                  postgresql_where=ACTIVE, sqlite_where=ACTIVE)
+    op.create_index('ix_room_assignments_active_student', 'room_assignments', ['student_id'], unique=True,
+                    postgresql_where=ACTIVE, sqlite_where=ACTIVE)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_room_assignments_active_student', table_name='room_assignments',
+                  postgresql_where=ACTIVE, sqlite_where=ACTIVE)
+    op.create_index('ix_room_assignments_active_student', 'room_assignments', ['student_id'], unique=False,
+                    postgresql_where=ACTIVE, sqlite_where=ACTIVE)
+    with op.batch_alter_table('rooms') as batch_op:
+        batch_op.drop_constraint('ck_rooms_occupancy', type_='check')
+        batch_op.drop_column('occupied')
@@ -0,0 +1,60 @@
+"""room amenities
+
+One row per room and amenity in room_amenities, keyed the way filters match
+them (trimmed, single-spaced, case-folded), backfilled from the JSON list in
+rooms.amenities; values that are not a JSON list of names add no rows. Adds
+the (room_type, capacity) index used by the room search.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 15:12:27.604118
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _keys(amenities):
+    try:
+        names = json.loads(amenities) if amenities else []
+    except ValueError:
+        return set()
+    if not isinstance(names, list):
+        return set()
+    return {" ".join(name.split()).casefold()[:50] for name in names if isinstance(name, str)} - {""}
+
+
+def upgrade() -> None:
+    room_amenities = op.create_table(
+        'room_amenities',
+        sa.Column('room_id', sa.Integer(), nullable=False),
+        sa.Column('amenity', sa.String(length=50), nullable=False),
+        sa.ForeignKeyConstraint(['room_id'], ['rooms.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('room_id', 'amenity'),
+    )
+    op.create_index('ix_room_amenities_amenity_room', 'room_amenities', ['amenity', 'room_id'], unique=False)
+    op.create_index('ix_rooms_type_capacity', 'rooms', ['room_type', 'capacity'], unique=False)
+
+    rows = [
+        {'room_id': room_id, 'amenity': key}
+        for room_id, amenities in op.get_bind().execute(sa.text('SELECT id, amenities FROM rooms'))
+        for key in _keys(amenities)
+    ]
+    if rows:
+        op.bulk_insert(room_amenities, rows)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_rooms_type_capacity', table_name='rooms')
+    op.drop_index('ix_room_amenities_amenity_room', table_name='room_amenities')
+    op.drop_table('room_amenities')
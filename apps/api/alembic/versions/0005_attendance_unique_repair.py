@@ -0,0 +1,44 @@
+"""attendance uniqueness for pre-migration databases
+
+Databases created by create_all before revision 0001 existed (such as an old
+ums_dev.db) are brought under migrations with `alembic stamp 0001`, but their
+attendance table predates uq_attendance_student_course_date, which 0001
+creates and the attendance upsert relies on. Where it is missing, duplicate
+marks for a student, course and date are reduced to the latest one and the
+constraint is added. Databases built by 0001 already have it: nothing to do.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 16:40:12.903551
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ['student_id', 'course_id', 'date']
+
+
+def upgrade() -> None:
+    unique = sa.inspect(op.get_bind()).get_unique_constraints('attendance')
+    if any(sorted(constraint['column_names']) == sorted(COLUMNS) for constraint in unique):
+        return
+    op.execute(
+        'DELETE FROM attendance WHERE id NOT IN '
+        '(SELECT max_id FROM (SELECT MAX(id) AS max_id FROM attendance GROUP BY student_id, course_id, date) AS latest)'
+    )
+    with op.batch_alter_table('attendance') as batch_op:
+        batch_op.create_unique_constraint('uq_attendance_student_course_date', COLUMNS)
+
+
+def downgrade() -> None:
+    # The constraint belongs to 0001; removing it would break databases built from there.
+    pass
@@ -0,0 +1,322 @@
+"""
+Timetable clash engine.
+
+Two slots of the same semester clash when they fall on the same day with
+overlapping times (half-open, so 09:00-10:00 and 10:00-11:00 do not) and share
+  room      the same room (compared case-insensitively)
+  faculty   the same teaching faculty member
+  students  at least one enrolled student (the courses' cohorts intersect)
+
+Every room, faculty member and course gets an IntervalIndex per (semester, day):
+its slots sorted by start with a running maximum of end times, so "what
+overlaps [start, end)?" is a binary search plus a walk over the hits. Student
+clashes are looked up in the course indexes of the course's peers, the courses
+sharing at least one student with it.
+
+Each worker keeps one engine (clash_engines). It is rebuilt when another worker
+has changed timetable slots or enrollments, and updated in place by this
+worker's own commits. The check is advisory: two concurrent creates can both
+pass it.
+"""
+import asyncio
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import time
+from typing import Callable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.academics.models import Course, DayOfWeek, Enrollment, Semester, TimetableSlot
+from app.academics.schemas import ClashKind
+from app.core.cache import TableVersion, table_versions
+
+
+def _seconds(value: time) -> int:
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+def _time(seconds: int) -> time:
+    return time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+# ─── Slots & Clashes ──────────────────────────────────────
+@dataclass(frozen=True, slots=True)
+class Slot:
+    """A timetable slot as the engine sees it: saved (id) or an uploaded row (row)."""
+    course_id: int
+    day: DayOfWeek
+    start: int  # seconds since midnight
+    end: int
+    room: str
+    id: int | None = None
+    row: int | None = None
+
+    @classmethod
+    def of(cls, slot, row: int | None = None) -> "Slot":
+        """From a TimetableSlot (or row of its columns) or a TimetableSlotCreate."""
+        return cls(slot.course_id, slot.day, _seconds(slot.start_time), _seconds(slot.end_time), slot.room,
+                   getattr(slot, "id", None), row)
+
+    @property
+    def room_key(self) -> str:
+        return self.room.strip().casefold()
+
+    @property
+    def start_time(self) -> time:
+        return _time(self.start)
+
+    @property
+    def end_time(self) -> time:
+        return _time(self.end)
+
+
+@dataclass(frozen=True, slots=True)
+class Clash:
+    """`slot` clashes with the slot being checked; read as a TimetableClash."""
+    kind: ClashKind
+    slot: Slot
+    shared_students: int | None = None
+
+    @property
+    def slot_id(self) -> int | None:
+        return self.slot.id
+
+    @property
+    def row(self) -> int | None:
+        return self.slot.row
+
+    @property
+    def course_id(self) -> int:
+        return self.slot.course_id
+
+    @property
+    def day(self) -> DayOfWeek:
+        return self.slot.day
+
+    @property
+    def start_time(self) -> time:
+        return self.slot.start_time
+
+    @property
+    def end_time(self) -> time:
+        return self.slot.end_time
+
+    @property
+    def room(self) -> str:
+        return self.slot.room
+
+    def describe(self) -> str:
+        when = f"{self.slot.day.value} {self.slot.start_time:%H:%M}-{self.slot.end_time:%H:%M}"
+        other = f"slot {self.slot.id}" if self.slot.id is not None else f"row {self.slot.row}"
+        if self.kind == ClashKind.ROOM:
+            return f"room {self.slot.room} is taken by course {self.slot.course_id} ({other}, {when})"
+        if self.kind == ClashKind.FACULTY:
+            return f"the faculty member teaches course {self.slot.course_id} ({other}, {when})"
+        return f"{self.shared_students} enrolled students have course {self.slot.course_id} ({other}, {when})"
+
+
+# ─── Interval Index ───────────────────────────────────────
+class IntervalIndex:
+    """Slots of one resource on one day, sorted by start, with prefix maxima of their ends."""
+
+    __slots__ = ("starts", "slots", "max_end")
+
+    def __init__(self):
+        self.starts: list[int] = []
+        self.slots: list[Slot] = []
+        self.max_end: list[int] = []  # max_end[i] = max(end of slots[0..i])
+
+    def add(self, slot: Slot) -> None:
+        pos = bisect_right(self.starts, slot.start)
+        self.starts.insert(pos, slot.start)
+        self.slots.insert(pos, slot)
+        running = max(slot.end, self.max_end[pos - 1] if pos else 0)
+        self.max_end.insert(pos, running)
+        for i in range(pos + 1, len(self.max_end)):
+            if self.max_end[i] >= running:
+                break  # prefix maxima only grow: the rest already cover it
+            self.max_end[i] = running
+
+    def overlapping(self, start: int, end: int) -> list[Slot]:
+        """Slots overlapping [start, end): O(log n) plus the slots walked over."""
+        i = bisect_left(self.starts, end)  # slots[:i] start before `end`
+        found = []
+        while i > 0 and self.max_end[i - 1] > start:
+            i -= 1
+            if self.slots[i].end > start:
+                found.append(self.slots[i])
+        return found
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+
+# ─── Cohorts ──────────────────────────────────────────────
+class Cohorts:
+    """Per-course facts the engine needs: faculty, semester and enrolled students."""
+
+    def __init__(self):
+        self.courses: dict[int, tuple[int, Semester]] = {}  # course -> (faculty, semester)
+        self.students: dict[int, set[int]] = defaultdict(set)  # course -> students
+        self.courses_of: dict[int, list[int]] = defaultdict(list)  # student -> courses
+        self._peers: dict[int, set[int]] = {}
+
+    def add_course(self, course_id: int, faculty_id: int, semester: Semester) -> None:
+        self.courses[course_id] = (faculty_id, semester)
+
+    def enroll(self, student_id: int, course_id: int) -> None:
+        cohort = self.students[course_id]
+        if student_id in cohort:
+            return
+        cohort.add(student_id)
+        for other in self.courses_of[student_id]:
+            if course_id in self._peers:
+                self._peers[course_id].add(other)
+            if other in self._peers:
+                self._peers[other].add(course_id)
+        self.courses_of[student_id].append(course_id)
+
+    def peers(self, course_id: int) -> set[int]:
+        """Courses sharing at least one student with `course_id`; computed once, then maintained."""
+        peers = self._peers.get(course_id)
+        if peers is None:
+            peers = set()
+            for student_id in self.students.get(course_id, ()):
+                peers.update(self.courses_of[student_id])
+            peers.discard(course_id)
+            self._peers[course_id] = peers
+        return peers
+
+
+# ─── Engine ───────────────────────────────────────────────
+class ClashEngine:
+    """Interval indexes per room, faculty member and course over one set of slots."""
+
+    def __init__(self, cohorts: Cohorts):
+        self.cohorts = cohorts
+        self.rooms: dict[tuple, IntervalIndex] = defaultdict(IntervalIndex)
+        self.faculty: dict[tuple, IntervalIndex] = defaultdict(IntervalIndex)
+        self.courses: dict[tuple, IntervalIndex] = defaultdict(IntervalIndex)
+        self.slot_ids: set[int] = set()
+
+    def add(self, slot: Slot) -> None:
+        if slot.id is not None:
+            if slot.id in self.slot_ids:
+                return
+            self.slot_ids.add(slot.id)
+        faculty_id, semester = self.cohorts.courses[slot.course_id]
+        self.rooms[semester, slot.room_key, slot.day].add(slot)
+        self.faculty[semester, faculty_id, slot.day].add(slot)
+        self.courses[slot.course_id, slot.day].add(slot)
+
+    @staticmethod
+    def _overlapping(indexes: dict[tuple, IntervalIndex], key: tuple, slot: Slot) -> list[Slot]:
+        index = indexes.get(key)
+        return index.overlapping(slot.start, slot.end) if index is not None else []
+
+    def conflicts(self, slot: Slot) -> list[Clash]:
+        """Every indexed slot `slot` clashes with. Its course must be in the cohorts."""
+        faculty_id, semester = self.cohorts.courses[slot.course_id]
+        clashes = [
+            Clash(ClashKind.ROOM, other)
+            for other in self._overlapping(self.rooms, (semester, slot.room_key, slot.day), slot)
+        ]
+        clashes += [
+            Clash(ClashKind.FACULTY, other)
+            for other in self._overlapping(self.faculty, (semester, faculty_id, slot.day), slot)
+        ]
+        cohort = self.cohorts.students.get(slot.course_id)
+        if cohort:
+            for peer in self.cohorts.peers(slot.course_id):
+                if self.cohorts.courses[peer][1] != semester:
+                    continue
+                others = self._overlapping(self.courses, (peer, slot.day), slot)
+                if others:
+                    shared = len(cohort & self.cohorts.students[peer])
+                    clashes += [Clash(ClashKind.STUDENTS, other, shared) for other in others]
+        return clashes
+
+    def validate(self, slots: list[Slot]) -> list[list[Clash]]:
+        """
+        Batch mode, one pass: each slot's clashes with the indexed slots and with
+        the slots before it in `slots`. Nothing is added to this engine.
+        """
+        uploaded = ClashEngine(self.cohorts)
+        report = []
+        for slot in slots:
+            report.append(self.conflicts(slot) + uploaded.conflicts(slot))
+            uploaded.add(slot)
+        return report
+
+    @classmethod
+    async def load(cls, db: AsyncSession) -> "ClashEngine":
+        cohorts = Cohorts()
+        for course_id, faculty_id, semester in await db.execute(
+            select(Course.id, Course.faculty_id, Course.semester)
+        ):
+            cohorts.add_course(course_id, faculty_id, semester)
+        for student_id, course_id in await db.execute(select(Enrollment.student_id, Enrollment.course_id)):
+            cohorts.enroll(student_id, course_id)
+        engine = cls(cohorts)
+        # In start order every insert appends to its indexes.
+        for row in await db.execute(
+            select(TimetableSlot.id, TimetableSlot.course_id, TimetableSlot.day, TimetableSlot.start_time,
+                   TimetableSlot.end_time, TimetableSlot.room).order_by(TimetableSlot.start_time)
+        ):
+            engine.add(Slot.of(row))
+        return engine
+
+
+class ClashEngines:
+    """
+    This worker's engine, kept in step with the timetable_slots and enrollments
+    versions: rebuilt when they moved on elsewhere, patched by apply() when
+    this worker's own commit is the only change.
+    """
+
+    TABLES = (TimetableSlot.__tablename__, Enrollment.__tablename__)
+
+    def __init__(self):
+        self._engine: ClashEngine | None = None
+        self._tokens: list[str] | None = None
+        self._lock = asyncio.Lock()
+        self.builds = 0
+
+    async def get(self, db: AsyncSession) -> ClashEngine:
+        async with self._lock:
+            versions = await table_versions.get(self.TABLES)
+            tokens = [version.token for version in versions] if versions is not None else None
+            if self._engine is None or tokens is None or tokens != self._tokens:
+                # Read the versions first: the rows loaded are at least that new.
+                self._engine, self._tokens = await ClashEngine.load(db), tokens
+                self.builds += 1
+            return self._engine
+
+    def apply(self, table: str, versions: list[TableVersion] | None,
+              change: Callable[[ClashEngine], None]) -> None:
+        """After this worker committed to `table` and bumped it to `versions`."""
+        if self._engine is None:
+            return
+        i = self.TABLES.index(table)
+        if versions is None or self._tokens is None or not versions[0].follows(self._tokens[i]):
+            self._engine = None  # changed elsewhere as well: rebuild on next use
+            return
+        change(self._engine)
+        self._tokens[i] = versions[0].token
+
+    def invalidate(self) -> None:
+        """After a bulk change apply() cannot express: rebuild on next use."""
+        self._engine = None
+
+    def stats(self) -> dict:
+        engine = self._engine
+        return {
+            "builds": self.builds,
+            "slots": sum(map(len, engine.courses.values())) if engine else 0,
+            "courses": len(engine.cohorts.courses) if engine else 0,
+        }
+
+
+clash_engines = ClashEngines()
@@ -6,7 +6,7 @@ from datetime import date, datetime, time, timezone
 
 from sqlalchemy import (
     Boolean, Date, DateTime, Enum, Float, ForeignKey,
-    Integer, String, Text, Time,
+    Index, Integer, String, Text, Time, UniqueConstraint,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -38,6 +38,10 @@ class DayOfWeek(str, enum.Enum):
 # ─── Course ────────────────────────────────────────────────
 class Course(Base):
     __tablename__ = "courses"
+    __table_args__ = (
+        Index("ix_courses_department", "department"),
+        Index("ix_courses_faculty_id", "faculty_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     code: Mapped[str] = mapped_column(String(20), unique=True, nullable=False)
@@ -56,6 +60,10 @@ class Course(Base):
 # ─── Enrollment ────────────────────────────────────────────
 class Enrollment(Base):
     __tablename__ = "enrollments"
+    __table_args__ = (
+        Index("ix_enrollments_student_course", "student_id", "course_id"),
+        Index("ix_enrollments_course_student", "course_id", "student_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     student_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
@@ -70,6 +78,11 @@ class Enrollment(Base):
 # ─── Attendance ────────────────────────────────────────────
 class Attendance(Base):
     __tablename__ = "attendance"
+    __table_args__ = (
+        # Also serves (student_id, course_id) lookups through its leading columns.
+        UniqueConstraint("student_id", "course_id", "date", name="uq_attendance_student_course_date"),
+        Index("ix_attendance_course_date", "course_id", "date"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     student_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
@@ -82,6 +95,9 @@ class Attendance(Base):
 # ─── Result ────────────────────────────────────────────────
 class Result(Base):
     __tablename__ = "results"
+    __table_args__ = (
+        Index("ix_results_student_year", "student_id", "year"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     student_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
@@ -98,6 +114,9 @@ class Result(Base):
 # ─── Timetable ─────────────────────────────────────────────
 class TimetableSlot(Base):
     __tablename__ = "timetable_slots"
+    __table_args__ = (
+        Index("ix_timetable_slots_course_day_start", "course_id", "day", "start_time"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     course_id: Mapped[int] = mapped_column(Integer, ForeignKey("courses.id"), nullable=False)
@@ -5,18 +5,34 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.academics import service
+from app.academics.models import Course, Enrollment, TimetableSlot
 from app.academics.schemas import (
     AttendanceBulkCreate, AttendanceCreate, AttendanceResponse, AttendanceSummary,
     CourseCreate, CourseListResponse, CourseResponse,
-    ResultCreate, ResultResponse,
-    TimetableSlotCreate, TimetableSlotResponse,
+    ResultCreate, ResultResponse, StudentAttendanceSummary,
+    TimetableGenerateRequest, TimetableJobResponse, TimetableSlotCreate, TimetableSlotResponse,
+    TimetableUpload, TimetableValidation,
 )
+from app.core.config import get_settings
 from app.core.database import get_db
-from app.core.deps import CurrentUser, require_role
+from app.core.deps import CurrentUser, get_read_db, require_role
+from app.core.http_cache import conditional_get
+from app.core.response_cache import response_cache
+from app.core.serialization import json_response, row_body, rows_body, rows_response
 from app.users.models import UserRole
 
+settings = get_settings()
 router = APIRouter(prefix="/academics", tags=["Academics"])
 
+# The catalog changes a few times a semester: browsers may reuse it briefly.
+course_validators = conditional_get(
+    Course.__tablename__, cache_control=f"private, max-age={settings.CATALOG_MAX_AGE_SECONDS}",
+)
+# A new enrollment must show up at once: always revalidate.
+timetable_validators = conditional_get(
+    TimetableSlot.__tablename__, Enrollment.__tablename__, cache_control="private, no-cache", per_user=True,
+)
+
 
 # ─── Courses ───────────────────────────────────────────────
 @router.post("/courses", response_model=CourseResponse, status_code=201)
@@ -34,19 +50,35 @@ async def list_courses(
     department: str | None = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    cursor: str | None = None,
+    include_total: bool = True,
+    validators: dict[str, str] = Depends(course_validators),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    courses, total = await service.list_courses(db, department, skip, limit)
-    return CourseListResponse(courses=courses, total=total)
+    async def page() -> bytes:
+        courses, total, next_cursor = await service.list_courses(
+            db, department, skip, limit, cursor=cursor, include_total=include_total
+        )
+        return rows_body(CourseResponse, courses, key="courses", extra={"total": total, "next_cursor": next_cursor})
+
+    body = await response_cache.get_or_compute(
+        "courses", (Course.__tablename__,), (department, skip, limit, cursor, include_total), page,
+    )
+    return json_response(body, headers=validators)
 
 
 @router.get("/courses/{course_id}", response_model=CourseResponse)
 async def get_course(
     course_id: int,
     _user: CurrentUser,
-    db: AsyncSession = Depends(get_db),
+    validators: dict[str, str] = Depends(course_validators),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    return await service.get_course(db, course_id)
+    async def course() -> bytes:
+        return row_body(CourseResponse, await service.get_course(db, course_id))
+
+    body = await response_cache.get_or_compute("course", (Course.__tablename__,), (course_id,), course)
+    return json_response(body, headers=validators)
 
 
 # ─── Enrollment ───────────────────────────────────────────
@@ -63,9 +95,9 @@ async def enroll_in_course(
 @router.get("/my-courses", response_model=list[CourseResponse])
 async def get_my_courses(
     current_user: CurrentUser,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    return await service.get_student_courses(db, current_user.id)
+    return rows_response(CourseResponse, await service.get_student_courses(db, current_user.id))
 
 
 # ─── Attendance ────────────────────────────────────────────
@@ -86,17 +118,28 @@ async def bulk_mark_attendance(
     db: AsyncSession = Depends(get_db),
     _faculty: None = Depends(require_role(UserRole.FACULTY, UserRole.ADMIN)),
 ):
-    return await service.bulk_mark_attendance(db, data, current_user.id)
+    records = await service.bulk_mark_attendance(db, data, current_user.id)
+    return rows_response(AttendanceResponse, records, status_code=201)
 
 
 @router.get("/attendance/summary", response_model=list[AttendanceSummary])
 async def get_my_attendance(
     current_user: CurrentUser,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     return await service.get_attendance_summary(db, current_user.id)
 
 
+@router.get("/courses/{course_id}/attendance/summary", response_model=list[StudentAttendanceSummary])
+async def get_course_attendance(
+    course_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    _faculty: None = Depends(require_role(UserRole.FACULTY, UserRole.ADMIN)),
+):
+    """Faculty/admin: attendance summary for every student enrolled in a course."""
+    return await service.get_course_attendance_summary(db, course_id)
+
+
 # ─── Results ──────────────────────────────────────────────
 @router.post("/results", response_model=ResultResponse, status_code=201)
 async def add_result(
@@ -110,9 +153,9 @@ async def add_result(
 @router.get("/results/me", response_model=list[ResultResponse])
 async def get_my_results(
     current_user: CurrentUser,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    return await service.get_student_results(db, current_user.id)
+    return rows_response(ResultResponse, await service.get_student_results(db, current_user.id))
 
 
 # ─── Timetable ────────────────────────────────────────────
@@ -125,9 +168,46 @@ async def create_timetable_slot(
     return await service.create_timetable_slot(db, data)
 
 
+@router.post("/timetable/validate", response_model=TimetableValidation)
+async def validate_timetable(
+    data: TimetableUpload,
+    db: AsyncSession = Depends(get_db),
+    _admin: None = Depends(require_role(UserRole.ADMIN)),
+):
+    """Check a whole uploaded timetable for room, faculty and student clashes without saving it."""
+    report = await service.validate_timetable(db, data.slots)
+    rows = [{"row": row, "clashes": clashes} for row, clashes in enumerate(report) if clashes]
+    return {"checked": len(report), "clashing_rows": len(rows), "rows": rows}
+
+
+@router.post("/timetable/generate", response_model=TimetableJobResponse, status_code=202)
+async def generate_timetable(
+    data: TimetableGenerateRequest,
+    current_user: CurrentUser,
+    _admin: None = Depends(require_role(UserRole.ADMIN)),
+):
+    """Generate a semester's timetable in the background; poll the returned job for progress and the result."""
+    return await service.start_timetable_generation(data, current_user.id)
+
+
+@router.get("/timetable/jobs/{job_id}", response_model=TimetableJobResponse)
+async def get_timetable_job(
+    job_id: str,
+    _admin: None = Depends(require_role(UserRole.ADMIN)),
+):
+    return await service.get_timetable_job(job_id)
+
+
 @router.get("/timetable/me", response_model=list[TimetableSlotResponse])
 async def get_my_timetable(
     current_user: CurrentUser,
-    db: AsyncSession = Depends(get_db),
+    validators: dict[str, str] = Depends(timetable_validators),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    return await service.get_timetable(db, current_user.id)
+    async def timetable() -> bytes:
+        return rows_body(TimetableSlotResponse, await service.get_timetable(db, current_user.id))
+
+    body = await response_cache.get_or_compute(
+        "timetable", (TimetableSlot.__tablename__, Enrollment.__tablename__), (current_user.id,), timetable,
+    )
+    return json_response(body, headers=validators)
@@ -1,9 +1,11 @@
 """
 Academic Pydantic schemas.
 """
-from datetime import date, datetime, time
+import enum
+from datetime import date, datetime, time, timedelta
+from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 from app.academics.models import AttendanceStatus, DayOfWeek, Semester
 
@@ -34,7 +36,8 @@ class CourseResponse(BaseModel):
 
 class CourseListResponse(BaseModel):
     courses: list[CourseResponse]
-    total: int
+    total: int | None = None
+    next_cursor: str | None = None
 
 
 # ─── Attendance ────────────────────────────────────────────
@@ -45,11 +48,16 @@ class AttendanceCreate(BaseModel):
     status: AttendanceStatus
 
 
+class AttendanceRecord(BaseModel):
+    student_id: int
+    status: AttendanceStatus
+
+
 class AttendanceBulkCreate(BaseModel):
     """Mark attendance for multiple students at once."""
     course_id: int
     date: date
-    records: list[dict]  # [{"student_id": 1, "status": "present"}, ...]
+    records: list[AttendanceRecord]
 
 
 class AttendanceResponse(BaseModel):
@@ -72,6 +80,17 @@ class AttendanceSummary(BaseModel):
     percentage: float
 
 
+class StudentAttendanceSummary(BaseModel):
+    student_id: int
+    student_name: str
+    enrollment_no: str | None
+    total_classes: int
+    present: int
+    absent: int
+    late: int
+    percentage: float
+
+
 # ─── Result ────────────────────────────────────────────────
 class ResultCreate(BaseModel):
     student_id: int
@@ -104,7 +123,13 @@ class TimetableSlotCreate(BaseModel):
     day: DayOfWeek
     start_time: time
     end_time: time
-    room: str
+    room: str = Field(..., max_length=50)
+
+    @model_validator(mode="after")
+    def _ends_after_start(self):
+        if self.end_time <= self.start_time:
+            raise ValueError("end_time must be after start_time")
+        return self
 
 
 class TimetableSlotResponse(BaseModel):
@@ -115,3 +140,87 @@ class TimetableSlotResponse(BaseModel):
     end_time: time
     room: str
     model_config = {"from_attributes": True}
+
+
+class ClashKind(str, enum.Enum):
+    ROOM = "room"
+    FACULTY = "faculty"
+    STUDENTS = "students"
+
+
+class TimetableUpload(BaseModel):
+    slots: list[TimetableSlotCreate] = Field(..., max_length=50_000)
+
+
+class TimetableClash(BaseModel):
+    """An existing slot (slot_id) or an earlier uploaded row (row) that clashes."""
+    kind: ClashKind
+    slot_id: int | None
+    row: int | None
+    course_id: int
+    day: DayOfWeek
+    start_time: time
+    end_time: time
+    room: str
+    shared_students: int | None = None  # for kind "students"
+    model_config = {"from_attributes": True}
+
+
+class TimetableRowClashes(BaseModel):
+    row: int
+    clashes: list[TimetableClash]
+
+
+class TimetableValidation(BaseModel):
+    checked: int
+    clashing_rows: int
+    rows: list[TimetableRowClashes]  # only the rows with clashes
+
+
+class TeachingRoom(BaseModel):
+    name: str = Field(..., min_length=1, max_length=50)
+    capacity: int = Field(..., gt=0)
+
+
+def _teaching_days() -> list[DayOfWeek]:
+    return [day for day in DayOfWeek if day != DayOfWeek.SATURDAY]
+
+
+class TimetableGenerateRequest(BaseModel):
+    semester: Semester
+    rooms: list[TeachingRoom] = Field(..., min_length=1, max_length=10_000)
+    days: list[DayOfWeek] = Field(default_factory=_teaching_days, min_length=1)
+    day_start: time = time(8, 0)
+    periods_per_day: int = Field(9, ge=1, le=24)
+    period_minutes: int = Field(50, ge=10, le=240)
+    break_minutes: int = Field(10, ge=0, le=120)
+    sessions_per_course: int | None = Field(None, ge=1)  # default: the course's credits; at most one a day
+    replace_existing: bool = False  # reschedule courses that already have slots instead of keeping them
+    dry_run: bool = False  # return the generated slots in the job result without saving them
+
+    @model_validator(mode="after")
+    def _fits_the_day(self):
+        if len(set(self.days)) != len(self.days):
+            raise ValueError("days must not repeat")
+        if len({room.name.strip().casefold() for room in self.rooms}) != len(self.rooms):
+            raise ValueError("room names must be unique")
+        start = timedelta(hours=self.day_start.hour, minutes=self.day_start.minute)
+        length = timedelta(minutes=self.periods_per_day * self.period_minutes
+                           + (self.periods_per_day - 1) * self.break_minutes)
+        if start + length >= timedelta(days=1):
+            raise ValueError("the last period must end before midnight")
+        return self
+
+
+class TimetableJobResponse(BaseModel):
+    """A timetable generation job; `result` is set once it succeeded, `error` if it failed."""
+    id: str
+    status: str
+    phase: str
+    progress: float
+    detail: dict[str, Any]
+    result: dict[str, Any] | None
+    error: str | None
+    created_at: datetime
+    updated_at: datetime
+    model_config = {"from_attributes": True}
@@ -1,15 +1,35 @@
 """
 Academic service: business logic for courses, attendance, results, timetable.
 """
-from sqlalchemy import func, select
+import asyncio
+import time
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from functools import partial
+from typing import Any, Callable
+
+from sqlalchemy import and_, case, delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
+from app.academics.clashes import Clash, ClashEngine, Slot, clash_engines
 from app.academics.models import Attendance, AttendanceStatus, Course, Enrollment, Result, TimetableSlot
 from app.academics.schemas import (
     AttendanceBulkCreate, AttendanceCreate, AttendanceSummary,
-    CourseCreate, ResultCreate, TimetableSlotCreate,
+    CourseCreate, ResultCreate, StudentAttendanceSummary, TimetableGenerateRequest, TimetableSlotCreate,
 )
-from app.core.exceptions import ConflictException, NotFoundException
+from app.academics.timetabling import CourseSpec, Fixed, Problem, partition_rooms, shared_students, solve
+from app.core.cache import table_versions
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal, after_commit
+from app.core.exceptions import ConflictException, NotFoundException, ValidationException
+from app.core.jobs import Job, Progress, jobs, solver_pool
+from app.core.pagination import next_page, paginate
+from app.users.models import User
+
+settings = get_settings()
 
 
 # ─── Courses ───────────────────────────────────────────────
@@ -21,25 +41,38 @@ async def create_course(db: AsyncSession, data: CourseCreate) -> Course:
     db.add(course)
     await db.flush()
     await db.refresh(course)
+    after_commit(db, partial(table_versions.bump, Course.__tablename__))
     return course
 
 
+COURSE_SORT_KEYS = (Course.id,)
+# Catalog reads only need the course columns: skip the selectin loads of every
+# enrollment and timetable slot (and fail loudly if something starts using them).
+COURSE_COLUMNS_ONLY = raiseload("*")
+
+
 async def list_courses(
-    db: AsyncSession, department: str | None = None, skip: int = 0, limit: int = 50
-) -> tuple[list[Course], int]:
-    query = select(Course).where(Course.is_active == True)
+    db: AsyncSession, department: str | None = None, skip: int = 0, limit: int = 50,
+    cursor: str | None = None, include_total: bool = True,
+) -> tuple[list[Course], int | None, str | None]:
+    query = select(Course).options(COURSE_COLUMNS_ONLY).where(Course.is_active == True)
     count_q = select(func.count(Course.id)).where(Course.is_active == True)
     if department:
         query = query.where(Course.department == department)
         count_q = count_q.where(Course.department == department)
 
-    total = (await db.execute(count_q)).scalar() or 0
-    results = await db.execute(query.offset(skip).limit(limit))
-    return list(results.scalars().all()), total
+    total = None
+    if include_total and cursor is None:
+        total = (await db.execute(count_q)).scalar() or 0
+    results = await db.execute(
+        paginate(query, COURSE_SORT_KEYS, cursor=cursor, skip=skip, limit=limit)
+    )
+    courses, next_cursor = next_page(results.scalars().all(), COURSE_SORT_KEYS, limit)
+    return courses, total, next_cursor
 
 
 async def get_course(db: AsyncSession, course_id: int) -> Course:
-    result = await db.execute(select(Course).where(Course.id == course_id))
+    result = await db.execute(select(Course).options(COURSE_COLUMNS_ONLY).where(Course.id == course_id))
     course = result.scalar_one_or_none()
     if not course:
         raise NotFoundException("Course")
@@ -60,12 +93,16 @@ async def enroll_student(db: AsyncSession, student_id: int, course_id: int) -> E
     db.add(enrollment)
     await db.flush()
     await db.refresh(enrollment)
+    after_commit(db, partial(
+        _schedule_changed, Enrollment.__tablename__, lambda engine: engine.cohorts.enroll(student_id, course_id)
+    ))
     return enrollment
 
 
 async def get_student_courses(db: AsyncSession, student_id: int) -> list[Course]:
     result = await db.execute(
         select(Course)
+        .options(COURSE_COLUMNS_ONLY)
         .join(Enrollment, Enrollment.course_id == Course.id)
         .where(Enrollment.student_id == student_id)
     )
@@ -73,74 +110,138 @@ async def get_student_courses(db: AsyncSession, student_id: int) -> list[Course]
 
 
 # ─── Attendance ────────────────────────────────────────────
+UPSERT_CHUNK_SIZE = 500
+
+
+async def _upsert_attendance(db: AsyncSession, rows: list[dict]) -> list[Attendance]:
+    """
+    Set-based INSERT ... ON CONFLICT (student_id, course_id, date) DO UPDATE ... RETURNING.
+    Re-marking the same class overwrites status/marked_by instead of duplicating rows.
+    """
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    records: list[Attendance] = []
+    for i in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        stmt = insert(Attendance).values(rows[i:i + UPSERT_CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Attendance.student_id, Attendance.course_id, Attendance.date],
+            set_={"status": stmt.excluded.status, "marked_by": stmt.excluded.marked_by},
+        ).returning(Attendance)
+        result = await db.scalars(stmt, execution_options={"populate_existing": True})
+        records.extend(result.all())
+    return records
+
+
 async def mark_attendance(
     db: AsyncSession, data: AttendanceCreate, marked_by: int
 ) -> Attendance:
-    record = Attendance(
-        student_id=data.student_id,
-        course_id=data.course_id,
-        date=data.date,
-        status=data.status,
-        marked_by=marked_by,
-    )
-    db.add(record)
-    await db.flush()
-    await db.refresh(record)
-    return record
+    records = await _upsert_attendance(db, [{
+        "student_id": data.student_id,
+        "course_id": data.course_id,
+        "date": data.date,
+        "status": data.status,
+        "marked_by": marked_by,
+    }])
+    return records[0]
 
 
 async def bulk_mark_attendance(
     db: AsyncSession, data: AttendanceBulkCreate, marked_by: int
 ) -> list[Attendance]:
-    records = []
-    for entry in data.records:
-        record = Attendance(
-            student_id=entry["student_id"],
-            course_id=data.course_id,
-            date=data.date,
-            status=AttendanceStatus(entry["status"]),
-            marked_by=marked_by,
-        )
-        db.add(record)
-        records.append(record)
-    await db.flush()
-    for r in records:
-        await db.refresh(r)
+    # One row per student; a later entry for the same student wins.
+    statuses = {entry.student_id: entry.status for entry in data.records}
+    if not statuses:
+        return []
+    records = await _upsert_attendance(db, [
+        {
+            "student_id": student_id,
+            "course_id": data.course_id,
+            "date": data.date,
+            "status": status,
+            "marked_by": marked_by,
+        }
+        for student_id, status in statuses.items()
+    ])
+    order = {student_id: i for i, student_id in enumerate(statuses)}
+    records.sort(key=lambda r: order[r.student_id])
     return records
 
 
+def _attendance_counts() -> tuple:
+    """Conditional-count pivot of Attendance.status; rows without attendance count as zero."""
+    def count_status(status: AttendanceStatus):
+        return func.count(case((Attendance.status == status, 1)))
+
+    return (
+        func.count(Attendance.id).label("total"),
+        count_status(AttendanceStatus.PRESENT).label("present"),
+        count_status(AttendanceStatus.ABSENT).label("absent"),
+        count_status(AttendanceStatus.LATE).label("late"),
+    )
+
+
+def _attendance_percentage(row) -> float:
+    percentage = ((row.present + row.late) / row.total * 100) if row.total > 0 else 0.0
+    return round(percentage, 1)
+
+
 async def get_attendance_summary(
     db: AsyncSession, student_id: int
 ) -> list[AttendanceSummary]:
-    """Get attendance percentage per course for a student."""
-    courses = await get_student_courses(db, student_id)
-    summaries = []
-    for course in courses:
-        result = await db.execute(
-            select(Attendance.status, func.count(Attendance.id))
-            .where(
-                Attendance.student_id == student_id,
-                Attendance.course_id == course.id,
-            )
-            .group_by(Attendance.status)
+    """Get attendance percentage per course for a student (single grouped query)."""
+    result = await db.execute(
+        select(Course.id, Course.name, *_attendance_counts())
+        .join(Enrollment, Enrollment.course_id == Course.id)
+        .outerjoin(
+            Attendance,
+            and_(Attendance.course_id == Course.id, Attendance.student_id == student_id),
+        )
+        .where(Enrollment.student_id == student_id)
+        .group_by(Course.id, Course.name)
+        .order_by(Course.id)
+    )
+    return [
+        AttendanceSummary(
+            course_id=row.id,
+            course_name=row.name,
+            total_classes=row.total,
+            present=row.present,
+            absent=row.absent,
+            late=row.late,
+            percentage=_attendance_percentage(row),
         )
-        status_counts = {row[0]: row[1] for row in result.all()}
-        total = sum(status_counts.values())
-        present = status_counts.get(AttendanceStatus.PRESENT, 0)
-        late = status_counts.get(AttendanceStatus.LATE, 0)
-        absent = status_counts.get(AttendanceStatus.ABSENT, 0)
-        percentage = ((present + late) / total * 100) if total > 0 else 0.0
-
-        summaries.append(AttendanceSummary(
-            course_id=course.id,
-            course_name=course.name,
-            total_classes=total,
-            present=present,
-            absent=absent,
-            late=late,
-            percentage=round(percentage, 1),
-        ))
-    return summaries
+        for row in result.all()
+    ]
+
+
+async def get_course_attendance_summary(
+    db: AsyncSession, course_id: int
+) -> list[StudentAttendanceSummary]:
+    """Get attendance percentage for every student enrolled in a course (one grouped query after the course lookup)."""
+    await get_course(db, course_id)
+    result = await db.execute(
+        select(User.id, User.full_name, User.enrollment_no, *_attendance_counts())
+        .join(Enrollment, Enrollment.student_id == User.id)
+        .outerjoin(
+            Attendance,
+            and_(Attendance.course_id == course_id, Attendance.student_id == User.id),
+        )
+        .where(Enrollment.course_id == course_id)
+        .group_by(User.id, User.full_name, User.enrollment_no)
+        .order_by(User.full_name)
+    )
+    return [
+        StudentAttendanceSummary(
+            student_id=row.id,
+            student_name=row.full_name,
+            enrollment_no=row.enrollment_no,
+            total_classes=row.total,
+            present=row.present,
+            absent=row.absent,
+            late=row.late,
+            percentage=_attendance_percentage(row),
+        )
+        for row in result.all()
+    ]
 
 
 # ─── Results ──────────────────────────────────────────────
@@ -162,14 +263,58 @@ async def get_student_results(
 
 
 # ─── Timetable ────────────────────────────────────────────
+MAX_CLASHES_IN_MESSAGE = 5
+
+
+async def _schedule_changed(table: str, change: Callable[[ClashEngine], None]) -> None:
+    """after_commit: bump `table` and apply the committed change to this worker's clash engine."""
+    clash_engines.apply(table, await table_versions.bump(table), change)
+
+
+async def _clash_engine(db: AsyncSession, course_ids: set[int]) -> ClashEngine:
+    """This worker's clash engine, knowing every course in `course_ids` (courses created since it was built)."""
+    engine = await clash_engines.get(db)
+    missing = course_ids - engine.cohorts.courses.keys()
+    if missing:
+        result = await db.execute(
+            select(Course.id, Course.faculty_id, Course.semester).where(Course.id.in_(missing))
+        )
+        for course_id, faculty_id, semester in result:
+            engine.cohorts.add_course(course_id, faculty_id, semester)
+            missing.discard(course_id)
+    if len(course_ids) == 1 and missing:
+        raise NotFoundException("Course")
+    if missing:
+        raise ValidationException(f"Unknown course ids: {sorted(missing)}")
+    return engine
+
+
 async def create_timetable_slot(db: AsyncSession, data: TimetableSlotCreate) -> TimetableSlot:
+    engine = await _clash_engine(db, {data.course_id})
+    clashes = engine.conflicts(Slot.of(data))
+    if clashes:
+        reasons = "; ".join(clash.describe() for clash in clashes[:MAX_CLASHES_IN_MESSAGE])
+        more = len(clashes) - MAX_CLASHES_IN_MESSAGE
+        raise ConflictException(f"Timetable clash: {reasons}" + (f"; and {more} more" if more > 0 else ""))
+
     slot = TimetableSlot(**data.model_dump())
     db.add(slot)
     await db.flush()
     await db.refresh(slot)
+    saved = Slot.of(slot)
+    after_commit(db, partial(_schedule_changed, TimetableSlot.__tablename__, lambda engine: engine.add(saved)))
     return slot
 
 
+async def validate_timetable(db: AsyncSession, slots: list[TimetableSlotCreate]) -> list[list[Clash]]:
+    """
+    Clashes of each uploaded slot with the saved timetable and with the rows
+    before it, in one pass over the upload. Nothing is saved.
+    """
+    engine = await _clash_engine(db, {slot.course_id for slot in slots})
+    return engine.validate([Slot.of(slot, row) for row, slot in enumerate(slots)])
+
+
 async def get_timetable(db: AsyncSession, student_id: int) -> list[TimetableSlot]:
     """Get timetable for a student based on their enrolled courses."""
     result = await db.execute(
@@ -179,3 +324,166 @@ async def get_timetable(db: AsyncSession, student_id: int) -> list[TimetableSlot
         .order_by(TimetableSlot.day, TimetableSlot.start_time)
     )
     return list(result.scalars().all())
+
+
+# ─── Timetable Generation ─────────────────────────────────
+TIMETABLE_JOB = "timetable"
+
+
+async def start_timetable_generation(data: TimetableGenerateRequest, user_id: int) -> Job:
+    """Start generating a semester's timetable in the background: one run per semester on this worker."""
+    key = data.semester.value
+    if jobs.running(TIMETABLE_JOB, key):
+        raise ConflictException(f"The {key} timetable is already being generated")
+    return await jobs.submit(TIMETABLE_JOB, key, user_id, partial(generate_timetable, data))
+
+
+async def get_timetable_job(job_id: str) -> Job:
+    job = await jobs.get(job_id)
+    if job is None or job.kind != TIMETABLE_JOB:
+        raise NotFoundException("Job")
+    return job
+
+
+def _period_times(data: TimetableGenerateRequest) -> list[tuple]:
+    """(start, end) of each period of a teaching day."""
+    first = datetime.combine(date.min, data.day_start)
+    step = timedelta(minutes=data.period_minutes + data.break_minutes)
+    length = timedelta(minutes=data.period_minutes)
+    return [((first + k * step).time(), (first + k * step + length).time()) for k in range(data.periods_per_day)]
+
+
+def _kept_periods(slots, data: TimetableGenerateRequest, faculty_of: dict[int, int]) -> list[Fixed]:
+    """The grid periods overlapped by the slots being kept."""
+    day_index = {day: i for i, day in enumerate(data.days)}
+    times = _period_times(data)
+    fixed = []
+    for slot in slots:
+        d = day_index.get(slot.day)
+        if d is None:
+            continue
+        for k, (start, end) in enumerate(times):
+            if start < slot.end_time and slot.start_time < end:
+                fixed.append(Fixed(slot.course_id, faculty_of[slot.course_id], d * len(times) + k, slot.room))
+    return fixed
+
+
+async def generate_timetable(data: TimetableGenerateRequest, progress: Progress) -> dict[str, Any]:
+    """
+    The timetable job. Loads the semester's active courses, their enrollments
+    and the slots being kept; solves each department in the solver pool in its
+    share of the rooms; repairs the merged result over all courses and rooms;
+    then replaces the slots in one transaction, unless dry_run. Returns the
+    summary kept as the job result.
+    """
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    await progress("loading", 0.0)
+    semester_courses = select(Course.id).where(Course.semester == data.semester, Course.is_active.is_(True))
+    async with AsyncSessionLocal() as db:
+        courses = (await db.execute(
+            select(Course.id, Course.department, Course.faculty_id, Course.credits)
+            .where(Course.id.in_(semester_courses))
+        )).all()
+        enrollments = [tuple(row) for row in await db.execute(
+            select(Enrollment.student_id, Enrollment.course_id).where(Enrollment.course_id.in_(semester_courses))
+        )]
+        existing = (await db.execute(
+            select(TimetableSlot.course_id, TimetableSlot.day, TimetableSlot.start_time,
+                   TimetableSlot.end_time, TimetableSlot.room)
+            .where(TimetableSlot.course_id.in_(semester_courses))
+        )).all()
+    if not courses:
+        raise ValidationException(f"No active {data.semester.value} courses to schedule")
+
+    scheduled = {slot.course_id for slot in existing}
+    todo = courses if data.replace_existing else [course for course in courses if course.id not in scheduled]
+    if not todo:
+        raise ValidationException(
+            f"Every active {data.semester.value} course already has slots: set replace_existing to reschedule them"
+        )
+    fixed = [] if data.replace_existing else _kept_periods(existing, data, {c.id: c.faculty_id for c in courses})
+    sizes, shared = await solver_pool.run(shared_students, enrollments)
+    departments: dict[str, list[CourseSpec]] = defaultdict(list)
+    for course in todo:
+        sessions = max(1, min(data.sessions_per_course or course.credits, len(data.days)))
+        departments[course.department].append(
+            CourseSpec(course.id, course.faculty_id, sizes.get(course.id, 0), sessions)
+        )
+    timings["load"] = round(time.perf_counter() - started, 3)
+
+    rooms = [(room.name, room.capacity) for room in data.rooms]
+    kept = {slot.course_id for slot in fixed}
+
+    def problem(label: str, specs: list[CourseSpec], rooms: list[tuple[str, int]], start=None) -> Problem:
+        related = {spec.id for spec in specs} | kept
+        return Problem(
+            specs, rooms, len(data.days), data.periods_per_day,
+            shared={course_id: shared[course_id] for course_id in related if course_id in shared},
+            fixed=fixed, start=start or {}, improve_seconds=settings.TIMETABLE_IMPROVE_SECONDS, label=label,
+        )
+
+    # Departments in parallel, each in its share of the rooms.
+    phase = time.perf_counter()
+    shares = partition_rooms(rooms, {
+        department: [spec.size for spec in specs for _ in range(spec.sessions)]
+        for department, specs in departments.items()
+    }, len(data.days) * data.periods_per_day)
+    await progress("solving", 0.05, departments=len(departments), departments_done=0)
+    merged = {}
+    solving = [
+        solver_pool.run(solve, problem(department, specs, shares[department]))
+        for department, specs in departments.items()
+    ]
+    for done, next_solution in enumerate(asyncio.as_completed(solving), 1):
+        merged.update((await next_solution).placements)
+        await progress("solving", 0.05 + 0.75 * done / len(solving), departments_done=done)
+    timings["departments"] = round(time.perf_counter() - phase, 3)
+
+    # One pass over everything: faculty and students shared across departments, leftovers.
+    phase = time.perf_counter()
+    await progress("repairing", 0.8)
+    everything = [spec for specs in departments.values() for spec in specs]
+    solution = await solver_pool.run(solve, problem("all", everything, rooms, merged))
+    timings["repair"] = round(time.perf_counter() - phase, 3)
+
+    times = _period_times(data)
+    slots = [
+        {"course_id": course_id, "day": data.days[p // data.periods_per_day],
+         "start_time": times[p % data.periods_per_day][0], "end_time": times[p % data.periods_per_day][1],
+         "room": room}
+        for (course_id, _), (p, room) in sorted(solution.placements.items())
+    ]
+    if not data.dry_run:
+        phase = time.perf_counter()
+        await progress("saving", 0.9, slots=len(slots))
+        async with AsyncSessionLocal() as db:
+            if data.replace_existing:
+                await db.execute(delete(TimetableSlot).where(TimetableSlot.course_id.in_(semester_courses)))
+            if slots:
+                await db.execute(insert(TimetableSlot), slots)
+            await db.commit()
+        await table_versions.bump(TimetableSlot.__tablename__)
+        clash_engines.invalidate()  # slots deleted and added in bulk: rebuilt on next use
+        timings["save"] = round(time.perf_counter() - phase, 3)
+
+    unplaced = Counter(course_id for course_id, _ in solution.unplaced)
+    result = {
+        "semester": data.semester.value,
+        "dry_run": data.dry_run,
+        "courses": len(todo),
+        "kept_courses": len(scheduled) if not data.replace_existing else 0,
+        "departments": len(departments),
+        "sessions": len(slots),
+        "unplaced": [{"course_id": course_id, "sessions": count} for course_id, count in sorted(unplaced.items())],
+        "student_clashes": solution.student_clashes,
+        "clashing_pairs": solution.clashing_pairs,
+        "timings": timings,
+    }
+    if data.dry_run:
+        result["slots"] = [
+            {**slot, "day": slot["day"].value, "start_time": slot["start_time"].isoformat(),
+             "end_time": slot["end_time"].isoformat()}
+            for slot in slots
+        ]
+    return result
@@ -0,0 +1,454 @@
+"""
+Semester timetable generator.
+
+The teaching week is a grid of periods (days x periods per day). A course
+needs `sessions` periods on different days, each in a room seating its
+enrollment. A generated timetable never breaks the hard constraints:
+
+  room      one session per room and period
+  faculty   one session per faculty member and period
+  course    at most one session of a course per day
+
+Student clashes (two courses sharing students meet in the same period) are
+soft: each costs the number of shared students. The search drives the cost
+down, to zero whenever it finds a way, and reports what is left.
+
+Search, per problem:
+  1. Greedy: courses most constrained first (students shared with other
+     courses, then size); each session takes the cheapest feasible period, in
+     the smallest free room that seats it.
+  2. Repair: a session with no feasible period evicts whatever blocks its
+     cheapest period (the faculty member's session or a room's occupant, never
+     a kept slot) and the evicted sessions are queued again. Sessions moved in
+     the last TABU_STEPS steps are evicted last, a session evicts at most
+     MAX_EVICTIONS times, and the steps are bounded.
+  3. Improve: sessions still clashing with students move to a cheaper
+     period, evicting a session in the way and placing it elsewhere if need
+     be; a move is kept only if the total cost drops. Sideways moves get the
+     search off plateaus, until the time budget is spent or STALE_ROUNDS
+     rounds in a row improved nothing.
+
+solve() takes and returns plain data, so departments are solved in parallel
+in the solver pool (app.core.jobs), each in its share of the rooms. A final
+solve over all courses and rooms starts from the merged result and settles
+what departments share: faculty members and students.
+"""
+import random
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Iterable
+
+
+FIXED = -1  # occupant of a kept slot: never evicted
+TABU_STEPS = 50
+STEPS_PER_SESSION = 40
+MAX_EVICTIONS = 5  # per session and placement pass
+RELOCATE_CANDIDATES = 16
+STALE_ROUNDS = 20
+
+Session = tuple[int, int]  # (course id, n-th weekly session of the course)
+Placement = tuple[int, str]  # (period, room)
+
+
+# ─── Problem & Solution ───────────────────────────────────
+@dataclass(frozen=True, slots=True)
+class CourseSpec:
+    id: int
+    faculty_id: int
+    size: int  # enrolled students: the room must seat them
+    sessions: int  # periods a week, each on a different day
+
+
+@dataclass(frozen=True, slots=True)
+class Fixed:
+    """A period taken by a kept slot: its faculty member, room and students are busy."""
+    course_id: int
+    faculty_id: int
+    period: int
+    room: str | None
+
+
+@dataclass
+class Problem:
+    courses: list[CourseSpec]
+    rooms: list[tuple[str, int]]  # (name, capacity)
+    days: int
+    periods_per_day: int
+    shared: dict[int, dict[int, int]] = field(default_factory=dict)  # course -> {course: shared students}
+    fixed: list[Fixed] = field(default_factory=list)
+    start: dict[Session, Placement] = field(default_factory=dict)  # placements to start from
+    improve_seconds: float = 10.0
+    seed: int = 0
+    label: str = ""
+
+
+@dataclass
+class Solution:
+    label: str
+    placements: dict[Session, Placement]
+    unplaced: list[Session]
+    student_clashes: int  # shared students of every clashing pair of sessions, summed
+    clashing_pairs: int
+    steps: int
+    seconds: float
+
+
+def shared_students(enrollments: Iterable[tuple[int, int]]) -> tuple[dict[int, int], dict[int, dict[int, int]]]:
+    """(students per course, shared students per pair of courses) from (student, course) rows."""
+    courses_of: dict[int, set[int]] = defaultdict(set)
+    for student_id, course_id in enrollments:
+        courses_of[student_id].add(course_id)
+    sizes: Counter = Counter()
+    shared: dict[int, dict[int, int]] = defaultdict(dict)
+    for courses in courses_of.values():
+        sizes.update(courses)
+        ordered = sorted(courses)
+        for i, a in enumerate(ordered):
+            row = shared[a]
+            for b in ordered[i + 1:]:
+                row[b] = row.get(b, 0) + 1
+    for a, row in list(shared.items()):
+        for b, count in row.items():
+            shared[b][a] = count
+    return dict(sizes), dict(shared)
+
+
+def partition_rooms(rooms: list[tuple[str, int]], sizes: dict[str, list[int]],
+                    periods: int) -> dict[str, list[tuple[str, int]]]:
+    """
+    Deal rooms to groups, given the size of each session of each group. Rooms
+    go largest first: to the group with the most sessions that only this room
+    and the larger ones can seat beyond the room-periods it already has, and
+    once every group is covered, to the group with the most sessions per room
+    dealt to it (D'Hondt). Each group gets the big rooms its big courses need
+    and a share of the rest in proportion to its sessions.
+    """
+    ordered = sorted(rooms, key=lambda room: -room[1])
+    ascending = {group: sorted(values) for group, values in sizes.items()}
+    shares: dict[str, list[tuple[str, int]]] = {group: [] for group in sizes}
+    for k, (name, capacity) in enumerate(ordered):
+        smaller = ordered[k + 1][1] if k + 1 < len(ordered) else 0
+
+        def claim(group: str) -> tuple[bool, float]:
+            values = ascending[group]
+            deficit = len(values) - bisect_right(values, smaller) - periods * len(shares[group])
+            return (deficit > 0, deficit if deficit > 0 else len(values) / (len(shares[group]) + 1))
+
+        shares[max(sizes, key=claim)].append((name, capacity))
+    return shares
+
+
+# ─── Solver ───────────────────────────────────────────────
+class _Solver:
+    """Mutable search state over one Problem; sessions, courses and rooms are list indexes."""
+
+    def __init__(self, problem: Problem):
+        self.problem = problem
+        self.per_day = problem.periods_per_day
+        self.periods = problem.days * problem.periods_per_day
+        self.rng = random.Random(problem.seed)
+
+        rooms = sorted(problem.rooms, key=lambda room: room[1])  # room indexes ascend by capacity
+        self.room_names = [name for name, _ in rooms]
+        self.capacities = [capacity for _, capacity in rooms]
+        self.room_index = {name.strip().casefold(): i for i, name in enumerate(self.room_names)}
+        self.free = [list(range(len(rooms))) for _ in range(self.periods)]  # sorted free rooms per period
+        self.holder: list[dict[int, int]] = [{} for _ in range(self.periods)]  # room -> session
+
+        self.courses = problem.courses
+        index = {course.id: i for i, course in enumerate(self.courses)}
+        self.course_of: list[int] = []  # session -> course
+        self.session_key: list[Session] = []
+        for ci, course in enumerate(self.courses):
+            for n in range(course.sessions):
+                self.course_of.append(ci)
+                self.session_key.append((course.id, n))
+        self.at: list[tuple[int, int] | None] = [None] * len(self.course_of)  # session -> (period, room)
+        self.min_room = [bisect_left(self.capacities, course.size) for course in self.courses]
+        self.peers = [
+            [(index[other], count) for other, count in problem.shared.get(course.id, {}).items() if other in index]
+            for course in self.courses
+        ]
+        # cost[c][p]: shared students of course c with the sessions already in period p
+        self.cost = [[0] * self.periods for _ in self.courses]
+        self.fixed_cost = [[0] * self.periods for _ in self.courses]
+        self.faculty_at: dict[tuple[int, int], int] = {}
+        self.course_day: dict[tuple[int, int], int] = {}
+        self.load = [0] * self.periods
+        self.moved_at: dict[int, int] = {}
+        self.steps = 0
+
+        for fixed in problem.fixed:
+            p = fixed.period
+            if not 0 <= p < self.periods:
+                continue
+            self.faculty_at[fixed.faculty_id, p] = FIXED
+            r = self.room_index.get(fixed.room.strip().casefold()) if fixed.room else None
+            if r is not None and r not in self.holder[p]:
+                self.free[p].remove(r)
+                self.holder[p][r] = FIXED
+            for other, count in problem.shared.get(fixed.course_id, {}).items():
+                if other in index:
+                    self.cost[index[other]][p] += count
+                    self.fixed_cost[index[other]][p] += count
+
+    # ─── Moves ────────────────────────────────────────────
+    def _place(self, s: int, p: int, r: int) -> None:
+        ci = self.course_of[s]
+        self.at[s] = (p, r)
+        free = self.free[p]
+        del free[bisect_left(free, r)]
+        self.holder[p][r] = s
+        self.faculty_at[self.courses[ci].faculty_id, p] = s
+        self.course_day[ci, p // self.per_day] = s
+        self.load[p] += 1
+        cost = self.cost
+        for other, count in self.peers[ci]:
+            cost[other][p] += count
+        self.moved_at[s] = self.steps
+
+    def _unplace(self, s: int) -> None:
+        ci = self.course_of[s]
+        p, r = self.at[s]
+        self.at[s] = None
+        insort(self.free[p], r)
+        del self.holder[p][r]
+        del self.faculty_at[self.courses[ci].faculty_id, p]
+        del self.course_day[ci, p // self.per_day]
+        self.load[p] -= 1
+        cost = self.cost
+        for other, count in self.peers[ci]:
+            cost[other][p] -= count
+
+    def _room(self, ci: int, p: int) -> int | None:
+        """The smallest free room in period p seating course ci."""
+        free = self.free[p]
+        pos = bisect_left(free, self.min_room[ci])
+        return free[pos] if pos < len(free) else None
+
+    def _best(self, s: int) -> tuple[int, int] | None:
+        """The cheapest feasible (period, room) for unplaced session s, tightest room and emptiest period first."""
+        ci = self.course_of[s]
+        faculty_id = self.courses[ci].faculty_id
+        cost, per_day, capacities = self.cost[ci], self.per_day, self.capacities
+        best, best_key = None, None
+        offset = self.rng.randrange(self.periods)  # ties go to a random period
+        for k in range(self.periods):
+            p = (offset + k) % self.periods
+            if (ci, p // per_day) in self.course_day or (faculty_id, p) in self.faculty_at:
+                continue
+            r = self._room(ci, p)
+            if r is None:
+                continue
+            key = (cost[p], capacities[r], self.load[p])
+            if best_key is None or key < best_key:
+                best, best_key = (p, r), key
+        return best
+
+    def _eviction(self, s: int) -> tuple[int, int, set[int]] | None:
+        """The period, room and sessions to evict for s: least recently moved and fewest evictions first."""
+        ci = self.course_of[s]
+        best, best_key = None, None
+        offset = self.rng.randrange(self.periods)
+        for k in range(self.periods):
+            p = (offset + k) % self.periods
+            if (ci, p // self.per_day) in self.course_day:
+                continue
+            blocked = self._blockers(ci, p)
+            if blocked is None:
+                continue
+            r, evict = blocked
+            recent = sum(map(self._recent, evict))
+            key = (recent, len(evict), self.cost[ci][p])
+            if best_key is None or key < best_key:
+                best, best_key = (p, r, evict), key
+        return best
+
+    # ─── Phases ───────────────────────────────────────────
+    def start(self, placements: dict[Session, Placement]) -> list[int]:
+        """Place the given sessions where still feasible; return the rest, most constrained first."""
+        rest = []
+        by_key = {key: s for s, key in enumerate(self.session_key)}
+        for key, (p, room) in placements.items():
+            s = by_key.get(key)
+            r = self.room_index.get(room.strip().casefold())
+            if s is None or r is None or not 0 <= p < self.periods:
+                continue
+            ci = self.course_of[s]
+            if (
+                r >= self.min_room[ci] and r not in self.holder[p]
+                and (ci, p // self.per_day) not in self.course_day
+                and (self.courses[ci].faculty_id, p) not in self.faculty_at
+            ):
+                self._place(s, p, r)
+        weight = [sum(count for _, count in peers) for peers in self.peers]
+        order = sorted(range(len(self.courses)), key=lambda ci: (-weight[ci], -self.courses[ci].size))
+        first = {}
+        for s, ci in enumerate(self.course_of):
+            first.setdefault(ci, s)
+        for ci in order:
+            for n in range(self.courses[ci].sessions):
+                s = first[ci] + n
+                if self.at[s] is None:
+                    rest.append(s)
+        return rest
+
+    def place(self, queue: list[int]) -> None:
+        """Greedy placement with eviction repair."""
+        pending = deque(queue)
+        evictions: Counter = Counter()
+        limit = self.steps + STEPS_PER_SESSION * len(pending) + 1000
+        while pending and self.steps < limit:
+            s = pending.popleft()
+            if self.at[s] is not None:
+                continue
+            self.steps += 1
+            best = self._best(s)
+            if best is not None:
+                self._place(s, *best)
+                continue
+            evictions[s] += 1
+            eviction = self._eviction(s) if evictions[s] <= MAX_EVICTIONS else None
+            if eviction is None:
+                continue  # nowhere to go, or it keeps displacing others: left unplaced
+            p, r, evict = eviction
+            for other in evict:
+                self._unplace(other)
+                pending.append(other)
+            self._place(s, p, r)
+
+    def _blockers(self, ci: int, p: int) -> tuple[int, set[int]] | None:
+        """A room for course ci in period p and the sessions to evict for it, if none of them is kept."""
+        min_room = self.min_room[ci]
+        teaching = self.faculty_at.get((self.courses[ci].faculty_id, p))
+        if teaching == FIXED or min_room >= len(self.capacities):
+            return None
+        evict = {teaching} if teaching is not None else set()
+        r = self._room(ci, p)
+        if r is None and teaching is not None and self.at[teaching][1] >= min_room:
+            r = self.at[teaching][1]  # evicting the faculty member's session frees a room that fits
+        if r is None:
+            # The tightest rooms that fit, preferring an occupant not moved recently.
+            movable = [
+                candidate for candidate in range(min_room, min(min_room + 8, len(self.capacities)))
+                if self.holder[p].get(candidate) != FIXED
+            ]
+            if not movable:
+                return None
+            r = next((candidate for candidate in movable if not self._recent(self.holder[p][candidate])), movable[0])
+            evict.add(self.holder[p][r])
+        return r, evict
+
+    def _recent(self, s: int) -> bool:
+        return self.steps - self.moved_at.get(s, -TABU_STEPS) < TABU_STEPS
+
+    def _relocate(self, s: int, sideways: bool) -> bool:
+        """
+        Move clashing session s to a cheaper period, evicting what blocks it
+        there and placing the evicted sessions elsewhere; undone unless the
+        total clash cost drops. With `sideways`, a free period costing the same
+        will do as well (it returns False: nothing improved).
+        """
+        ci = self.course_of[s]
+        p, r = self.at[s]
+        current = self.cost[ci][p]
+        self._unplace(s)
+        best = self._best(s)
+        if best is not None and self.cost[ci][best[0]] < current:
+            self._place(s, *best)
+            return True
+        if sideways and best is not None and best[0] != p and self.cost[ci][best[0]] == current:
+            self._place(s, *best)
+            return False
+        cost = self.cost[ci]
+        cheaper = sorted(
+            (q for q in range(self.periods) if cost[q] < current and (ci, q // self.per_day) not in self.course_day),
+            key=cost.__getitem__,
+        )
+        for q in cheaper[:RELOCATE_CANDIDATES]:
+            blocked = self._blockers(ci, q)
+            if blocked is None or not blocked[1]:
+                continue
+            rq, evict = blocked
+            before = {other: self.at[other] for other in evict}
+            delta = -current
+            for other in evict:
+                delta -= self.cost[self.course_of[other]][q]
+                self._unplace(other)
+            delta += self.cost[ci][q]
+            self._place(s, q, rq)
+            placed = []
+            for other in evict:
+                target = self._best(other)
+                if target is None:
+                    break
+                delta += self.cost[self.course_of[other]][target[0]]
+                self._place(other, *target)
+                placed.append(other)
+            if len(placed) == len(evict) and delta < 0:
+                return True
+            for other in placed:
+                self._unplace(other)
+            self._unplace(s)
+            for other, (bq, br) in before.items():
+                self._place(other, bq, br)
+        self._place(s, p, r)
+        return False
+
+    def improve(self, deadline: float) -> None:
+        """
+        Relocate clashing sessions until time is up or STALE_ROUNDS rounds in a
+        row improved nothing; from the second such round, sideways moves shake
+        the search off plateaus.
+        """
+        stale = 0
+        while stale < STALE_ROUNDS and time.perf_counter() < deadline:
+            improved = False
+            clashing = [
+                s for s, placed in enumerate(self.at)
+                if placed is not None and self.cost[self.course_of[s]][placed[0]] > 0
+            ]
+            self.rng.shuffle(clashing)
+            for i, s in enumerate(clashing):
+                if i % 64 == 0 and time.perf_counter() >= deadline:
+                    return
+                if self.cost[self.course_of[s]][self.at[s][0]] > 0 and self._relocate(s, stale > 0):
+                    self.steps += 1
+                    improved = True
+            stale = 0 if improved else stale + 1
+
+    def solution(self, started: float) -> Solution:
+        placements, unplaced = {}, []
+        in_period: list[Counter] = [Counter() for _ in range(self.periods)]
+        for s, placed in enumerate(self.at):
+            if placed is None:
+                unplaced.append(self.session_key[s])
+                continue
+            p, r = placed
+            placements[self.session_key[s]] = (p, self.room_names[r])
+            in_period[p][self.course_of[s]] += 1
+        clashes = pairs = 0
+        for s, placed in enumerate(self.at):
+            if placed is None:
+                continue
+            ci, p = self.course_of[s], placed[0]
+            for other, count in self.peers[ci]:
+                if other > ci and in_period[p][other]:
+                    clashes += count * in_period[p][other]
+                    pairs += in_period[p][other]
+            if self.fixed_cost[ci][p]:
+                clashes += self.fixed_cost[ci][p]
+                pairs += 1
+        return Solution(self.problem.label, placements, unplaced, clashes, pairs, self.steps,
+                        round(time.perf_counter() - started, 3))
+
+
+def solve(problem: Problem) -> Solution:
+    """Greedy placement, repair, then improvement within problem.improve_seconds. Runs in a pool process."""
+    started = time.perf_counter()
+    solver = _Solver(problem)
+    solver.place(solver.start(problem.start))
+    solver.improve(time.perf_counter() + problem.improve_seconds)
+    return solver.solution(started)
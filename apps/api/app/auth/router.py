@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.auth.schemas import LoginRequest, RefreshRequest, RegisterRequest, TokenResponse
 from app.core.database import get_db
 from app.core.exceptions import UnauthorizedException
-from app.core.security import create_access_token, create_refresh_token, decode_token, verify_password
+from app.core.security import create_access_token, create_refresh_token, decode_token, hasher
 from app.users.models import UserRole
 from app.users.schemas import UserCreate, UserResponse
 from app.users.service import create_user, get_user_by_email
@@ -20,7 +20,7 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 async def login(data: LoginRequest, db: AsyncSession = Depends(get_db)):
     """Authenticate user and return JWT tokens."""
     user = await get_user_by_email(db, data.email)
-    if not user or not verify_password(data.password, user.hashed_password):
+    if not user or not await hasher.verify(data.password, user.hashed_password):
         raise UnauthorizedException("Invalid email or password")
     if not user.is_active:
         raise UnauthorizedException("Account is deactivated")
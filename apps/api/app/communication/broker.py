@@ -0,0 +1,126 @@
+"""
+Chat message brokers for the WebSocket ConnectionManager.
+
+The broker decides how a broadcast reaches every worker that has listeners in
+a room. The in-memory broker delivers within this process only; the Redis
+broker fans out through one pub/sub channel per room, so any number of
+uvicorn workers or replicas can serve the same room.
+"""
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger("ums.chat")
+
+# Receives the room id and the message already serialized to JSON text, so each
+# broadcast is encoded exactly once no matter how many sockets receive it.
+Deliver = Callable[[int, str], Awaitable[None]]
+
+
+class InMemoryBroker:
+    """Single-process broker: publish hands the message straight to the local subscriber."""
+
+    def __init__(self):
+        self._subscribers: dict[int, Deliver] = {}
+
+    async def subscribe(self, room_id: int, deliver: Deliver) -> None:
+        self._subscribers[room_id] = deliver
+
+    async def unsubscribe(self, room_id: int) -> None:
+        self._subscribers.pop(room_id, None)
+
+    async def publish(self, room_id: int, message: dict[str, Any]) -> None:
+        deliver = self._subscribers.get(room_id)
+        if deliver is not None:
+            await deliver(room_id, json.dumps(message))
+
+    async def close(self) -> None:
+        self._subscribers.clear()
+
+
+class RedisBroker:
+    """
+    Redis pub/sub broker. Each worker runs one subscriber task per room that has
+    local listeners, on channel ums:chat:{room_id}.
+    """
+
+    CHANNEL_PREFIX = "ums:chat:"
+    RECONNECT_BACKOFF = 0.1
+    MAX_RECONNECT_BACKOFF = 5.0
+
+    def __init__(self, url: str):
+        from redis.asyncio import Redis
+
+        self._redis = Redis.from_url(url, decode_responses=True)
+        self._tasks: dict[int, asyncio.Task] = {}
+
+    async def subscribe(self, room_id: int, deliver: Deliver) -> None:
+        if room_id in self._tasks:
+            return
+        # The task is registered before the first await, so an unsubscribe that comes
+        # while the channel is still being subscribed finds it and cancels it.
+        subscribed = asyncio.get_running_loop().create_future()
+        task = asyncio.create_task(self._listen(room_id, deliver, subscribed), name=f"chat-subscriber-{room_id}")
+        self._tasks[room_id] = task
+        # Subscribed before returning so no message published after connect is missed.
+        await asyncio.wait((subscribed, task), return_when=asyncio.FIRST_COMPLETED)
+        if not subscribed.done() and not task.cancelled():
+            if self._tasks.get(room_id) is task:
+                del self._tasks[room_id]
+            task.result()
+
+    async def _listen(self, room_id: int, deliver: Deliver, subscribed: asyncio.Future) -> None:
+        """
+        Deliver the room's messages until cancelled. A lost connection is resubscribed
+        with backoff (messages published meanwhile are missed: pub/sub keeps nothing);
+        only a failure of the first subscribe ends the task, so subscribe() can raise it.
+        """
+        channel = f"{self.CHANNEL_PREFIX}{room_id}"
+        backoff = self.RECONNECT_BACKOFF
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(channel)
+                if not subscribed.done():
+                    subscribed.set_result(None)
+                backoff = self.RECONNECT_BACKOFF
+                async for item in pubsub.listen():
+                    if item.get("type") != "message":
+                        continue
+                    try:
+                        await deliver(room_id, item["data"])
+                    except Exception:
+                        logger.exception("Failed to deliver chat message in room %s", room_id)
+                raise ConnectionError("subscription ended")
+            except asyncio.CancelledError:
+                return
+            except Exception as exc:
+                if not subscribed.done():
+                    raise
+                logger.warning("Chat subscription for room %s lost, resubscribing in %.1fs: %s",
+                               room_id, backoff, exc)
+            finally:
+                await pubsub.aclose()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.MAX_RECONNECT_BACKOFF)
+
+    async def unsubscribe(self, room_id: int) -> None:
+        task = self._tasks.pop(room_id, None)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def publish(self, room_id: int, message: dict[str, Any]) -> None:
+        await self._redis.publish(f"{self.CHANNEL_PREFIX}{room_id}", json.dumps(message))
+
+    async def close(self) -> None:
+        for room_id in list(self._tasks):
+            await self.unsubscribe(room_id)
+        await self._redis.aclose()
+
+
+def build_broker(kind: str, redis_url: str) -> InMemoryBroker | RedisBroker:
+    if kind == "redis":
+        return RedisBroker(redis_url)
+    return InMemoryBroker()
@@ -5,7 +5,7 @@ import enum
 from datetime import datetime, timezone
 
 from sqlalchemy import (
-    DateTime, Enum, ForeignKey, Integer, String, Text,
+    DateTime, Enum, ForeignKey, Index, Integer, String, Text,
 )
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -41,6 +41,9 @@ class ChatRoom(Base):
 
 class ChatRoomMember(Base):
     __tablename__ = "chat_room_members"
+    __table_args__ = (
+        Index("ix_chat_room_members_user_room", "user_id", "room_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     room_id: Mapped[int] = mapped_column(Integer, ForeignKey("chat_rooms.id"), nullable=False)
@@ -52,6 +55,9 @@ class ChatRoomMember(Base):
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("ix_chat_messages_room_sent", "room_id", "sent_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     room_id: Mapped[int] = mapped_column(Integer, ForeignKey("chat_rooms.id"), nullable=False)
@@ -64,6 +70,10 @@ class ChatMessage(Base):
 
 class Leave(Base):
     __tablename__ = "leaves"
+    __table_args__ = (
+        Index("ix_leaves_applicant_created", "applicant_id", "created_at"),
+        Index("ix_leaves_created_at", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     applicant_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
@@ -1,20 +1,20 @@
 """
 Communication routes: chat (REST + WebSocket) and leave management.
 """
-import json
-
 from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.communication import service
 from app.communication.models import LeaveStatus
 from app.communication.schemas import (
-    ChatMessageResponse, ChatRoomCreate, ChatRoomResponse,
+    ChatMessageResponse, ChatRoomCreate, ChatRoomResponse, WSChatMessage,
     LeaveCreate, LeaveResponse, LeaveUpdate,
 )
-from app.communication.service import manager
+from app.communication.service import manager, message_writer
 from app.core.database import get_db
-from app.core.deps import CurrentUser, require_role
+from app.core.deps import CurrentUser, get_read_db, require_role
+from app.core.serialization import rows_response
 from app.users.models import UserRole
 
 router = APIRouter(prefix="/communication", tags=["Communication"])
@@ -33,9 +33,9 @@ async def create_room(
 @router.get("/rooms", response_model=list[ChatRoomResponse])
 async def list_my_rooms(
     current_user: CurrentUser,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    return await service.get_user_rooms(db, current_user.id)
+    return rows_response(ChatRoomResponse, await service.get_user_rooms(db, current_user.id))
 
 
 @router.get("/rooms/{room_id}/messages", response_model=list[ChatMessageResponse])
@@ -44,29 +44,50 @@ async def get_messages(
     _user: CurrentUser,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = None,
     db: AsyncSession = Depends(get_db),
 ):
-    return await service.get_room_messages(db, room_id, skip, limit)
+    """The cursor for older messages, if any, is returned in the X-Next-Cursor header."""
+    messages, next_cursor = await service.get_room_messages(db, room_id, skip, limit, cursor)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return rows_response(ChatMessageResponse, messages, headers=headers)
 
 
 # ─── Chat WebSocket ───────────────────────────────────────
 @router.websocket("/ws/{room_id}")
 async def websocket_endpoint(websocket: WebSocket, room_id: int):
-    """Real-time chat via WebSocket."""
-    await manager.connect(websocket, room_id)
+    """Real-time chat via WebSocket. Messages are persisted by the background writer."""
     try:
+        await manager.connect(websocket, room_id)
         while True:
             data = await websocket.receive_text()
-            payload = json.loads(data)
+            try:
+                message = WSChatMessage.model_validate_json(data)
+            except ValidationError:
+                # Rejected here, so a malformed message never reaches the room or the writer
+                await websocket.send_json({
+                    "type": "error",
+                    "detail": 'Expected {"sender_id": <int>, "content": <non-empty string>}',
+                })
+                continue
+            await message_writer.enqueue(room_id, message.sender_id, message.content)
             # Broadcast to all connected clients in the room
             await manager.broadcast(room_id, {
                 "type": "message",
-                "sender_id": payload.get("sender_id"),
-                "content": payload.get("content"),
+                "sender_id": message.sender_id,
+                "content": message.content,
                 "room_id": room_id,
             })
     except WebSocketDisconnect:
-        manager.disconnect(websocket, room_id)
+        pass
+    finally:
+        await manager.disconnect(websocket, room_id)
+
+
+@router.get("/ws/stats")
+async def websocket_stats(_admin: None = Depends(require_role(UserRole.ADMIN))):
+    """Admin-only: per-room connections, outbound queue depth and fan-out latency on this worker."""
+    return manager.stats()
 
 
 # ─── Leave Management ─────────────────────────────────────
@@ -96,16 +117,20 @@ async def list_leaves(
     status: LeaveStatus | None = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """Students see own leaves, admin/faculty see all."""
+    """Students see own leaves, admin/faculty see all. Next page cursor is in X-Next-Cursor."""
     user_id = current_user.id if current_user.role == UserRole.STUDENT else None
-    return await service.get_leaves(db, user_id, status, skip, limit)
+    leaves, next_cursor = await service.get_leaves(db, user_id, status, skip, limit, cursor)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return rows_response(LeaveResponse, leaves, headers=headers)
 
 
 @router.get("/leaves/me", response_model=list[LeaveResponse])
 async def my_leaves(
     current_user: CurrentUser,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    return await service.get_leaves(db, current_user.id)
+    leaves, _ = await service.get_leaves(db, current_user.id)
+    return rows_response(LeaveResponse, leaves)
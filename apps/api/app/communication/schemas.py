@@ -37,6 +37,12 @@ class ChatMessageResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class WSChatMessage(BaseModel):
+    """A chat message sent by a client over the WebSocket."""
+    sender_id: int = Field(..., strict=True)
+    content: str = Field(..., min_length=1, strict=True)
+
+
 class WSMessage(BaseModel):
     """WebSocket message format."""
     type: str = "message"  # "message", "typing", "read"
@@ -1,44 +1,206 @@
 """
 Communication service: chat CRUD, WebSocket manager, leave management.
 """
-from collections import defaultdict
+import asyncio
+import logging
+import time
+from typing import Any
 
 from fastapi import WebSocket
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.communication.broker import InMemoryBroker, RedisBroker, build_broker
 from app.communication.models import (
     ChatMessage, ChatRoom, ChatRoomMember, Leave, LeaveStatus,
 )
 from app.communication.schemas import ChatRoomCreate, LeaveCreate, LeaveUpdate
+from app.communication.writer import MessageWriter
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
 from app.core.exceptions import ForbiddenException, NotFoundException
+from app.core.pagination import next_page, paginate
+
+
+settings = get_settings()
+logger = logging.getLogger("ums.chat")
 
 
 # ─── WebSocket Connection Manager ──────────────────────────
-class ConnectionManager:
-    """Manages active WebSocket connections per chat room."""
+class ClientConnection:
+    """One socket with its bounded outbound queue and the task that drains it."""
+
+    __slots__ = ("websocket", "room_id", "queue", "writer", "dropped")
+
+    def __init__(self, websocket: WebSocket, room_id: int, queue_size: int):
+        self.websocket = websocket
+        self.room_id = room_id
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self.writer: asyncio.Task | None = None
+        self.dropped = 0
+
+
+class RoomStats:
+    __slots__ = ("broadcasts", "fanout_seconds_total", "fanout_seconds_max", "dropped", "evicted")
 
     def __init__(self):
-        self.active_connections: dict[int, list[WebSocket]] = defaultdict(list)
+        self.broadcasts = 0
+        self.fanout_seconds_total = 0.0
+        self.fanout_seconds_max = 0.0
+        self.dropped = 0
+        self.evicted = 0
+
+
+class ConnectionManager:
+    """
+    Manages active WebSocket connections per chat room. Broadcasts go through
+    the broker, which delivers them to every worker with listeners in the room.
+
+    Local delivery never awaits a socket: each message is enqueued on every
+    connection's bounded queue and a per-connection writer task sends it, so one
+    slow client cannot hold up the room. A full queue is handled by the
+    slow-consumer policy (drop the oldest message, or disconnect the client);
+    sockets whose send fails are evicted.
+    """
+
+    def __init__(
+        self,
+        broker: InMemoryBroker | RedisBroker,
+        queue_size: int = 256,
+        slow_consumer_policy: str = "drop_oldest",
+    ):
+        self.active_connections: dict[int, dict[WebSocket, ClientConnection]] = {}
+        self.broker = broker
+        self.queue_size = queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.room_stats: dict[int, RoomStats] = {}
+        self._room_locks: dict[int, asyncio.Lock] = {}
 
     async def connect(self, websocket: WebSocket, room_id: int):
+        """
+        Accept and register a socket. The first socket of a room subscribes it on the
+        broker before being registered, so a failed subscribe leaves nothing behind and
+        the next socket tries again; the socket is then closed and the error raised.
+        """
         await websocket.accept()
-        self.active_connections[room_id].append(websocket)
+        conn = ClientConnection(websocket, room_id, self.queue_size)
+        # Per room, so a first socket's subscribe and a last socket's unsubscribe never interleave.
+        async with self._room_locks.setdefault(room_id, asyncio.Lock()):
+            if room_id not in self.active_connections:
+                try:
+                    await self.broker.subscribe(room_id, self._deliver)
+                except Exception:
+                    await websocket.close(code=1011, reason="Chat is unavailable")
+                    raise
+                self.active_connections[room_id] = {}
+                self.room_stats.setdefault(room_id, RoomStats())
+            self.active_connections[room_id][websocket] = conn
+        conn.writer = asyncio.create_task(self._write(conn))
 
-    def disconnect(self, websocket: WebSocket, room_id: int):
-        self.active_connections[room_id].remove(websocket)
-        if not self.active_connections[room_id]:
-            del self.active_connections[room_id]
+    async def disconnect(self, websocket: WebSocket, room_id: int):
+        connections = self.active_connections.get(room_id)
+        conn = connections.pop(websocket, None) if connections is not None else None
+        if conn is None:
+            return
+        if conn.writer is not None and conn.writer is not asyncio.current_task():
+            conn.writer.cancel()
+        if not connections:
+            async with self._room_locks.setdefault(room_id, asyncio.Lock()):
+                # A socket may have joined while this waited for the lock.
+                if not connections and self.active_connections.get(room_id) is connections:
+                    del self.active_connections[room_id]
+                    self.room_stats.pop(room_id, None)
+                    await self.broker.unsubscribe(room_id)
 
     async def broadcast(self, room_id: int, message: dict):
-        for connection in self.active_connections.get(room_id, []):
+        await self.broker.publish(room_id, message)
+
+    async def _deliver(self, room_id: int, text: str):
+        """Enqueue a brokered, already-serialized message for every local socket in the room."""
+        connections = self.active_connections.get(room_id)
+        if not connections:
+            return
+        stats = self.room_stats[room_id]
+        start = time.perf_counter()
+        slow: list[ClientConnection] = []
+        for conn in connections.values():
             try:
-                await connection.send_json(message)
-            except Exception:
-                pass  # silently skip disconnected clients
+                conn.queue.put_nowait(text)
+            except asyncio.QueueFull:
+                if self.slow_consumer_policy == "disconnect":
+                    slow.append(conn)
+                    continue
+                conn.queue.get_nowait()
+                conn.queue.put_nowait(text)
+                conn.dropped += 1
+                stats.dropped += 1
+        elapsed = time.perf_counter() - start
+        stats.broadcasts += 1
+        stats.fanout_seconds_total += elapsed
+        stats.fanout_seconds_max = max(stats.fanout_seconds_max, elapsed)
+        for conn in slow:
+            await self._evict(conn, code=1013, reason="Client too slow")
+
+    async def _write(self, conn: ClientConnection):
+        try:
+            while True:
+                text = await conn.queue.get()
+                await conn.websocket.send_text(text)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.info("Evicting chat socket in room %s after send failure: %s", conn.room_id, exc)
+            await self._evict(conn)
 
+    async def _evict(self, conn: ClientConnection, code: int = 1011, reason: str = ""):
+        stats = self.room_stats.get(conn.room_id)
+        if stats is not None:
+            stats.evicted += 1
+        await self.disconnect(conn.websocket, conn.room_id)
+        try:
+            await conn.websocket.close(code=code, reason=reason)
+        except Exception:
+            pass  # already gone
 
-manager = ConnectionManager()
+    def stats(self) -> dict[str, Any]:
+        """Per-room connection count, outbound queue depth and fan-out latency."""
+        rooms = {}
+        for room_id, connections in self.active_connections.items():
+            stats = self.room_stats[room_id]
+            depths = [conn.queue.qsize() for conn in connections.values()]
+            rooms[room_id] = {
+                "connections": len(connections),
+                "queue_depth": sum(depths),
+                "queue_depth_max": max(depths, default=0),
+                "broadcasts": stats.broadcasts,
+                "fanout_ms_avg": round(stats.fanout_seconds_total / stats.broadcasts * 1000, 3)
+                if stats.broadcasts else 0.0,
+                "fanout_ms_max": round(stats.fanout_seconds_max * 1000, 3),
+                "dropped": stats.dropped,
+                "evicted": stats.evicted,
+            }
+        return rooms
+
+    async def close(self):
+        for room_id, connections in list(self.active_connections.items()):
+            for websocket in list(connections):
+                await self.disconnect(websocket, room_id)
+        await self.broker.close()
+
+
+manager = ConnectionManager(
+    build_broker(settings.CHAT_BROKER, settings.REDIS_URL),
+    queue_size=settings.CHAT_SEND_QUEUE_SIZE,
+    slow_consumer_policy=settings.CHAT_SLOW_CONSUMER_POLICY,
+)
+
+message_writer = MessageWriter(
+    AsyncSessionLocal,
+    batch_size=settings.CHAT_WRITE_BATCH_SIZE,
+    flush_interval=settings.CHAT_WRITE_FLUSH_MS / 1000,
+    buffer_size=settings.CHAT_WRITE_BUFFER_SIZE,
+    drain_timeout=settings.CHAT_WRITE_DRAIN_TIMEOUT_SECONDS,
+)
 
 
 # ─── Chat Rooms ────────────────────────────────────────────
@@ -70,17 +232,19 @@ async def get_user_rooms(db: AsyncSession, user_id: int) -> list[ChatRoom]:
     return list(result.scalars().all())
 
 
+MESSAGE_SORT_KEYS = (ChatMessage.sent_at, ChatMessage.id)
+LEAVE_SORT_KEYS = (Leave.created_at, Leave.id)
+
+
 async def get_room_messages(
-    db: AsyncSession, room_id: int, skip: int = 0, limit: int = 50
-) -> list[ChatMessage]:
-    result = await db.execute(
-        select(ChatMessage)
-        .where(ChatMessage.room_id == room_id)
-        .order_by(ChatMessage.sent_at.desc())
-        .offset(skip)
-        .limit(limit)
-    )
-    return list(result.scalars().all())
+    db: AsyncSession, room_id: int, skip: int = 0, limit: int = 50, cursor: str | None = None,
+) -> tuple[list[ChatMessage], str | None]:
+    """Newest messages first; the cursor walks back through history."""
+    result = await db.execute(paginate(
+        select(ChatMessage).where(ChatMessage.room_id == room_id),
+        MESSAGE_SORT_KEYS, descending=True, cursor=cursor, skip=skip, limit=limit,
+    ))
+    return next_page(result.scalars().all(), MESSAGE_SORT_KEYS, limit)
 
 
 async def save_message(
@@ -124,12 +288,14 @@ async def review_leave(
 
 async def get_leaves(
     db: AsyncSession, user_id: int | None = None, status: LeaveStatus | None = None,
-    skip: int = 0, limit: int = 50,
-) -> list[Leave]:
+    skip: int = 0, limit: int = 50, cursor: str | None = None,
+) -> tuple[list[Leave], str | None]:
     query = select(Leave)
     if user_id:
         query = query.where(Leave.applicant_id == user_id)
     if status:
         query = query.where(Leave.status == status)
-    result = await db.execute(query.order_by(Leave.created_at.desc()).offset(skip).limit(limit))
-    return list(result.scalars().all())
+    result = await db.execute(
+        paginate(query, LEAVE_SORT_KEYS, descending=True, cursor=cursor, skip=skip, limit=limit)
+    )
+    return next_page(result.scalars().all(), LEAVE_SORT_KEYS, limit)
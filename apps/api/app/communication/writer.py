@@ -0,0 +1,192 @@
+"""
+Write-behind persistence for WebSocket chat messages.
+
+The socket handler only enqueues; a single background task per worker drains
+the buffer and writes messages from every room in batches, one multi-row
+INSERT per batch, flushing when the batch is full or the time window closes.
+
+Delivery is at-least-once: while a failure is one that can pass on its own
+(the database unreachable or busy, a dropped connection) the batch stays in
+hand and is retried with backoff, so an outage delays persistence rather than
+losing messages (a retry after a commit whose acknowledgement was lost can
+store a message twice). Any other error means a row the database will never
+accept, such as an unknown sender or a value of the wrong type: the batch is
+written row by row and those rows are dropped, so they cannot block the queue.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError, DisconnectionError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.communication.models import ChatMessage
+
+logger = logging.getLogger("ums.chat")
+
+# Failures worth waiting out: the server is down, busy or locked, the connection
+# dropped, or no pooled connection came free in time.
+_TRANSIENT_ERRORS = (OperationalError, DisconnectionError, PoolTimeoutError, OSError)
+
+
+def _is_transient(exc: Exception) -> bool:
+    return isinstance(exc, _TRANSIENT_ERRORS) or (isinstance(exc, DBAPIError) and exc.connection_invalidated)
+
+
+class MessageWriter:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        batch_size: int = 200,
+        flush_interval: float = 0.1,
+        buffer_size: int = 10_000,
+        drain_timeout: float = 10.0,
+        max_backoff: float = 5.0,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self.drain_timeout = drain_timeout
+        self.max_backoff = max_backoff
+        self._queue: asyncio.Queue[dict[str, Any]] | None = None
+        self._task: asyncio.Task | None = None
+        self._closing = False
+
+        # Metrics
+        self.enqueued = 0
+        self.written = 0
+        self.rejected = 0
+        self.batches = 0
+        self.retries = 0
+        self.flush_seconds_total = 0.0
+        self.flush_seconds_max = 0.0
+        self._recent: deque[float] = deque(maxlen=1024)
+
+    def _ensure_started(self) -> asyncio.Queue[dict[str, Any]]:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.buffer_size)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="chat-message-writer")
+        return self._queue
+
+    async def enqueue(self, room_id: int, sender_id: int, content: str) -> None:
+        """
+        Buffer a message for persistence. sent_at is stamped now, so stored order
+        matches arrival order regardless of when the batch is flushed. Waits only
+        when the buffer is full, which pushes back on the sending socket alone.
+        """
+        if self._closing:
+            raise RuntimeError("Message writer is shut down")
+        await self._ensure_started().put({
+            "room_id": room_id,
+            "sender_id": sender_id,
+            "content": content,
+            "sent_at": datetime.now(timezone.utc),
+        })
+        self.enqueued += 1
+
+    async def _run(self) -> None:
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except TimeoutError:
+                    break
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _flush(self, batch: list[dict[str, Any]]) -> None:
+        start = time.perf_counter()
+        if await self._insert_retrying(batch) is not None:
+            await self._insert_individually(batch)
+        elapsed = time.perf_counter() - start
+        self.batches += 1
+        self.flush_seconds_total += elapsed
+        self.flush_seconds_max = max(self.flush_seconds_max, elapsed)
+        self._recent.append(elapsed)
+
+    async def _insert_retrying(self, rows: list[dict[str, Any]]) -> Exception | None:
+        """Insert, retrying with backoff while the failure is transient; any other error is returned."""
+        backoff = 0.1
+        while True:
+            try:
+                await self._insert(rows)
+                return None
+            except Exception as exc:
+                if not _is_transient(exc):
+                    return exc
+                self.retries += 1
+                logger.warning(
+                    "Chat message flush of %d rows failed, retrying in %.1fs: %s",
+                    len(rows), backoff, exc,
+                )
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    async def _insert(self, rows: list[dict[str, Any]]) -> None:
+        async with self.session_factory() as session, session.begin():
+            await session.execute(insert(ChatMessage).values(rows))
+        self.written += len(rows)
+
+    async def _insert_individually(self, batch: list[dict[str, Any]]) -> None:
+        """A batch hit a row the database rejects: write row by row so one bad message can't block the rest."""
+        for row in batch:
+            exc = await self._insert_retrying([row])
+            if exc is not None:
+                self.rejected += 1
+                logger.error(
+                    "Dropping chat message for room %s from sender %s: %s",
+                    row["room_id"], row["sender_id"], getattr(exc, "orig", None) or exc,
+                )
+
+    def stats(self) -> dict[str, Any]:
+        recent = sorted(self._recent)
+        return {
+            "buffered": self._queue.qsize() if self._queue is not None else 0,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "retries": self.retries,
+            "flush_ms_avg": round(self.flush_seconds_total / self.batches * 1000, 3)
+            if self.batches else 0.0,
+            "flush_ms_p95": round(recent[int(0.95 * (len(recent) - 1))] * 1000, 3) if recent else 0.0,
+            "flush_ms_max": round(self.flush_seconds_max * 1000, 3),
+        }
+
+    async def close(self) -> None:
+        """Stop accepting messages and flush everything still buffered."""
+        self._closing = True
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), self.drain_timeout)
+        except TimeoutError:
+            logger.error(
+                "Chat message writer did not drain within %.0fs; %d messages not persisted",
+                self.drain_timeout, self._queue.qsize(),
+            )
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
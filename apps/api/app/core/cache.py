@@ -0,0 +1,350 @@
+"""
+Caching primitives: in-process LRU/TTL cache, the authenticated-principal cache,
+the read-your-writes recent-writer set and the per-table version counters
+behind HTTP validators.
+"""
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from app.core.config import get_settings
+from app.users.models import UserRole
+
+settings = get_settings()
+logger = logging.getLogger("ums.cache")
+
+
+# ─── In-Process LRU + TTL ─────────────────────────────────
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a TTL or at an absolute deadline."""
+
+    def __init__(self, max_entries: int, ttl: float | None = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Any) -> Any | None:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Any, value: Any, ttl: float | None = None, expires_at: float | None = None) -> None:
+        if self.max_entries <= 0:
+            return
+        if expires_at is None:
+            expires_at = time.time() + (ttl if ttl is not None else self.ttl or 0)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Any) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# ─── Principal Cache ──────────────────────────────────────
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Slim snapshot of an authenticated user, enough for authorization checks."""
+    id: int
+    role: UserRole
+    is_active: bool
+
+
+class MemoryPrincipalCache:
+    """
+    Per-process principal cache. Invalidation reaches this worker only; other workers
+    keep a deactivated or re-roled user's old principal until it expires.
+    """
+
+    def __init__(self, max_entries: int, ttl: int):
+        self._cache = TTLCache(max_entries, ttl)
+
+    async def get(self, user_id: int) -> Principal | None:
+        return self._cache.get(user_id)
+
+    async def set(self, principal: Principal) -> None:
+        self._cache.set(principal.id, principal)
+
+    async def invalidate(self, user_id: int) -> None:
+        self._cache.delete(user_id)
+
+    async def close(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {"backend": "memory", **self._cache.stats()}
+
+
+class RedisPrincipalCache:
+    """Principal cache shared by all workers through Redis. Redis errors degrade to misses."""
+
+    KEY_PREFIX = "ums:principal:"
+
+    def __init__(self, url: str, ttl: int):
+        from redis.asyncio import Redis
+
+        self._redis = Redis.from_url(url, decode_responses=True)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, user_id: int) -> Principal | None:
+        try:
+            raw = await self._redis.get(f"{self.KEY_PREFIX}{user_id}")
+        except Exception as exc:
+            logger.warning("Principal cache read failed: %s", exc)
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        role, is_active = raw.split("|")
+        return Principal(id=user_id, role=UserRole(role), is_active=is_active == "1")
+
+    async def set(self, principal: Principal) -> None:
+        value = f"{principal.role.value}|{int(principal.is_active)}"
+        try:
+            await self._redis.set(f"{self.KEY_PREFIX}{principal.id}", value, ex=self.ttl)
+        except Exception as exc:
+            logger.warning("Principal cache write failed: %s", exc)
+
+    async def invalidate(self, user_id: int) -> None:
+        try:
+            await self._redis.delete(f"{self.KEY_PREFIX}{user_id}")
+        except Exception as exc:
+            logger.error("Principal cache invalidation failed for user %s: %s", user_id, exc)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _build_principal_cache() -> MemoryPrincipalCache | RedisPrincipalCache:
+    if settings.CACHE_BACKEND == "redis":
+        return RedisPrincipalCache(settings.REDIS_URL, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+    return MemoryPrincipalCache(
+        settings.PRINCIPAL_CACHE_MAX_ENTRIES, settings.PRINCIPAL_CACHE_TTL_SECONDS
+    )
+
+
+principal_cache = _build_principal_cache()
+
+
+# ─── Recent Writers ───────────────────────────────────────
+class MemoryRecentWriters:
+    """Users who committed a write within the read-your-writes window, on this worker."""
+
+    def __init__(self, max_entries: int, window: int):
+        self._cache = TTLCache(max_entries, window)
+
+    async def mark(self, user_id: int) -> None:
+        self._cache.set(user_id, True)
+
+    async def contains(self, user_id: int) -> bool:
+        return self._cache.get(user_id) is not None
+
+    async def close(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {"backend": "memory", "size": len(self._cache)}
+
+
+class RedisRecentWriters:
+    """
+    Recent writers shared by all workers, so a read that lands on another
+    worker still sees the user's write. Redis errors count as a recent write:
+    the read goes to the primary.
+    """
+
+    KEY_PREFIX = "ums:wrote:"
+
+    def __init__(self, url: str, window: int):
+        from redis.asyncio import Redis
+
+        self._redis = Redis.from_url(url, decode_responses=True)
+        self.window = window
+
+    async def mark(self, user_id: int) -> None:
+        try:
+            await self._redis.set(f"{self.KEY_PREFIX}{user_id}", 1, ex=self.window)
+        except Exception as exc:
+            logger.warning("Recent-writer mark failed for user %s: %s", user_id, exc)
+
+    async def contains(self, user_id: int) -> bool:
+        try:
+            return bool(await self._redis.exists(f"{self.KEY_PREFIX}{user_id}"))
+        except Exception as exc:
+            logger.warning("Recent-writer lookup failed: %s", exc)
+            return True
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        return {"backend": "redis"}
+
+
+def _build_recent_writers() -> MemoryRecentWriters | RedisRecentWriters:
+    if settings.CACHE_BACKEND == "redis":
+        return RedisRecentWriters(settings.REDIS_URL, settings.READ_YOUR_WRITES_SECONDS)
+    return MemoryRecentWriters(settings.PRINCIPAL_CACHE_MAX_ENTRIES, settings.READ_YOUR_WRITES_SECONDS)
+
+
+recent_writers = _build_recent_writers()
+
+
+# ─── Table Versions ───────────────────────────────────────
+@dataclass(frozen=True, slots=True)
+class TableVersion:
+    """Change token ("<epoch>.<counter>") and last-change time (epoch seconds) of one table."""
+    token: str
+    modified: float
+
+    def follows(self, previous: str) -> bool:
+        """True if this is the very next version after token `previous`."""
+        epoch, count = self.token.rsplit(".", 1)
+        previous_epoch, previous_count = previous.rsplit(".", 1)
+        return epoch == previous_epoch and int(count) == int(previous_count) + 1
+
+
+class MemoryTableVersions:
+    """
+    Per-table change counters for HTTP validators, on this worker. Counters
+    start from a boot epoch, so a restart never reissues an old ETag. Only
+    correct with a single worker: another worker's writes are not seen here.
+    """
+
+    def __init__(self):
+        self._epoch = f"{time.time_ns():x}"
+        self._booted_at = time.time()
+        self._versions: dict[str, TableVersion] = {}
+
+    async def get(self, tables: tuple[str, ...]) -> list[TableVersion] | None:
+        default = TableVersion(f"{self._epoch}.0", self._booted_at)
+        return [self._versions.get(table, default) for table in tables]
+
+    async def bump(self, *tables: str) -> list[TableVersion] | None:
+        """Advance each table's version; returns the new versions."""
+        now = time.time()
+        for table in tables:
+            current = self._versions.get(table)
+            count = int(current.token.rsplit(".", 1)[1]) + 1 if current else 1
+            self._versions[table] = TableVersion(f"{self._epoch}.{count}", now)
+        return [self._versions[table] for table in tables]
+
+    async def close(self) -> None:
+        self._versions.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {"backend": "memory", "tables": {t: v.token for t, v in self._versions.items()}}
+
+
+class RedisTableVersions:
+    """
+    Per-table change counters shared by all workers, in two Redis hashes. The
+    epoch field is recreated if Redis loses the hash, so counters that restart
+    from zero never collide with ETags issued before. Redis errors return None:
+    no validators are sent and every request is a full 200.
+    """
+
+    VERSIONS_KEY = "ums:table_versions"
+    MODIFIED_KEY = "ums:table_modified"
+    EPOCH_FIELD = "__epoch__"
+
+    def __init__(self, url: str):
+        from redis.asyncio import Redis
+
+        self._redis = Redis.from_url(url, decode_responses=True)
+
+    async def get(self, tables: tuple[str, ...]) -> list[TableVersion] | None:
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.hmget(self.VERSIONS_KEY, [self.EPOCH_FIELD, *tables])
+                pipe.hmget(self.MODIFIED_KEY, [self.EPOCH_FIELD, *tables])
+                (epoch, *counts), (created, *modified) = await pipe.execute()
+            if epoch is None or created is None:
+                await self._redis.hsetnx(self.VERSIONS_KEY, self.EPOCH_FIELD, f"{time.time_ns():x}")
+                await self._redis.hsetnx(self.MODIFIED_KEY, self.EPOCH_FIELD, time.time())
+                epoch = await self._redis.hget(self.VERSIONS_KEY, self.EPOCH_FIELD)
+                created = await self._redis.hget(self.MODIFIED_KEY, self.EPOCH_FIELD)
+        except Exception as exc:
+            logger.warning("Table version read failed: %s", exc)
+            return None
+        return [
+            TableVersion(f"{epoch}.{count or 0}", float(changed or created))
+            for count, changed in zip(counts, modified)
+        ]
+
+    async def bump(self, *tables: str) -> list[TableVersion] | None:
+        """Advance each table's version; returns the new versions, or None if unknown."""
+        now = time.time()
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.hget(self.VERSIONS_KEY, self.EPOCH_FIELD)
+                for table in tables:
+                    pipe.hincrby(self.VERSIONS_KEY, table, 1)
+                    pipe.hset(self.MODIFIED_KEY, table, now)
+                epoch, *replies = await pipe.execute()
+        except Exception as exc:
+            logger.error("Table version bump failed for %s: %s", ", ".join(tables), exc)
+            return None
+        if epoch is None:
+            return None  # hash lost: the next get() starts a new epoch
+        return [TableVersion(f"{epoch}.{count}", now) for count in replies[::2]]
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        return {"backend": "redis"}
+
+
+def _build_table_versions() -> MemoryTableVersions | RedisTableVersions:
+    if settings.CACHE_BACKEND == "redis":
+        return RedisTableVersions(settings.REDIS_URL)
+    return MemoryTableVersions()
+
+
+table_versions = _build_table_versions()
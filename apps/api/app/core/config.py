@@ -18,13 +18,84 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # ─── Password Hashing ──────────────────────────────────
+    HASH_EXECUTOR: str = "thread"  # "thread" or "process"
+    HASH_WORKERS: int = 4
+    HASH_QUEUE_SIZE: int = 64
+    HASH_RETRY_AFTER_SECONDS: int = 1
+
     # ─── Database ──────────────────────────────────────────
     DATABASE_URL: str = "sqlite+aiosqlite:///./ums_dev.db"
     DATABASE_ECHO: bool = False
+    # Pool settings left as None use the preset for the URL's dialect (POOL_PRESETS in
+    # app.core.database). DATABASE_POOL_SIZE=0 disables pooling.
+    DATABASE_POOL_SIZE: int | None = None
+    DATABASE_MAX_OVERFLOW: int | None = None
+    DATABASE_POOL_TIMEOUT_SECONDS: float | None = None
+    DATABASE_POOL_RECYCLE_SECONDS: int | None = None
+    DATABASE_POOL_PRE_PING: bool | None = None
+    ASYNCPG_STATEMENT_CACHE_SIZE: int = 500  # 0 for PgBouncer transaction pooling
+    ASYNCPG_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+    SQLITE_JOURNAL_MODE: str = "WAL"  # readers no longer block the writer
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # wait this long for a lock before "database is locked"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # durable in WAL mode except on power loss
+    SQLITE_MMAP_SIZE_MB: int = 256
+    SQLITE_CACHE_SIZE_MB: int = 64  # page cache per connection
+
+    # ─── Read Replicas ─────────────────────────────────────
+    DATABASE_REPLICA_URLS: list[str] = []  # read-only replicas for get_read_db; empty = primary only
+    REPLICA_MAX_LAG_SECONDS: float = 5.0  # replicas further behind are skipped
+    REPLICA_RECHECK_SECONDS: float = 5.0  # lag re-probe interval, and how long a failed replica is benched
+    REPLICA_CONNECT_TIMEOUT_SECONDS: float = 2.0
+    READ_YOUR_WRITES_SECONDS: int = 10  # a user's reads go to the primary this long after they write
+
+    # ─── Startup ───────────────────────────────────────────
+    STARTUP_SCHEMA_MODE: str = "create"  # "create" (dev), "verify" (against Alembic head) or "skip"
+    STARTUP_WARM_CONNECTIONS: int = 4  # pool connections opened before serving; 0 disables
+    STARTUP_WARM_STATEMENTS: bool = True  # run the hot queries once so they are compiled and cached
 
     # ─── Redis ─────────────────────────────────────────────
     REDIS_URL: str = "redis://localhost:6379/0"
 
+    # ─── Caching ───────────────────────────────────────────
+    CACHE_BACKEND: str = "memory"  # "memory" or "redis"
+    # With "memory" each worker caches principals on its own: deactivating a user or
+    # changing their role is seen at once by the worker that made the change, and by
+    # the others only when their entry expires, up to PRINCIPAL_CACHE_TTL_SECONDS
+    # later. Run more than one worker with "redis" (or a shorter TTL) where that matters.
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10_000
+    TOKEN_CACHE_MAX_ENTRIES: int = 10_000  # 0 disables the verified-token cache
+    HTTP_VALIDATORS_ENABLED: bool = True  # ETag / Last-Modified on catalog GETs
+    CATALOG_MAX_AGE_SECONDS: int = 60  # browser freshness of the course catalog
+    RESPONSE_CACHE_MAX_ENTRIES: int = 5_000  # in-process bodies; 0 disables (memory backend)
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+    RESPONSE_CACHE_LOCK_SECONDS: float = 5.0  # how long other workers wait for a recompute
+
+    # ─── Chat ──────────────────────────────────────────────
+    CHAT_BROKER: str = "memory"  # "memory" (single process) or "redis" (multi-worker)
+    CHAT_SEND_QUEUE_SIZE: int = 256  # outbound messages buffered per socket
+    CHAT_SLOW_CONSUMER_POLICY: str = "drop_oldest"  # "drop_oldest" or "disconnect"
+    CHAT_WRITE_BATCH_SIZE: int = 200  # messages per multi-row INSERT
+    CHAT_WRITE_FLUSH_MS: int = 100  # max time a message waits in the write buffer
+    CHAT_WRITE_BUFFER_SIZE: int = 10_000  # enqueue waits when this many are unsaved
+    CHAT_WRITE_DRAIN_TIMEOUT_SECONDS: int = 10
+
+    # ─── Background Jobs ───────────────────────────────────
+    JOB_TTL_SECONDS: int = 86_400  # finished job status is kept this long
+    SOLVER_WORKERS: int = 4  # processes for timetable and allocation solvers; 0 solves in a thread
+    TIMETABLE_IMPROVE_SECONDS: float = 10.0  # local-repair budget per solve after a clash-free placement
+
+    # ─── Observability ─────────────────────────────────────
+    QUERY_TIMING_ENABLED: bool = True  # per-request SQL stats in a Server-Timing header
+    SLOW_QUERY_MS: int = 200  # log any statement slower than this
+    SLOW_REQUEST_MS: int = 1000  # log requests slower than this...
+    SLOW_REQUEST_QUERIES: int = 50  # ...or issuing at least this many statements
+    METRICS_ENABLED: bool = True  # Prometheus text format at GET /metrics
+
+    # ─── Serialization ─────────────────────────────────────
+    FAST_JSON: bool = True  # orjson as the default response class when installed
+
     # ─── CORS ──────────────────────────────────────────────
     CORS_ORIGINS: list[str] = [
         "http://localhost:3000",
@@ -1,6 +1,7 @@
 """
-FastAPI dependencies: authentication, authorization, DB session.
+FastAPI dependencies: authentication, authorization, DB sessions.
 """
+from functools import partial
 from typing import Annotated
 
 import jwt
@@ -8,20 +9,29 @@ from fastapi import Depends, Header
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import Principal, principal_cache
 from app.core.config import get_settings
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal, after_commit, get_db
 from app.core.exceptions import ForbiddenException, UnauthorizedException
+from app.core.replicas import record_write, replica_router
 from app.core.security import decode_token
 from app.users.models import User, UserRole
 
 settings = get_settings()
 
 
+def principal_query(user_id: int):
+    return select(User.id, User.role, User.is_active).where(User.id == user_id)
+
+
 async def get_current_user(
     authorization: Annotated[str, Header()],
     db: AsyncSession = Depends(get_db),
-) -> User:
-    """Extract and validate the current user from the Authorization header."""
+) -> Principal:
+    """
+    Extract and validate the current user from the Authorization header.
+    Returns a cached Principal snapshot; the users table is only read on a cache miss.
+    """
     if not authorization.startswith("Bearer "):
         raise UnauthorizedException("Invalid authorization header format")
 
@@ -38,21 +48,39 @@ async def get_current_user(
     except jwt.PyJWTError:
         raise UnauthorizedException("Could not validate token")
 
-    result = await db.execute(select(User).where(User.id == int(user_id)))
-    user = result.scalar_one_or_none()
-    if user is None:
-        raise UnauthorizedException("User not found")
-    if not user.is_active:
+    principal = await principal_cache.get(int(user_id))
+    if principal is None:
+        # A session of its own, closed before the endpoint runs: the request's get_db or
+        # get_read_db session connects later, so a request never holds two connections.
+        async with AsyncSessionLocal() as session:
+            row = (await session.execute(principal_query(int(user_id)))).one_or_none()
+        if row is None:
+            raise UnauthorizedException("User not found")
+        principal = Principal(id=row.id, role=row.role, is_active=row.is_active)
+        await principal_cache.set(principal)
+    if not principal.is_active:
         raise ForbiddenException("User account is deactivated")
-    return user
+    if replica_router.enabled:
+        after_commit(db, partial(record_write, db, principal.id))
+    return principal
+
+
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 
-CurrentUser = Annotated[User, Depends(get_current_user)]
+async def get_read_db(user: CurrentUser) -> AsyncSession:  # type: ignore[misc]
+    """
+    Dependency: a read-only session for GET endpoints. Served by a replica when
+    DATABASE_REPLICA_URLS is set, unless this user wrote within
+    READ_YOUR_WRITES_SECONDS. Never commits.
+    """
+    async with replica_router.session(user.id) as session:
+        yield session
 
 
 def require_role(*roles: UserRole):
     """Dependency factory: ensures current user has one of the allowed roles."""
-    async def _check_role(user: CurrentUser) -> User:
+    async def _check_role(user: CurrentUser) -> Principal:
         if user.role not in roles:
             raise ForbiddenException(
                 f"Role '{user.role.value}' not allowed. Required: {[r.value for r in roles]}"
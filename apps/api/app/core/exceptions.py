@@ -33,3 +33,10 @@ class ConflictException(UMSException):
 class ValidationException(UMSException):
     def __init__(self, detail: str = "Validation error"):
         super().__init__(detail=detail, status_code=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+
+class ServiceUnavailableException(UMSException):
+    def __init__(self, detail: str = "Service temporarily unavailable", retry_after: int | None = None):
+        super().__init__(detail=detail, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+        if retry_after is not None:
+            self.headers = {"Retry-After": str(retry_after)}
@@ -0,0 +1,80 @@
+"""
+Conditional GETs for resources that change rarely but are fetched on every page load.
+
+A cached route names the tables its body is built from. Its ETag hashes the
+request path and query, the caller (for per-user bodies) and those tables'
+version tokens; Last-Modified is the latest of their change times. Service
+functions bump the versions once their write has committed
+(`after_commit(db, partial(table_versions.bump, ...))`), so revalidating is
+answered from the counters alone: the principal comes from the principal cache
+and no session is used, i.e. a 304 costs zero database queries.
+
+Writes that bypass the service functions (seed script, migrations, manual SQL)
+do not bump anything; restart the workers (memory backend) or delete the
+ums:table_versions hash (redis backend) afterwards.
+"""
+import hashlib
+import time
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import HTTPException, Request, Response
+
+from app.core.cache import table_versions
+from app.core.config import get_settings
+from app.core.deps import CurrentUser
+from app.core.replicas import replica_router
+
+settings = get_settings()
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison, as RFC 9110 prescribes for If-None-Match."""
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def _unmodified_since(header: str, modified: float) -> bool:
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(modified) <= since  # HTTP dates have one-second resolution
+
+
+def conditional_get(*tables: str, cache_control: str, per_user: bool = False):
+    """
+    Dependency factory for GET routes whose body only depends on `tables` (and
+    on the caller, with per_user). Raises a bodiless 304 when the request's
+    If-None-Match (or, without it, If-Modified-Since) is current. Otherwise sets
+    ETag, Last-Modified, Cache-Control and Vary on the injected response and
+    returns them, for routes that build their own Response (rows_response).
+
+    Declare it before the session dependency, so a 304 never checks one out.
+    """
+    async def _conditional(request: Request, response: Response, user: CurrentUser) -> dict[str, str]:
+        headers = {"Cache-Control": cache_control, "Vary": "Authorization"}
+        versions = await table_versions.get(tables) if settings.HTTP_VALIDATORS_ENABLED else None
+        if versions is not None:
+            modified = max(version.modified for version in versions)
+            # A replica may still return the previous rows under the new version:
+            # send no validators until it can have caught up.
+            if not (replica_router.enabled and time.time() - modified < settings.REPLICA_MAX_LAG_SECONDS):
+                key = "|".join([
+                    request.url.path, request.url.query, str(user.id) if per_user else "",
+                    *(version.token for version in versions),
+                ])
+                headers["ETag"] = f'"{hashlib.blake2b(key.encode(), digest_size=12).hexdigest()}"'
+                headers["Last-Modified"] = formatdate(modified, usegmt=True)
+
+                if_none_match = request.headers.get("if-none-match")
+                if_modified_since = request.headers.get("if-modified-since")
+                if (_etag_matches(if_none_match, headers["ETag"]) if if_none_match is not None
+                        else if_modified_since is not None and _unmodified_since(if_modified_since, modified)):
+                    raise HTTPException(status_code=304, headers=headers)
+
+        response.headers.update(headers)
+        return headers
+
+    return _conditional
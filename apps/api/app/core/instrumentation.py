@@ -0,0 +1,138 @@
+"""
+Per-request SQL instrumentation: statement count, DB time and the slowest
+statement, reported in a Server-Timing header and logged when a request or
+statement crosses the configured thresholds.
+
+The engine hooks cost two perf_counter() calls and a ContextVar lookup per
+statement; SQL is only normalized when something is actually logged.
+"""
+import logging
+import re
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger("ums.sql")
+
+
+class QueryStats:
+    """Statements executed while handling one request."""
+
+    __slots__ = ("count", "db_seconds", "slowest_seconds", "slowest_sql")
+
+    def __init__(self):
+        self.count = 0
+        self.db_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_sql = ""
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.db_seconds += elapsed
+        if elapsed > self.slowest_seconds:
+            self.slowest_seconds = elapsed
+            self.slowest_sql = statement
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("ums_query_stats", default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PARAM = r"(?:\?|%s|\$\d+|:\w+)"
+_IN_LIST = re.compile(rf"\bIN\s*\(\s*{_PARAM}(?:\s*,\s*{_PARAM})*\s*\)", re.IGNORECASE)
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse whitespace, literals and IN-lists so equivalent statements read the same."""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    return _IN_LIST.sub("IN (...)", sql)
+
+
+# ─── Engine Hooks ──────────────────────────────────────────
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    elif elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        # Background work (chat writer, startup) has no request to attach to.
+        logger.warning("Slow query outside a request (%.1f ms): %s", elapsed * 1000, normalize_sql(statement))
+
+
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach the timing hooks to a (sync) engine; use engine.sync_engine for async engines."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+# ─── ASGI Middleware ──────────────────────────────────────
+class QueryTimingMiddleware:
+    """
+    Attributes SQL executed during an HTTP request to that request. Adds
+    `Server-Timing: db;dur=..;desc="N queries", db-slowest;dur=.., app;dur=..`
+    and logs requests that exceed SLOW_REQUEST_MS / SLOW_REQUEST_QUERIES or
+    contain a statement slower than SLOW_QUERY_MS.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - start) * 1000
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.count} queries", '
+                    f"db-slowest;dur={stats.slowest_seconds * 1000:.2f}, app;dur={total_ms:.2f}"
+                )
+                message["headers"] = [*message.get("headers", ()), (b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self._log_if_slow(scope, stats, (time.perf_counter() - start) * 1000)
+
+    @staticmethod
+    def _log_if_slow(scope: Scope, stats: QueryStats, total_ms: float):
+        slowest_ms = stats.slowest_seconds * 1000
+        if (
+            total_ms < settings.SLOW_REQUEST_MS
+            and stats.count < settings.SLOW_REQUEST_QUERIES
+            and slowest_ms < settings.SLOW_QUERY_MS
+        ):
+            return
+        logger.warning(
+            "Slow request %s %s: %.1f ms total, %d queries, %.1f ms in DB, slowest %.1f ms: %s",
+            scope["method"], scope["path"], total_ms, stats.count, stats.db_seconds * 1000,
+            slowest_ms, normalize_sql(stats.slowest_sql) if stats.slowest_sql else "-",
+        )
@@ -0,0 +1,201 @@
+"""
+Background jobs: long-running work started by a request and polled for progress.
+
+A job runs as an asyncio task in the worker that accepted it; its status
+(phase, progress, result or error) is kept in a store every worker can read:
+in process (CACHE_BACKEND=memory, single worker) or in Redis, so a poll that
+lands on another worker still finds it. Finished jobs are kept for
+JOB_TTL_SECONDS.
+
+CPU-bound steps of a job (the timetable and hostel allocation solvers) run in
+solver_pool, off the event loop.
+"""
+import asyncio
+import enum
+import json
+import logging
+import multiprocessing
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.exceptions import UMSException
+
+settings = get_settings()
+logger = logging.getLogger("ums.jobs")
+
+
+class JobStatus(str, enum.Enum):
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    key: str  # at most one running job per (kind, key)
+    created_by: int
+    status: JobStatus = JobStatus.RUNNING
+    phase: str = "queued"
+    progress: float = 0.0  # 0..1
+    detail: dict[str, Any] = field(default_factory=dict)
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+
+Progress = Callable[..., Awaitable[None]]  # await progress(phase, fraction, **detail)
+
+
+# ─── Stores ───────────────────────────────────────────────
+class MemoryJobStore:
+    """Job status on this worker only."""
+
+    def __init__(self, ttl: int):
+        self._jobs = TTLCache(10_000, ttl)
+
+    async def save(self, job: Job) -> None:
+        self._jobs.set(job.id, job)
+
+    async def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    async def close(self) -> None:
+        self._jobs.clear()
+
+
+class RedisJobStore:
+    """Job status shared by all workers. Redis errors are logged; the job itself keeps running."""
+
+    KEY_PREFIX = "ums:job:"
+
+    def __init__(self, url: str, ttl: int):
+        from redis.asyncio import Redis
+
+        self._redis = Redis.from_url(url, decode_responses=True)
+        self.ttl = ttl
+
+    async def save(self, job: Job) -> None:
+        try:
+            await self._redis.set(f"{self.KEY_PREFIX}{job.id}", json.dumps(asdict(job)), ex=self.ttl)
+        except Exception as exc:
+            logger.warning("Job status write failed for %s: %s", job.id, exc)
+
+    async def get(self, job_id: str) -> Job | None:
+        try:
+            raw = await self._redis.get(f"{self.KEY_PREFIX}{job_id}")
+        except Exception as exc:
+            logger.warning("Job status read failed for %s: %s", job_id, exc)
+            return None
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return Job(**{**data, "status": JobStatus(data["status"])})
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+# ─── Runner ───────────────────────────────────────────────
+class JobRunner:
+    """Starts jobs as tasks on this worker and records their progress in the store."""
+
+    def __init__(self, store: MemoryJobStore | RedisJobStore):
+        self.store = store
+        self._running: dict[tuple[str, str], asyncio.Task] = {}
+
+    def running(self, kind: str, key: str) -> bool:
+        return (kind, key) in self._running
+
+    async def submit(self, kind: str, key: str, created_by: int,
+                     work: Callable[[Progress], Awaitable[dict[str, Any]]]) -> Job:
+        """Start `work(progress)` in the background; its return value becomes the job result."""
+        job = Job(id=uuid.uuid4().hex, kind=kind, key=key, created_by=created_by)
+        await self.store.save(job)
+        task = asyncio.create_task(self._run(job, work), name=f"job-{kind}-{job.id}")
+        self._running[kind, key] = task
+        task.add_done_callback(lambda _: self._running.pop((kind, key), None))
+        return job
+
+    async def _run(self, job: Job, work: Callable[[Progress], Awaitable[dict[str, Any]]]) -> None:
+        async def progress(phase: str, fraction: float, **detail: Any) -> None:
+            job.phase, job.progress, job.updated_at = phase, round(min(max(fraction, 0.0), 1.0), 4), time.time()
+            job.detail.update(detail)
+            await self.store.save(job)
+
+        start = time.perf_counter()
+        try:
+            job.result = await work(progress)
+            job.status, job.phase, job.progress = JobStatus.SUCCEEDED, "done", 1.0
+        except asyncio.CancelledError:
+            job.status, job.error = JobStatus.FAILED, "Cancelled at shutdown"
+            raise
+        except UMSException as exc:  # an expected refusal: its detail is the message for the client
+            job.status, job.error = JobStatus.FAILED, exc.detail
+        except Exception as exc:
+            logger.error("Job %s (%s) failed: %s", job.id, job.kind, exc, exc_info=True)
+            job.status, job.error = JobStatus.FAILED, str(exc) or type(exc).__name__
+        finally:
+            job.updated_at = time.time()
+            job.detail["seconds"] = round(time.perf_counter() - start, 3)
+            await self.store.save(job)
+            logger.info("Job %s (%s) %s in %.1fs", job.id, job.kind, job.status.value, job.detail["seconds"])
+
+    async def get(self, job_id: str) -> Job | None:
+        return await self.store.get(job_id)
+
+    async def close(self) -> None:
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.store.close()
+
+    def stats(self) -> dict[str, Any]:
+        return {"running": [f"{kind}:{key}" for kind, key in self._running]}
+
+
+def _build_store() -> MemoryJobStore | RedisJobStore:
+    if settings.CACHE_BACKEND == "redis":
+        return RedisJobStore(settings.REDIS_URL, settings.JOB_TTL_SECONDS)
+    return MemoryJobStore(settings.JOB_TTL_SECONDS)
+
+
+jobs = JobRunner(_build_store())
+
+
+# ─── Solver pool ──────────────────────────────────────────
+class SolverPool:
+    """Processes running pure solver functions, started on first use. workers=0 runs them in the loop's thread pool."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor | None:
+        if self.workers <= 0:
+            return None
+        if self._executor is None:
+            # spawn, not fork: a forked copy of the server could inherit locks held by its other threads.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+solver_pool = SolverPool(settings.SOLVER_WORKERS)
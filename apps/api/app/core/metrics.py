@@ -0,0 +1,184 @@
+"""
+Minimal Prometheus-compatible metrics: counters, histograms and collect-time
+gauges, rendered in the text exposition format at GET /metrics.
+
+All observations happen on the event-loop thread (HTTP middleware, engine
+pool hooks running in SQLAlchemy's greenlets, the hasher after its executor
+returns), so series are plain dicts and lists with no locks. A series is
+created on its first observation; after that, observing is a dict lookup,
+a bisect and two in-place additions.
+"""
+from bisect import bisect_left
+from time import perf_counter
+from typing import Callable, Iterable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter; with `collect`, its values are derived at scrape time instead."""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (),
+                 collect: Callable[[], dict[tuple, float]] | None = None):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self.collect = collect
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        values = self.collect() if self.collect is not None else self._values
+        for labels, value in values.items():
+            yield f"{self.name}_total{_labels(self.labelnames, labels)} {value}"
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self.buckets = buckets
+        # Per series: one count per bucket plus +Inf, then sum, in one flat list.
+        self._series: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, labels: tuple = ()):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def counts(self, keep: Callable[[tuple], tuple]) -> dict[tuple, float]:
+        """Observation counts re-keyed by keep(labels) and summed."""
+        totals: dict[tuple, float] = {}
+        for labels, series in self._series.items():
+            key = keep(labels)
+            totals[key] = totals.get(key, 0) + sum(series[:-1])
+        return totals
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        bounds = [f'le="{b}"' for b in (*self.buckets, "+Inf")]
+        for labels, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, bound)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-1]}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Gauge:
+    """Value read at scrape time from a callback returning {label values: value}."""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (),
+                 collect: Callable[[], dict[tuple, float]] | None = None):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self.collect = collect
+        self.value = 0.0  # used when there is no callback
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        values = self.collect() if self.collect is not None else {(): self.value}
+        for labels, value in values.items():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[Counter | Histogram | Gauge] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs) -> Counter:
+        return self.register(Counter(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        return self.register(Histogram(*args, **kwargs))
+
+    def gauge(self, *args, **kwargs) -> Gauge:
+        return self.register(Gauge(*args, **kwargs))
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+
+registry = Registry()
+
+# ─── Core Metrics ──────────────────────────────────────────
+# Status is a histogram label so each request costs one series update; the
+# per-status counter is derived from the histogram counts when scraped.
+http_request_seconds = registry.histogram(
+    "ums_http_request_duration_seconds", "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+http_responses = registry.counter(
+    "ums_http_responses", "HTTP responses by status code.", ("status",),
+    collect=lambda: http_request_seconds.counts(lambda labels: (labels[2],)),
+)
+http_in_flight = registry.gauge("ums_http_requests_in_flight", "HTTP requests currently being handled.")
+db_pool_checkout_seconds = registry.histogram(
+    "ums_db_pool_checkout_wait_seconds", "Time spent waiting for a database connection.",
+    buckets=WAIT_BUCKETS,
+)
+password_hash_seconds = registry.histogram(
+    "ums_password_hash_seconds", "Argon2 execution time per operation.", ("operation",),
+)
+
+
+# ─── ASGI Middleware ──────────────────────────────────────
+class MetricsMiddleware:
+    """
+    Records latency, status and in-flight count per HTTP request. Routes are
+    labelled by their template (/users/{user_id}), taken from the route FastAPI
+    matched, so raw ids never become label values. Paths not served by an API
+    route (404s, /docs) share the "<unmatched>" label.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = perf_counter()
+        http_in_flight.value += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_in_flight.value -= 1
+            route = scope.get("route")
+            http_request_seconds.observe(
+                perf_counter() - start,
+                (scope["method"], route.path if route is not None else "<unmatched>", status),
+            )
@@ -0,0 +1,86 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A cursor is an opaque, URL-safe token holding the sort-key values of the last
+row on a page. The next page resumes strictly after that row, so fetching
+page N costs the same as fetching page 1, unlike OFFSET.
+"""
+import base64
+import enum
+import json
+from datetime import date, datetime, time
+from typing import Any, Sequence
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.core.exceptions import ValidationException
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def _from_json(column: InstrumentedAttribute, value: Any) -> Any:
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type in (datetime, date, time):
+        return python_type.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_to_json(v) for v in values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, keys: Sequence[InstrumentedAttribute]) -> list[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError
+        return [_from_json(column, value) for column, value in zip(keys, values)]
+    except (ValueError, TypeError):
+        raise ValidationException("Invalid pagination cursor")
+
+
+def paginate(
+    query: Select,
+    keys: Sequence[InstrumentedAttribute],
+    *,
+    descending: bool = False,
+    cursor: str | None = None,
+    skip: int = 0,
+    limit: int = 50,
+) -> Select:
+    """
+    Order by the given keys (the last one must be unique, e.g. the primary key)
+    and resume after the cursor. Without a cursor, falls back to OFFSET skip so
+    legacy clients keep working. Fetches limit + 1 rows; see next_page().
+    """
+    if cursor:
+        position = tuple_(*keys)
+        after = tuple_(*decode_cursor(cursor, keys))
+        query = query.where(position < after if descending else position > after)
+    elif skip:
+        query = query.offset(skip)
+    order = [key.desc() if descending else key.asc() for key in keys]
+    return query.order_by(*order).limit(limit + 1)
+
+
+def next_page(
+    rows: Sequence[Any], keys: Sequence[InstrumentedAttribute], limit: int
+) -> tuple[list[Any], str | None]:
+    """Trim the look-ahead row and build the cursor for the following page."""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, key.key) for key in keys])
@@ -0,0 +1,192 @@
+"""
+Read-replica routing for read-only endpoints.
+
+get_read_db hands out sessions on the replicas in DATABASE_REPLICA_URLS,
+round-robin. A replica is skipped when it cannot be reached (benched for
+REPLICA_RECHECK_SECONDS) or when its replication lag, probed at most once per
+REPLICA_RECHECK_SECONDS, exceeds REPLICA_MAX_LAG_SECONDS. With no usable
+replica, or for a user who wrote within READ_YOUR_WRITES_SECONDS, the read
+goes to the primary. Read sessions are never committed.
+
+A replica is any database with the same schema, so two SQLite files (one
+copied from the other) are enough to exercise the routing locally.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.core.cache import recent_writers
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal, make_engine
+
+settings = get_settings()
+logger = logging.getLogger("ums.replicas")
+
+# Seconds since the last replayed transaction, or 0 when the standby has
+# replayed everything it received (an idle primary must not look like lag).
+_LAG_QUERIES = {
+    "postgresql": text(
+        "SELECT CASE WHEN NOT pg_is_in_recovery() "
+        "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    ),
+}
+
+_CONNECT_ERRORS = (DBAPIError, OSError, asyncio.TimeoutError)
+
+
+class Replica:
+    def __init__(self, url: str):
+        parsed = make_url(url)
+        self.name = parsed.render_as_string(hide_password=True)
+        self.engine = make_engine(url)
+        self.sessionmaker = async_sessionmaker(bind=self.engine, class_=AsyncSession, expire_on_commit=False)
+        self._lag_query = _LAG_QUERIES.get(parsed.get_backend_name())
+        self.down_until = 0.0
+        self.lag: float = 0.0
+        self.lag_checked_at = float("-inf")
+        self.served = 0
+        self.failures = 0
+
+    async def measure_lag(self, session: AsyncSession) -> float:
+        """Replication lag in seconds; 0 where the dialect has no way to report it (SQLite)."""
+        if self._lag_query is None:
+            await session.connection()
+            return 0.0
+        return float((await session.execute(self._lag_query)).scalar_one())
+
+    def state(self, now: float) -> str:
+        if self.down_until > now:
+            return "down"
+        return "lagging" if self.lag > settings.REPLICA_MAX_LAG_SECONDS else "up"
+
+
+class ReplicaRouter:
+    def __init__(self, urls: list[str]):
+        self.replicas = [Replica(url) for url in urls]
+        self._next = 0
+        self.primary_reads = 0
+        self.read_your_writes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    @asynccontextmanager
+    async def session(self, user_id: int | None) -> AsyncIterator[AsyncSession]:
+        """A read-only session: on a replica when possible, otherwise on the primary."""
+        replica, session = await self._acquire(user_id)
+        try:
+            yield session
+        except DBAPIError as exc:
+            if replica is not None and exc.connection_invalidated:
+                self._bench(replica, exc)
+            raise
+        finally:
+            await session.close()
+
+    async def _acquire(self, user_id: int | None) -> tuple[Replica | None, AsyncSession]:
+        if self.replicas:
+            if user_id is not None and await recent_writers.contains(user_id):
+                self.read_your_writes += 1
+            else:
+                start = self._next
+                self._next = (start + 1) % len(self.replicas)
+                now = time.monotonic()
+                for offset in range(len(self.replicas)):
+                    replica = self.replicas[(start + offset) % len(self.replicas)]
+                    session = await self._open(replica, now)
+                    if session is not None:
+                        return replica, session
+        self.primary_reads += 1
+        return None, AsyncSessionLocal()
+
+    async def _open(self, replica: Replica, now: float) -> AsyncSession | None:
+        if replica.down_until > now:
+            return None
+        probe = now - replica.lag_checked_at >= settings.REPLICA_RECHECK_SECONDS
+        if not probe and replica.lag > settings.REPLICA_MAX_LAG_SECONDS:
+            return None
+
+        session = replica.sessionmaker()
+        try:
+            # Connect up front so an unreachable replica falls through to the next one.
+            if probe:
+                replica.lag = await asyncio.wait_for(
+                    replica.measure_lag(session), settings.REPLICA_CONNECT_TIMEOUT_SECONDS
+                )
+                replica.lag_checked_at = now
+            else:
+                await asyncio.wait_for(session.connection(), settings.REPLICA_CONNECT_TIMEOUT_SECONDS)
+        except _CONNECT_ERRORS as exc:
+            await session.close()
+            self._bench(replica, exc)
+            return None
+
+        if replica.lag > settings.REPLICA_MAX_LAG_SECONDS:
+            logger.warning("Replica %s is %.1fs behind; reading from elsewhere", replica.name, replica.lag)
+            await session.close()
+            return None
+        replica.served += 1
+        return session
+
+    @staticmethod
+    def _bench(replica: Replica, exc: BaseException):
+        replica.failures += 1
+        replica.down_until = time.monotonic() + settings.REPLICA_RECHECK_SECONDS
+        replica.lag_checked_at = float("-inf")  # re-probe lag when it comes back
+        logger.warning("Replica %s unavailable, benched for %ss: %r",
+                       replica.name, settings.REPLICA_RECHECK_SECONDS, exc)
+
+    async def close(self):
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "state": replica.state(now),
+                    "lag_seconds": round(replica.lag, 3),
+                    "served": replica.served,
+                    "failures": replica.failures,
+                }
+                for replica in self.replicas
+            ],
+            "primary_reads": self.primary_reads,
+            "read_your_writes": self.read_your_writes,
+        }
+
+
+# ─── Write Tracking ────────────────────────────────────────
+def _mark_wrote(session: Session, *args):
+    session.info["wrote"] = True
+
+
+def _mark_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+async def record_write(session: AsyncSession, user_id: int) -> None:
+    """after_commit callback: open the user's read-your-writes window if the session wrote."""
+    if session.info.pop("wrote", False):
+        await recent_writers.mark(user_id)
+
+
+replica_router = ReplicaRouter(settings.DATABASE_REPLICA_URLS)
+
+if replica_router.enabled:
+    # Only read sessions could miss a write, so writes are only tracked when replicas exist.
+    event.listen(Session, "after_flush", _mark_wrote)
+    event.listen(Session, "do_orm_execute", _mark_dml)
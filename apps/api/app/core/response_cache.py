@@ -0,0 +1,179 @@
+"""
+Shared cache of encoded response bodies for hot, rarely changing reads
+(the course catalog, course details, student timetables).
+
+Tiers:
+  1. In-process LRU + TTL (TTLCache), per worker.
+  2. Redis, shared by all workers, when CACHE_BACKEND=redis.
+
+Entries are keyed by the version tokens of the tables the body is built from
+(see table_versions), so the service writes that bump those versions
+invalidate every dependent entry at once; stale entries are simply never read
+again and age out of both tiers.
+
+Stampede protection: concurrent misses for one key in a worker share a single
+computation, and with Redis a short lock makes the other workers wait for the
+first one's result instead of all querying the database.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+from app.core.cache import TTLCache, table_versions
+from app.core.config import get_settings
+from app.core.replicas import replica_router
+
+settings = get_settings()
+logger = logging.getLogger("ums.response_cache")
+
+Compute = Callable[[], Awaitable[bytes]]
+
+
+class ResponseCache:
+    """Two-tier cache of response bodies with per-key single-flight."""
+
+    KEY_PREFIX = "ums:response:"
+    POLL_SECONDS = 0.05
+
+    def __init__(self, max_entries: int, ttl: int, lock_seconds: float, redis_url: str | None = None):
+        self._local = TTLCache(max_entries, ttl)
+        self.ttl = ttl
+        self.lock_seconds = lock_seconds
+        self.enabled = max_entries > 0 or redis_url is not None
+        self._inflight: dict[str, asyncio.Future[bytes]] = {}
+        self._redis = None
+        if redis_url is not None:
+            from redis.asyncio import Redis
+
+            self._redis = Redis.from_url(redis_url)
+        self.shared_hits = 0
+        self.computed = 0
+        self.coalesced = 0
+
+    async def get_or_compute(self, namespace: str, tables: tuple[str, ...],
+                             params: tuple[Hashable, ...], compute: Compute) -> bytes:
+        """
+        The cached body for `params` in `namespace`, computed by `compute` on a
+        miss. `tables` are the tables the body is read from; a bump of any of
+        them makes the entry unreachable.
+        """
+        versions = await table_versions.get(tables) if self.enabled else None
+        if versions is None:
+            return await compute()
+        modified = max(version.modified for version in versions)
+        if replica_router.enabled and time.time() - modified < settings.REPLICA_MAX_LAG_SECONDS:
+            # A lagging replica could still return the rows from before the bump.
+            return await compute()
+        key = ":".join([namespace, *(version.token for version in versions), *map(str, params)])
+        return await self._get(key, compute)
+
+    async def _get(self, key: str, compute: Compute) -> bytes:
+        while True:
+            body = self._local.get(key)
+            if body is not None:
+                return body
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # this request was cancelled, not the computation
+                # The request computing it went away: try again, possibly as the leader.
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            body = await self._load(key, compute)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # retrieved: no warning when nobody was waiting
+            raise
+        finally:
+            del self._inflight[key]
+        future.set_result(body)
+        self._local.set(key, body)
+        return body
+
+    # ─── Shared Tier ──────────────────────────────────────
+    async def _load(self, key: str, compute: Compute) -> bytes:
+        if self._redis is None:
+            return await self._compute(compute)
+        body = await self._shared_get(key)
+        if body is not None:
+            return body
+
+        lock = self._redis.lock(f"{self.KEY_PREFIX}lock:{key}", timeout=self.lock_seconds)
+        try:
+            locked = await lock.acquire(blocking=False)
+        except Exception as exc:
+            logger.warning("Response cache lock failed: %s", exc)
+            return await self._compute(compute)
+        if locked:
+            try:
+                body = await self._compute(compute)
+                await self._shared_set(key, body)
+                return body
+            finally:
+                try:
+                    await lock.release()
+                except Exception:  # expired and possibly taken over: nothing to release
+                    pass
+
+        # Another worker is computing it: wait for its result, at most the lock timeout.
+        deadline = time.monotonic() + self.lock_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.POLL_SECONDS)
+            body = await self._shared_get(key)
+            if body is not None:
+                return body
+        return await self._compute(compute)
+
+    async def _compute(self, compute: Compute) -> bytes:
+        self.computed += 1
+        return await compute()
+
+    async def _shared_get(self, key: str) -> bytes | None:
+        try:
+            body = await self._redis.get(f"{self.KEY_PREFIX}{key}")
+        except Exception as exc:
+            logger.warning("Response cache read failed: %s", exc)
+            return None
+        if body is not None:
+            self.shared_hits += 1
+        return body
+
+    async def _shared_set(self, key: str, body: bytes) -> None:
+        try:
+            await self._redis.set(f"{self.KEY_PREFIX}{key}", body, ex=self.ttl)
+        except Exception as exc:
+            logger.warning("Response cache write failed: %s", exc)
+
+    async def close(self) -> None:
+        self._local.clear()
+        if self._redis is not None:
+            await self._redis.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "backend": "memory+redis" if self._redis is not None else "memory",
+            "enabled": self.enabled,
+            **self._local.stats(),
+            "shared_hits": self.shared_hits,
+            "computed": self.computed,
+            "coalesced": self.coalesced,
+        }
+
+
+response_cache = ResponseCache(
+    settings.RESPONSE_CACHE_MAX_ENTRIES,
+    settings.RESPONSE_CACHE_TTL_SECONDS,
+    settings.RESPONSE_CACHE_LOCK_SECONDS,
+    settings.REDIS_URL if settings.CACHE_BACKEND == "redis" else None,
+)
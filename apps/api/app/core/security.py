@@ -1,13 +1,21 @@
 """
 Security utilities: password hashing (Argon2), JWT token creation/verification.
 """
+import asyncio
+import hashlib
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Callable
 
 import jwt
 from passlib.context import CryptContext
 
+from app.core.cache import TTLCache
 from app.core.config import get_settings
+from app.core.exceptions import ServiceUnavailableException
+from app.core.metrics import password_hash_seconds
 
 settings = get_settings()
 
@@ -23,6 +31,107 @@ def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
 
+def _timed(fn: Callable[..., Any], *args: Any) -> tuple[Any, float]:
+    """Run fn inside the worker and report its own execution time."""
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+class PasswordHasher:
+    """
+    Runs Argon2 hashing/verification on a bounded worker pool so the event
+    loop stays responsive. When every worker is busy and the wait queue is
+    full, callers get a 503 with Retry-After instead of piling up.
+    """
+
+    def __init__(self, executor: str = "thread", workers: int = 4, queue_size: int = 64):
+        self.executor_kind = executor
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self._executor: Executor | None = None
+
+        # Metrics
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.hash_seconds_total = 0.0
+        self.wait_seconds_total = 0.0
+        self._recent: deque[float] = deque(maxlen=1024)
+
+    @property
+    def queue_depth(self) -> int:
+        """Requests waiting for a free worker."""
+        return max(0, self.in_flight - self.workers)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="argon2"
+                )
+        return self._executor
+
+    async def _run(self, operation: tuple[str], fn: Callable[..., Any], *args: Any) -> Any:
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise ServiceUnavailableException(
+                "Authentication service is busy, please retry",
+                retry_after=settings.HASH_RETRY_AFTER_SECONDS,
+            )
+        self.in_flight += 1
+        submitted = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, elapsed = await loop.run_in_executor(self._get_executor(), _timed, fn, *args)
+        finally:
+            self.in_flight -= 1
+        self.completed += 1
+        self.hash_seconds_total += elapsed
+        self.wait_seconds_total += max(0.0, time.perf_counter() - submitted - elapsed)
+        self._recent.append(elapsed)
+        password_hash_seconds.observe(elapsed, operation)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(("hash",), hash_password, password)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self._run(("verify",), verify_password, plain, hashed)
+
+    def stats(self) -> dict[str, Any]:
+        recent = sorted(self._recent)
+
+        def pct(q: float) -> float:
+            return round(recent[min(len(recent) - 1, int(q * len(recent)))] * 1000, 2) if recent else 0.0
+
+        return {
+            "executor": self.executor_kind,
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "hash_ms_p50": pct(0.50),
+            "hash_ms_p99": pct(0.99),
+            "wait_ms_avg": round(self.wait_seconds_total / self.completed * 1000, 2) if self.completed else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+hasher = PasswordHasher(
+    executor=settings.HASH_EXECUTOR,
+    workers=settings.HASH_WORKERS,
+    queue_size=settings.HASH_QUEUE_SIZE,
+)
+
+
 # ─── JWT Tokens ────────────────────────────────────────────
 def create_access_token(data: dict[str, Any], expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
@@ -40,6 +149,16 @@ def create_refresh_token(data: dict[str, Any]) -> str:
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
+# Verified payloads keyed by token digest; each entry expires at the token's own exp.
+token_cache = TTLCache(settings.TOKEN_CACHE_MAX_ENTRIES)
+
+
 def decode_token(token: str) -> dict[str, Any]:
     """Decode and validate a JWT token. Raises jwt.PyJWTError on failure."""
-    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is None:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        if "exp" in payload:
+            token_cache.set(key, payload, expires_at=float(payload["exp"]))
+    return dict(payload)
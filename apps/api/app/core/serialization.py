@@ -0,0 +1,111 @@
+"""
+Fast JSON encoding for responses.
+
+Two layers:
+  1. default_response_class(): ORJSONResponse for every route when FAST_JSON is
+     on and orjson is installed. FastAPI still validates the return value
+     against response_model, but the final dict-to-bytes step is orjson.
+  2. rows_response(): for list endpoints returning trusted ORM rows. Each row
+     is read straight into a dict of the schema's fields and the whole body is
+     encoded in one call, skipping the per-row model validation and the
+     intermediate python-mode dump FastAPI would otherwise do.
+
+rows_response() only copies attributes; it relies on the response schema being
+a flat projection of the model (no validators, aliases or nested models),
+which is true of every *Response schema here. Anything else should go through
+response_model as usual.
+"""
+from operator import attrgetter, itemgetter
+from typing import Any, Iterable, Mapping
+
+import pydantic_core
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from pydantic import BaseModel
+
+from app.core.config import get_settings
+
+try:
+    import orjson
+except ImportError:  # optional: pydantic-core's Rust encoder is the fallback
+    orjson = None
+
+settings = get_settings()
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return pydantic_core.to_json(content)
+
+
+def default_response_class() -> type[JSONResponse]:
+    return ORJSONResponse if settings.FAST_JSON and orjson is not None else JSONResponse
+
+
+# ─── Row Encoding ──────────────────────────────────────────
+class _RowGetter:
+    """Reads a schema's fields off a row: from the instance __dict__ where SQLAlchemy
+    keeps loaded column values (no descriptor call per field), else by attribute."""
+
+    __slots__ = ("fields", "from_dict", "from_attrs")
+
+    def __init__(self, schema: type[BaseModel]):
+        self.fields = tuple(schema.model_fields)
+        self.from_dict = itemgetter(*self.fields)
+        self.from_attrs = attrgetter(*self.fields)
+
+    def values(self, row: Any) -> tuple:
+        try:
+            values = self.from_dict(row.__dict__)
+        except (AttributeError, KeyError):  # expired attribute, or not an ORM instance
+            values = self.from_attrs(row)
+        return values if len(self.fields) > 1 else (values,)
+
+
+_getters: dict[type[BaseModel], _RowGetter] = {}
+
+
+def encode_rows(schema: type[BaseModel], rows: Iterable[Any]) -> list[dict[str, Any]]:
+    """Rows as plain dicts holding exactly the schema's fields."""
+    getter = _getters.get(schema)
+    if getter is None:
+        getter = _getters[schema] = _RowGetter(schema)
+    fields, values = getter.fields, getter.values
+    return [dict(zip(fields, values(row))) for row in rows]
+
+
+def rows_body(
+    schema: type[BaseModel],
+    rows: Iterable[Any],
+    key: str | None = None,
+    extra: Mapping[str, Any] | None = None,
+) -> bytes:
+    """`rows` serialized as `schema`: a bare list, or with `key`, an object
+    {key: [...], **extra} (e.g. CourseListResponse)."""
+    items = encode_rows(schema, rows)
+    return dumps(items if key is None else {key: items, **(extra or {})})
+
+
+def row_body(schema: type[BaseModel], row: Any) -> bytes:
+    return dumps(encode_rows(schema, (row,))[0])
+
+
+def json_response(body: bytes, headers: Mapping[str, str] | None = None, status_code: int = 200) -> Response:
+    """Response for an already encoded JSON body (e.g. from the response cache)."""
+    return Response(body, status_code=status_code, headers=headers, media_type="application/json")
+
+
+def rows_response(
+    schema: type[BaseModel],
+    rows: Iterable[Any],
+    key: str | None = None,
+    extra: Mapping[str, Any] | None = None,
+    headers: Mapping[str, str] | None = None,
+    status_code: int = 200,
+) -> Response:
+    """
+    JSON response with rows_body(). Headers set on an injected
+    `response: Response` are not applied to a returned Response, so pass them
+    here instead.
+    """
+    return json_response(rows_body(schema, rows, key, extra), headers, status_code)
@@ -0,0 +1,194 @@
+"""
+Boot-time database preparation, run once per worker by main.lifespan.
+
+STARTUP_SCHEMA_MODE picks how the schema is handled:
+  create  Base.metadata.create_all (dev convenience; inspects every table),
+          stamping a new database at the migration head and logging an error
+          when an existing one is behind it
+  verify  one SELECT on alembic_version, compared with the migration head
+  skip    nothing; the deploy pipeline owns the schema
+
+Then the pool is pre-filled with STARTUP_WARM_CONNECTIONS connections and the
+hot statements are executed once, so mapper configuration and SQL compilation
+happen before the first request instead of during it.
+"""
+import ast
+import asyncio
+import logging
+import re
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import configure_mappers
+
+from app.core.config import get_settings
+from app.core.database import Base
+
+settings = get_settings()
+logger = logging.getLogger("ums.startup")
+
+VERSIONS_DIR = Path(__file__).resolve().parents[2] / "alembic" / "versions"
+_REVISION_LINE = re.compile(r"^(down_revision|revision)\b[^=]*=\s*(.+)$", re.MULTILINE)
+
+HotStatement = Callable[[AsyncSession], Awaitable[object]]
+
+
+class SchemaVersionError(RuntimeError):
+    """The database schema is not at the revision this code expects."""
+
+
+# ─── Schema ───────────────────────────────────────────────
+def _revision_graph(versions_dir: Path) -> tuple[set[str], set[str]]:
+    """(all revisions, revisions that some other revision builds on)."""
+    revisions: set[str] = set()
+    parents: set[str] = set()
+    for path in versions_dir.glob("*.py"):
+        found = dict(_REVISION_LINE.findall(path.read_text()))
+        if "revision" not in found:
+            continue
+        revisions.add(ast.literal_eval(found["revision"]))
+        down = ast.literal_eval(found.get("down_revision", "None"))
+        parents.update(down if isinstance(down, (tuple, list)) else [down] if down else [])
+    return revisions, parents
+
+
+def migration_heads(versions_dir: Path = VERSIONS_DIR) -> set[str]:
+    """
+    Head revision(s) of the migration scripts. The revision lines are read
+    straight from the files (they follow alembic/script.py.mako), which avoids
+    importing Alembic and every migration module in each worker.
+    """
+    revisions, parents = _revision_graph(versions_dir)
+    return revisions - parents
+
+
+async def verify_schema(engine: AsyncEngine) -> str:
+    """Raise SchemaVersionError unless alembic_version is at the head; returns the revision."""
+    revisions, parents = _revision_graph(VERSIONS_DIR)
+    heads = revisions - parents
+    try:
+        async with engine.connect() as conn:
+            current = set((await conn.execute(text("SELECT version_num FROM alembic_version"))).scalars())
+    except DBAPIError as exc:
+        raise SchemaVersionError(
+            "No alembic_version table; run `alembic upgrade head` (after `alembic stamp 0001` if create_all "
+            "made the tables) or set STARTUP_SCHEMA_MODE=create"
+        ) from exc
+    if current == heads:
+        return ",".join(sorted(current))
+    if current - revisions:
+        # Newer migrations than this build knows about: a rolling deploy in progress.
+        logger.warning("Database is at unknown revision %s (code head %s)",
+                       sorted(current - revisions), sorted(heads))
+        return ",".join(sorted(current))
+    raise SchemaVersionError(
+        f"Database is at revision {sorted(current) or 'none'}, code expects {sorted(heads)}; "
+        "run `alembic upgrade head`"
+    )
+
+
+async def create_schema(engine: AsyncEngine) -> None:
+    """
+    create_all adds missing tables but never changes one that exists, so a database
+    it built earlier keeps the columns and constraints of that time. A new database
+    is stamped at the migration head, which lets `alembic upgrade head` take it
+    forward later; an existing one is checked against the head and an error logged
+    when it is behind, since requests touching the changed tables will fail.
+    """
+    revisions, parents = _revision_graph(VERSIONS_DIR)
+    heads = revisions - parents
+    async with engine.begin() as conn:
+        existing = set(await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names()))
+        await conn.run_sync(Base.metadata.create_all)
+        if "alembic_version" in existing:
+            current = set((await conn.execute(text("SELECT version_num FROM alembic_version"))).scalars())
+            if current != heads and not current - revisions:
+                logger.error(
+                    "Database is at revision %s, code expects %s, and create mode cannot alter existing tables: "
+                    "run `alembic upgrade head`", sorted(current) or "none", sorted(heads),
+                )
+        elif existing & Base.metadata.tables.keys():
+            logger.error(
+                "Database tables were created without migrations, so they may predate the models. If it was made by "
+                "create_all before migrations existed (such as an old ums_dev.db), run "
+                "`alembic stamp 0001 && alembic upgrade head`; otherwise stamp the revision it matches and upgrade"
+            )
+        else:
+            await conn.execute(text(
+                "CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL, "
+                "CONSTRAINT alembic_version_pkc PRIMARY KEY (version_num))"
+            ))
+            await conn.execute(text("INSERT INTO alembic_version (version_num) VALUES (:head)"),
+                               [{"head": head} for head in sorted(heads)])
+
+
+# ─── Warm-up ──────────────────────────────────────────────
+async def warm_pool(engine: AsyncEngine, connections: int) -> int:
+    """Open up to `connections` pooled connections concurrently and return them to the pool."""
+    pool = engine.sync_engine.pool
+    if not hasattr(pool, "size"):
+        return 0  # NullPool: nothing is kept
+    count = min(connections, pool.size())
+    if count <= 0:
+        return 0
+    conns = await asyncio.gather(*(engine.connect() for _ in range(count)))
+    for conn in conns:
+        await conn.close()
+    return count
+
+
+async def warm_statements(session_factory: async_sessionmaker, statements: list[HotStatement]) -> int:
+    """
+    Run each hot statement once in a rolled-back session; failures are logged, not raised.
+    A failure is rolled back on the spot: on Postgres it aborts the transaction, which
+    would otherwise fail every statement after it as well.
+    """
+    configure_mappers()
+    warmed = 0
+    async with session_factory() as session:
+        for statement in statements:
+            try:
+                await statement(session)
+                warmed += 1
+            except Exception as exc:
+                await session.rollback()
+                name = getattr(getattr(statement, "func", statement), "__name__", statement)
+                logger.warning("Warm-up statement %s failed: %s", name, exc)
+        await session.rollback()
+    return warmed
+
+
+async def prepare_database(engine: AsyncEngine, session_factory: async_sessionmaker,
+                           statements: list[HotStatement]) -> dict[str, float]:
+    """Schema check plus warm-up; returns the milliseconds spent on each step."""
+    timings: dict[str, float] = {}
+    mode = settings.STARTUP_SCHEMA_MODE
+
+    start = time.perf_counter()
+    if mode == "create":
+        await create_schema(engine)
+        logger.info("✅ Database tables ensured")
+    elif mode == "verify":
+        revision = await verify_schema(engine)
+        logger.info("✅ Database schema at revision %s", revision)
+    elif mode != "skip":
+        raise ValueError(f"Unknown STARTUP_SCHEMA_MODE {mode!r}")
+    timings["schema_ms"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    warmed = await warm_pool(engine, settings.STARTUP_WARM_CONNECTIONS)
+    timings["pool_ms"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    compiled = await warm_statements(session_factory, statements) if settings.STARTUP_WARM_STATEMENTS else 0
+    timings["statements_ms"] = (time.perf_counter() - start) * 1000
+
+    logger.info(
+        "Startup: schema %s %.1f ms, %d connections %.1f ms, %d statements %.1f ms",
+        mode, timings["schema_ms"], warmed, timings["pool_ms"], compiled, timings["statements_ms"],
+    )
+    return timings
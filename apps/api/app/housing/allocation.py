@@ -0,0 +1,372 @@
+"""
+Hostel allocation: every unassigned student to a free bed, in one solve.
+
+Students may state a room type, a building, amenities they want and the
+roommates they want. The allocation, in order of importance:
+
+  1. houses as many students as there are free beds
+  2. keeps mutual roommate requests together (A asks for B and B for A)
+  3. meets room type, building and amenity preferences, by weight
+  4. rooms students next to students of their own year and department
+
+Students with the same preferences are interchangeable, and so are rooms with
+the same building, type, amenities and free beds; the min-cost flows run from
+these profiles to these room classes (hundreds by hundreds), not from
+students to rooms:
+
+  groups    students linked by mutual requests are placed first, one group
+            per room with enough free beds. A group left without a room costs
+            ROOMMATE per member, and its members are then placed alone.
+  singles   every other student goes to a free bed of a class. Leaving a
+            student out costs UNHOUSED, more than any set of preferences.
+  rooms     within a class, students fill rooms by year and department:
+            partly taken rooms first, next to residents like them.
+
+allocate() takes and returns plain data, so it runs in the solver pool.
+"""
+import heapq
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any
+
+ROOM_TYPE = 4  # cost of a room of another type than the one asked for
+BUILDING = 2
+AMENITY = 1  # per amenity asked for and missing
+ROOMMATE = 10  # per member of a group not roomed together
+UNHOUSED = 1_000
+INF = float("inf")
+
+Preference = tuple[str, str, tuple[str, ...]]  # (room type, building, amenities); "" and () for no preference
+Cohort = tuple[int, str]  # (year, department)
+
+
+@dataclass(frozen=True, slots=True)
+class Applicant:
+    id: int
+    department: str
+    year: int  # intake year
+    room_type: str | None = None
+    building: str | None = None
+    amenities: frozenset[str] = frozenset()
+    roommates: tuple[int, ...] = ()
+
+    @property
+    def preference(self) -> Preference:
+        return self.room_type or "", self.building or "", tuple(sorted(self.amenities))
+
+    @property
+    def cohort(self) -> Cohort:
+        return self.year, self.department
+
+
+@dataclass(frozen=True, slots=True)
+class FreeRoom:
+    id: int
+    building: str
+    room_type: str
+    amenities: frozenset[str]
+    free: int
+    residents: tuple[Cohort, ...] = ()  # (year, department) of the students living there
+
+
+@dataclass
+class Allocation:
+    placements: dict[int, int]  # student id -> room id
+    unhoused: list[int]
+    report: dict[str, Any] = field(default_factory=dict)
+
+
+def mismatch(preference: Preference, building: str, room_type: str, amenities: frozenset[str]) -> int:
+    """Weighted preferences a room misses."""
+    wanted_type, wanted_building, wanted_amenities = preference
+    return (ROOM_TYPE * (wanted_type not in ("", room_type))
+            + BUILDING * (wanted_building not in ("", building))
+            + AMENITY * sum(amenity not in amenities for amenity in wanted_amenities))
+
+
+def roommate_groups(students: list[Applicant], largest: int) -> list[list[Applicant]]:
+    """
+    Students linked by mutual roommate requests, in groups of 2 to `largest`;
+    a larger set of linked students is split in id order.
+    """
+    by_id = {student.id: student for student in students}
+    parent = {student.id: student.id for student in students}
+
+    def root(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for student in students:
+        for other in student.roommates:
+            if other in by_id and student.id in by_id[other].roommates:
+                parent[root(student.id)] = root(other)
+    linked: dict[int, list[Applicant]] = defaultdict(list)
+    for student in students:
+        linked[root(student.id)].append(student)
+    groups = []
+    for members in linked.values():
+        members.sort(key=lambda student: student.id)
+        for i in range(0, len(members), max(largest, 1)):
+            if len(members[i:i + largest]) > 1:
+                groups.append(members[i:i + largest])
+    return groups
+
+
+# ─── Min-cost flow ────────────────────────────────────────
+class _Flow:
+    """
+    Min-cost flow, primal-dual: Dijkstra with potentials finds the cost of the
+    cheapest path, then a blocking flow (Dinic) saturates every path of that
+    cost. Costs are small integers, so there are few rounds.
+    """
+
+    def __init__(self, nodes: int):
+        self.n = nodes
+        self.edges: list[list[int]] = [[] for _ in range(nodes)]
+        self.to: list[int] = []
+        self.cap: list[int] = []
+        self.cost: list[int] = []
+
+    def add(self, u: int, v: int, cap: int, cost: int) -> int:
+        e = len(self.to)
+        self.to += (v, u)
+        self.cap += (cap, 0)
+        self.cost += (cost, -cost)
+        self.edges[u].append(e)
+        self.edges[v].append(e + 1)
+        return e
+
+    def flow(self, e: int) -> int:
+        return self.cap[e ^ 1]
+
+    def run(self, s: int, t: int) -> None:
+        to, cap, cost, edges = self.to, self.cap, self.cost, self.edges
+        h = [0] * self.n  # potentials: every residual edge has cost[e] + h[u] - h[v] >= 0
+        while True:
+            dist = [INF] * self.n
+            dist[s] = 0
+            heap = [(0, s)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                if u == t:
+                    break
+                hu = h[u] + d
+                for e in edges[u]:
+                    if cap[e]:
+                        v = to[e]
+                        nd = hu + cost[e] - h[v]
+                        if nd < dist[v]:
+                            dist[v] = nd
+                            heapq.heappush(heap, (nd, v))
+            if dist[t] == INF:
+                return
+            reach = dist[t]
+            for v in range(self.n):
+                h[v] += min(dist[v], reach)
+            while self._blocking(s, t, h):
+                pass
+
+    def _blocking(self, s: int, t: int, h: list[int]) -> bool:
+        """Augment along the zero reduced cost edges until t is cut off; False if no path was left."""
+        to, cap, cost, edges = self.to, self.cap, self.cost, self.edges
+        level = [-1] * self.n
+        level[s] = 0
+        frontier = [s]
+        while frontier and level[t] < 0:
+            following = []
+            for u in frontier:
+                for e in edges[u]:
+                    v = to[e]
+                    if cap[e] and level[v] < 0 and cost[e] + h[u] - h[v] == 0:
+                        level[v] = level[u] + 1
+                        following.append(v)
+            frontier = following
+        if level[t] < 0:
+            return False
+        current = [0] * self.n
+        path: list[int] = []
+        u = s
+        while True:  # depth-first, iterative: augmenting paths can be long
+            if u == t:
+                pushed = min(cap[e] for e in path)
+                for e in path:
+                    cap[e] -= pushed
+                    cap[e ^ 1] += pushed
+                path.clear()
+                u = s
+                continue
+            out = edges[u]
+            while current[u] < len(out):
+                e = out[current[u]]
+                v = to[e]
+                if cap[e] and level[v] == level[u] + 1 and cost[e] + h[u] - h[v] == 0:
+                    path.append(e)
+                    u = v
+                    break
+                current[u] += 1
+            else:  # dead end: retreat and skip the edge that led here
+                if u == s:
+                    return True
+                level[u] = -1
+                u = to[path.pop() ^ 1]
+                current[u] += 1
+
+
+def transport(supply: list[int], capacity: list[int], costs: list[dict[int, int]],
+              left_out: list[int]) -> tuple[dict[tuple[int, int], int], list[int]]:
+    """
+    Cheapest shipment of supply[i] units from each source to classes holding
+    capacity[j] units, at costs[i][j] a unit (missing: not allowed), where a
+    unit not shipped costs left_out[i]. Returns ({(i, j): units}, units left
+    out per source).
+    """
+    sources, classes = len(supply), len(capacity)
+    s, t = sources + classes, sources + classes + 1
+    graph = _Flow(sources + classes + 2)
+    for i, units in enumerate(supply):
+        graph.add(s, i, units, 0)
+    for j, units in enumerate(capacity):
+        graph.add(sources + j, t, units, 0)
+    shipped = {(i, j): graph.add(i, sources + j, supply[i], cost)
+               for i, row in enumerate(costs) for j, cost in row.items()}
+    spilled = [graph.add(i, t, supply[i], left_out[i]) for i in range(sources)]
+    graph.run(s, t)
+    flows = {key: graph.flow(e) for key, e in shipped.items() if graph.flow(e)}
+    return flows, [graph.flow(e) for e in spilled]
+
+
+# ─── Allocation ───────────────────────────────────────────
+def _place_groups(groups: list[list[Applicant]], rooms: list[FreeRoom]) -> dict[int, list[Applicant]]:
+    """Room id -> the group placed in it, by min-cost flow from group profiles to room classes."""
+    profiles: dict[tuple, list[list[Applicant]]] = defaultdict(list)
+    for group in groups:
+        profiles[tuple(sorted(student.preference for student in group))].append(group)
+    classes: dict[tuple, list[FreeRoom]] = defaultdict(list)
+    for room in rooms:
+        if room.free >= 2:
+            classes[room.building, room.room_type, room.amenities, room.free].append(room)
+    profile_keys, class_keys = list(profiles), list(classes)
+    costs = [
+        {j: sum(mismatch(preference, building, room_type, amenities) for preference in key)
+         for j, (building, room_type, amenities, free) in enumerate(class_keys) if free >= len(key)}
+        for key in profile_keys
+    ]
+    flows, _ = transport([len(profiles[key]) for key in profile_keys], [len(classes[key]) for key in class_keys],
+                         costs, [ROOMMATE * len(key) for key in profile_keys])
+    placed = {}
+    for (i, j), count in flows.items():
+        for _ in range(count):
+            placed[classes[class_keys[j]].pop().id] = profiles[profile_keys[i]].pop()
+    return placed
+
+
+def _fill(students: list[Applicant], rooms: list[tuple[FreeRoom, int, list[Cohort]]]) -> dict[int, int]:
+    """
+    Students of one room class into its rooms, given as (room, free beds,
+    residents). Partly taken rooms take students of their residents' year and
+    department first; the rest fill rooms in year and department order.
+    """
+    students = sorted(students, key=lambda student: (student.cohort, student.id))
+    waiting: dict[Cohort, list[Applicant]] = defaultdict(list)
+    for student in reversed(students):
+        waiting[student.cohort].append(student)
+    placements: dict[int, int] = {}
+    free = {room.id: beds for room, beds, _ in rooms}
+    for room, _, residents in rooms:
+        if residents:
+            cohort = Counter(residents).most_common(1)[0][0]
+            while free[room.id] and waiting.get(cohort):
+                placements[waiting[cohort].pop().id] = room.id
+                free[room.id] -= 1
+    order = [room.id for room, _, residents in rooms if not residents]
+    order += [room.id for room, _, residents in rooms if residents]
+    beds = (room_id for room_id in order for _ in range(free[room_id]))
+    for student in students:
+        if student.id not in placements:
+            placements[student.id] = next(beds)
+    return placements
+
+
+def allocate(students: list[Applicant], rooms: list[FreeRoom]) -> Allocation:
+    started = time.perf_counter()
+    by_id = {student.id: student for student in students}
+    groups = roommate_groups(students, max((room.free for room in rooms), default=0))
+    grouped = {student.id for group in groups for student in group}
+    group_rooms = _place_groups(groups, rooms)
+    placements = {student.id: room_id for room_id, group in group_rooms.items() for student in group}
+
+    # Singles: everyone not yet placed, into what the groups left.
+    singles: dict[Preference, list[Applicant]] = defaultdict(list)
+    for student in students:
+        if student.id not in placements:
+            singles[student.preference].append(student)
+    classes: dict[tuple, list[tuple[FreeRoom, int, list[Cohort]]]] = defaultdict(list)
+    for room in rooms:
+        taken = [student.cohort for student in group_rooms.get(room.id, ())]
+        if room.free > len(taken):
+            classes[room.building, room.room_type, room.amenities].append(
+                (room, room.free - len(taken), list(room.residents) + taken)
+            )
+    profile_keys, class_keys = list(singles), list(classes)
+    costs = [{j: mismatch(key, *class_key) for j, class_key in enumerate(class_keys)} for key in profile_keys]
+    flows, _ = transport([len(singles[key]) for key in profile_keys],
+                         [sum(beds for _, beds, _ in classes[key]) for key in class_keys],
+                         costs, [UNHOUSED] * len(profile_keys))
+    arriving: dict[int, list[Applicant]] = defaultdict(list)
+    for (i, j), count in flows.items():
+        arriving[j] += [singles[profile_keys[i]].pop() for _ in range(count)]
+    for j, members in arriving.items():
+        placements.update(_fill(members, classes[class_keys[j]]))
+
+    unhoused = sorted(student.id for student in students if student.id not in placements)
+    return Allocation(placements, unhoused, _report(by_id, rooms, placements, groups, grouped, started))
+
+
+def _report(by_id: dict[int, Applicant], rooms: list[FreeRoom], placements: dict[int, int],
+            groups: list[list[Applicant]], grouped: set[int], started: float) -> dict[str, Any]:
+    room_of = {room.id: room for room in rooms}
+    stated = Counter()
+    met = Counter()
+    for student_id, room_id in placements.items():
+        student, room = by_id[student_id], room_of[room_id]
+        for kind, wanted, ok in (
+            ("room_type", student.room_type, student.room_type == room.room_type),
+            ("building", student.building, student.building == room.building),
+            ("amenities", student.amenities, student.amenities <= room.amenities),
+        ):
+            if wanted:
+                stated[kind] += 1
+                met[kind] += ok
+    together = sum(len({placements.get(student.id) for student in group} - {None}) == 1
+                   and all(student.id in placements for student in group) for group in groups)
+
+    occupants: dict[int, list[tuple[int, Cohort]]] = defaultdict(list)
+    for student_id, room_id in placements.items():
+        occupants[room_id].append((student_id, by_id[student_id].cohort))
+    shared = Counter()
+    for room_id, members in occupants.items():
+        everyone = [cohort for _, cohort in members] + list(room_of[room_id].residents)
+        for student_id, cohort in members:
+            others = list(everyone)
+            others.remove(cohort)
+            if others:
+                shared["with_roommates"] += 1
+                shared["same_year"] += all(year == cohort[0] for year, _ in others)
+                shared["same_department"] += all(department == cohort[1] for _, department in others)
+    return {
+        "students": len(by_id),
+        "free_beds": sum(room.free for room in rooms),
+        "housed": len(placements),
+        "unhoused": len(by_id) - len(placements),
+        "rooms_used": len(occupants),
+        "preferences": {kind: {"stated": stated[kind], "met": met[kind]}
+                        for kind in ("room_type", "building", "amenities")},
+        "roommate_groups": {"requested": len(groups), "students": len(grouped), "together": together},
+        "cohorts": dict(shared),
+        "solve_seconds": round(time.perf_counter() - started, 3),
+    }
@@ -1,11 +1,12 @@
 """
-Housing ORM models: Room, RoomAssignment, MaintenanceRequest.
+Housing ORM models: Room, RoomAmenity, RoomAssignment, MaintenanceRequest.
 """
 import enum
+import json
 from datetime import datetime, timezone
 
 from sqlalchemy import (
-    DateTime, Enum, ForeignKey, Integer, String, Text,
+    CheckConstraint, DateTime, Enum, ForeignKey, Index, Integer, String, Text, text,
 )
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -41,6 +42,12 @@ class RequestPriority(str, enum.Enum):
 
 class Room(Base):
     __tablename__ = "rooms"
+    __table_args__ = (
+        Index("ix_rooms_building", "building"),
+        Index("ix_rooms_status", "status"),
+        Index("ix_rooms_type_capacity", "room_type", "capacity"),
+        CheckConstraint("occupied >= 0 AND occupied <= capacity", name="ck_rooms_occupancy"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     building: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -48,12 +55,52 @@ class Room(Base):
     room_number: Mapped[str] = mapped_column(String(20), unique=True, nullable=False)
     room_type: Mapped[RoomType] = mapped_column(Enum(RoomType), nullable=False)
     capacity: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Active assignments. status follows it: OCCUPIED once occupied reaches capacity,
+    # AVAILABLE below; MAINTENANCE is set by hand and takes no new assignments.
+    occupied: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
     status: Mapped[RoomStatus] = mapped_column(Enum(RoomStatus), default=RoomStatus.AVAILABLE)
-    amenities: Mapped[str | None] = mapped_column(Text, nullable=True)  # JSON string
+    amenities: Mapped[str | None] = mapped_column(Text, nullable=True)  # JSON list as entered; searched via RoomAmenity
+
+
+def amenity_key(name: str) -> str:
+    """An amenity as stored in RoomAmenity and matched by filters: "Attached  bath" -> "attached bath"."""
+    return " ".join(name.split()).casefold()
+
+
+def amenity_keys(amenities: str | None) -> set[str]:
+    """The keys of a Room.amenities value; anything but a JSON list of names counts as none."""
+    try:
+        names = json.loads(amenities) if amenities else []
+    except ValueError:
+        return set()
+    return {amenity_key(name) for name in names if isinstance(name, str)} - {""} if isinstance(names, list) else set()
+
+
+class RoomAmenity(Base):
+    """One amenity of a room, by amenity_key(): "rooms with AC and an attached bath" is an index lookup."""
+    __tablename__ = "room_amenities"
+    __table_args__ = (
+        Index("ix_room_amenities_amenity_room", "amenity", "room_id"),
+    )
+
+    room_id: Mapped[int] = mapped_column(Integer, ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True)
+    amenity: Mapped[str] = mapped_column(String(50), primary_key=True)
 
 
 class RoomAssignment(Base):
     __tablename__ = "room_assignments"
+    __table_args__ = (
+        # Partial indexes: only active (not checked-out) assignments are looked up.
+        # Unique: a student holds one active assignment, even when two are made at once.
+        Index(
+            "ix_room_assignments_active_student", "student_id", unique=True,
+            postgresql_where=text("check_out IS NULL"), sqlite_where=text("check_out IS NULL"),
+        ),
+        Index(
+            "ix_room_assignments_active_room", "room_id",
+            postgresql_where=text("check_out IS NULL"), sqlite_where=text("check_out IS NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     room_id: Mapped[int] = mapped_column(Integer, ForeignKey("rooms.id"), nullable=False)
@@ -67,6 +114,10 @@ class RoomAssignment(Base):
 
 class MaintenanceRequest(Base):
     __tablename__ = "maintenance_requests"
+    __table_args__ = (
+        Index("ix_maintenance_requests_room_created", "room_id", "created_at"),
+        Index("ix_maintenance_requests_created_at", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     room_id: Mapped[int] = mapped_column(Integer, ForeignKey("rooms.id"), nullable=False)
@@ -5,11 +5,13 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.deps import CurrentUser, require_role
+from app.core.deps import CurrentUser, get_read_db, require_role
+from app.core.http_cache import conditional_get
+from app.core.serialization import rows_response
 from app.housing import service
-from app.housing.models import RequestStatus, RoomStatus
+from app.housing.models import RequestStatus, Room, RoomStatus, RoomType
 from app.housing.schemas import (
-    AssignmentCreate, AssignmentResponse,
+    AllocationJobResponse, AllocationRequest, AssignmentCreate, AssignmentResponse,
     MaintenanceCreate, MaintenanceResponse, MaintenanceUpdate,
     RoomCreate, RoomListResponse, RoomResponse,
 )
@@ -17,6 +19,9 @@ from app.users.models import UserRole
 
 router = APIRouter(prefix="/housing", tags=["Housing (RMS)"])
 
+# Occupancy changes on every assignment and check-out: always revalidate.
+room_validators = conditional_get(Room.__tablename__, cache_control="private, no-cache")
+
 
 # ─── Rooms ─────────────────────────────────────────────────
 @router.post("/rooms", response_model=RoomResponse, status_code=201)
@@ -33,12 +38,24 @@ async def list_rooms(
     _user: CurrentUser,
     building: str | None = None,
     status: RoomStatus | None = None,
+    room_type: RoomType | None = None,
+    min_capacity: int | None = Query(None, ge=1),
+    max_capacity: int | None = Query(None, ge=1),
+    amenity: list[str] = Query([], max_length=10, description="Rooms with all of them: ?amenity=AC&amenity=Kitchen"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    cursor: str | None = None,
+    include_total: bool = True,
+    validators: dict[str, str] = Depends(room_validators),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    rooms, total = await service.list_rooms(db, building, status, skip, limit)
-    return RoomListResponse(rooms=rooms, total=total)
+    rooms, total, next_cursor = await service.list_rooms(
+        db, building, status, skip, limit, cursor=cursor, include_total=include_total,
+        room_type=room_type, min_capacity=min_capacity, max_capacity=max_capacity, amenities=amenity,
+    )
+    return rows_response(
+        RoomResponse, rooms, key="rooms", extra={"total": total, "next_cursor": next_cursor}, headers=validators,
+    )
 
 
 # ─── Assignments ───────────────────────────────────────────
@@ -51,14 +68,41 @@ async def assign_room(
     return await service.assign_room(db, data)
 
 
+@router.post("/assignments/{assignment_id}/check-out", response_model=AssignmentResponse)
+async def check_out(
+    assignment_id: int,
+    db: AsyncSession = Depends(get_db),
+    _admin: None = Depends(require_role(UserRole.ADMIN)),
+):
+    return await service.check_out(db, assignment_id)
+
+
 @router.get("/my-room", response_model=AssignmentResponse | None)
 async def get_my_room(
     current_user: CurrentUser,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     return await service.get_student_room(db, current_user.id)
 
 
+@router.post("/allocations", response_model=AllocationJobResponse, status_code=202)
+async def allocate_rooms(
+    data: AllocationRequest,
+    current_user: CurrentUser,
+    _admin: None = Depends(require_role(UserRole.ADMIN)),
+):
+    """Assign every active student without a room in one batch; poll the returned job for the report."""
+    return await service.start_allocation(data, current_user.id)
+
+
+@router.get("/allocations/jobs/{job_id}", response_model=AllocationJobResponse)
+async def get_allocation_job(
+    job_id: str,
+    _admin: None = Depends(require_role(UserRole.ADMIN)),
+):
+    return await service.get_allocation_job(job_id)
+
+
 # ─── Maintenance ───────────────────────────────────────────
 @router.post("/maintenance", response_model=MaintenanceResponse, status_code=201)
 async def create_maintenance_request(
@@ -86,7 +130,12 @@ async def list_maintenance(
     status: RequestStatus | None = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
 ):
-    requests, _ = await service.list_maintenance_requests(db, room_id, status, skip, limit)
-    return requests
+    """The cursor for the next page, if any, is returned in the X-Next-Cursor header."""
+    requests, _, next_cursor = await service.list_maintenance_requests(
+        db, room_id, status, skip, limit, cursor=cursor, include_total=False
+    )
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return rows_response(MaintenanceResponse, requests, headers=headers)
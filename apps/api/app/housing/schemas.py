@@ -1,11 +1,13 @@
 """
 Housing Pydantic schemas.
 """
+import json
 from datetime import datetime
+from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
 
-from app.housing.models import RequestPriority, RequestStatus, RoomStatus, RoomType
+from app.housing.models import RequestPriority, RequestStatus, RoomStatus, RoomType, amenity_key
 
 
 # ─── Room ──────────────────────────────────────────────────
@@ -15,7 +17,22 @@ class RoomCreate(BaseModel):
     room_number: str
     room_type: RoomType
     capacity: int = Field(..., ge=1)
-    amenities: str | None = None
+    amenities: str | None = None  # JSON list of names, e.g. '["WiFi","AC"]'
+
+    @field_validator("amenities")
+    @classmethod
+    def _json_list(cls, value: str | None) -> str | None:
+        if value is None:
+            return value
+        try:
+            names = json.loads(value)
+        except ValueError:
+            names = None
+        if not isinstance(names, list) or not all(
+            isinstance(name, str) and 0 < len(amenity_key(name)) <= 50 for name in names
+        ):
+            raise ValueError('amenities must be a JSON list of names of up to 50 characters, e.g. ["WiFi","AC"]')
+        return value
 
 
 class RoomResponse(BaseModel):
@@ -25,6 +42,7 @@ class RoomResponse(BaseModel):
     room_number: str
     room_type: RoomType
     capacity: int
+    occupied: int
     status: RoomStatus
     amenities: str | None
     model_config = {"from_attributes": True}
@@ -32,7 +50,8 @@ class RoomResponse(BaseModel):
 
 class RoomListResponse(BaseModel):
     rooms: list[RoomResponse]
-    total: int
+    total: int | None = None
+    next_cursor: str | None = None
 
 
 # ─── Assignment ────────────────────────────────────────────
@@ -51,6 +70,45 @@ class AssignmentResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+# ─── Allocation ────────────────────────────────────────────
+class HousingPreference(BaseModel):
+    """What one student asks for; every field is optional."""
+    student_id: int
+    room_type: RoomType | None = None
+    building: str | None = Field(None, max_length=100)
+    amenities: list[str] = Field(default_factory=list, max_length=10)  # all wanted, e.g. ["AC", "Attached Bath"]
+    roommates: list[int] = Field(default_factory=list, max_length=3)  # kept together when the request is mutual
+
+
+class AllocationRequest(BaseModel):
+    preferences: list[HousingPreference] = Field(default_factory=list, max_length=100_000)
+    buildings: list[str] | None = Field(None, min_length=1)  # only allocate beds in these buildings
+    dry_run: bool = False  # return the assignments in the job result without saving them
+
+    @model_validator(mode="after")
+    def _one_per_student(self):
+        students = [preference.student_id for preference in self.preferences]
+        if len(set(students)) != len(students):
+            raise ValueError("one preference per student")
+        if any(preference.student_id in preference.roommates for preference in self.preferences):
+            raise ValueError("a student cannot ask to room with themselves")
+        return self
+
+
+class AllocationJobResponse(BaseModel):
+    """A hostel allocation job; `result` is set once it succeeded, `error` if it failed."""
+    id: str
+    status: str
+    phase: str
+    progress: float
+    detail: dict[str, Any]
+    result: dict[str, Any] | None
+    error: str | None
+    created_at: datetime
+    updated_at: datetime
+    model_config = {"from_attributes": True}
+
+
 # ─── Maintenance ───────────────────────────────────────────
 class MaintenanceCreate(BaseModel):
     room_id: int
@@ -1,18 +1,30 @@
 """
-Housing service: room management, assignments, maintenance.
+Housing service: room management, assignments, allocation, maintenance.
 """
+import time
+from collections import Counter, defaultdict
 from datetime import datetime, timezone
+from functools import partial
+from typing import Any
 
-from sqlalchemy import func, select
+from sqlalchemy import bindparam, case, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.exceptions import ConflictException, NotFoundException
+from app.core.cache import table_versions
+from app.core.database import AsyncSessionLocal, after_commit
+from app.core.exceptions import ConflictException, NotFoundException, ValidationException
+from app.core.jobs import Job, Progress, jobs, solver_pool
+from app.core.pagination import next_page, paginate
+from app.housing.allocation import Applicant, FreeRoom, allocate
 from app.housing.models import (
-    MaintenanceRequest, RequestStatus, Room, RoomAssignment, RoomStatus,
+    MaintenanceRequest, RequestStatus, Room, RoomAmenity, RoomAssignment, RoomStatus, RoomType,
+    amenity_key, amenity_keys,
 )
 from app.housing.schemas import (
-    AssignmentCreate, MaintenanceCreate, MaintenanceUpdate, RoomCreate,
+    AllocationRequest, AssignmentCreate, MaintenanceCreate, MaintenanceUpdate, RoomCreate,
 )
+from app.users.models import User, UserRole
 
 
 # ─── Rooms ─────────────────────────────────────────────────
@@ -23,44 +35,113 @@ async def create_room(db: AsyncSession, data: RoomCreate) -> Room:
     room = Room(**data.model_dump())
     db.add(room)
     await db.flush()
+    db.add_all(RoomAmenity(room_id=room.id, amenity=key) for key in amenity_keys(room.amenities))
+    await db.flush()
     await db.refresh(room)
+    after_commit(db, partial(table_versions.bump, Room.__tablename__))
     return room
 
 
+ROOM_SORT_KEYS = (Room.id,)
+MAINTENANCE_SORT_KEYS = (MaintenanceRequest.created_at, MaintenanceRequest.id)
+
+
 async def list_rooms(
     db: AsyncSession, building: str | None = None, status: RoomStatus | None = None,
-    skip: int = 0, limit: int = 50,
-) -> tuple[list[Room], int]:
-    query = select(Room)
-    count_q = select(func.count(Room.id))
+    skip: int = 0, limit: int = 50, cursor: str | None = None, include_total: bool = True,
+    room_type: RoomType | None = None, min_capacity: int | None = None, max_capacity: int | None = None,
+    amenities: list[str] | None = None,
+) -> tuple[list[Room], int | None, str | None]:
+    conditions = []
     if building:
-        query = query.where(Room.building == building)
-        count_q = count_q.where(Room.building == building)
+        conditions.append(Room.building == building)
     if status:
-        query = query.where(Room.status == status)
-        count_q = count_q.where(Room.status == status)
-    total = (await db.execute(count_q)).scalar() or 0
-    result = await db.execute(query.offset(skip).limit(limit))
-    return list(result.scalars().all()), total
+        conditions.append(Room.status == status)
+    if room_type:
+        conditions.append(Room.room_type == room_type)
+    if min_capacity is not None:
+        conditions.append(Room.capacity >= min_capacity)
+    if max_capacity is not None:
+        conditions.append(Room.capacity <= max_capacity)
+    # Every amenity asked for. As IN lists the planner can start from the rarest amenity's
+    # index entries instead of checking every room.
+    for key in sorted({amenity_key(name) for name in amenities or ()}):
+        conditions.append(Room.id.in_(select(RoomAmenity.room_id).where(RoomAmenity.amenity == key)))
+    query = select(Room).where(*conditions)
+    count_q = select(func.count(Room.id)).where(*conditions)
+    total = None
+    if include_total and cursor is None:
+        total = (await db.execute(count_q)).scalar() or 0
+    result = await db.execute(paginate(query, ROOM_SORT_KEYS, cursor=cursor, skip=skip, limit=limit))
+    rooms, next_cursor = next_page(result.scalars().all(), ROOM_SORT_KEYS, limit)
+    return rooms, total, next_cursor
 
 
 # ─── Assignments ───────────────────────────────────────────
+def _status_for(occupied):
+    """Room.status once `occupied` beds are taken; MAINTENANCE stays as it is."""
+    return case(
+        (Room.status == RoomStatus.MAINTENANCE, Room.status),
+        (occupied >= Room.capacity, literal(RoomStatus.OCCUPIED, Room.status.type)),
+        else_=literal(RoomStatus.AVAILABLE, Room.status.type),
+    )
+
+
 async def assign_room(db: AsyncSession, data: AssignmentCreate) -> RoomAssignment:
-    room_result = await db.execute(select(Room).where(Room.id == data.room_id))
-    room = room_result.scalar_one_or_none()
-    if not room:
-        raise NotFoundException("Room")
-    if room.status != RoomStatus.AVAILABLE:
-        raise ConflictException("Room is not available")
+    if await get_student_room(db, data.student_id) is not None:
+        raise ConflictException("Student already has a room")
+
+    # Take a bed with one conditional UPDATE: the row lock it holds until commit
+    # makes concurrent assignments queue, and the last free bed goes to one of them.
+    claimed = await db.execute(
+        update(Room)
+        .where(Room.id == data.room_id, Room.status != RoomStatus.MAINTENANCE, Room.occupied < Room.capacity)
+        .values(occupied=Room.occupied + 1, status=_status_for(Room.occupied + 1))
+        .execution_options(synchronize_session=False)
+    )
+    if claimed.rowcount == 0:
+        status = (await db.execute(select(Room.status).where(Room.id == data.room_id))).scalar_one_or_none()
+        if status is None:
+            raise NotFoundException("Room")
+        raise ConflictException("Room is under maintenance" if status == RoomStatus.MAINTENANCE else "Room is full")
 
     assignment = RoomAssignment(room_id=data.room_id, student_id=data.student_id)
     db.add(assignment)
-    room.status = RoomStatus.OCCUPIED
-    await db.flush()
+    try:
+        await db.flush()
+    except IntegrityError:  # assigned concurrently: ix_room_assignments_active_student
+        raise ConflictException("Student already has a room") from None
     await db.refresh(assignment)
+    after_commit(db, partial(table_versions.bump, Room.__tablename__))
     return assignment
 
 
+async def check_out(db: AsyncSession, assignment_id: int) -> RoomAssignment:
+    released = await db.execute(
+        update(RoomAssignment)
+        .where(RoomAssignment.id == assignment_id, RoomAssignment.check_out.is_(None))
+        .values(check_out=datetime.now(timezone.utc))
+        .returning(RoomAssignment.room_id)
+        .execution_options(synchronize_session=False)
+    )
+    room_id = released.scalar_one_or_none()
+    if room_id is None:
+        if await db.get(RoomAssignment, assignment_id) is None:
+            raise NotFoundException("Assignment")
+        raise ConflictException("Assignment is already checked out")
+    await db.execute(
+        update(Room)
+        .where(Room.id == room_id)
+        .values(occupied=Room.occupied - 1, status=_status_for(Room.occupied - 1))
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(
+        select(RoomAssignment).where(RoomAssignment.id == assignment_id).execution_options(populate_existing=True)
+    )
+    after_commit(db, partial(table_versions.bump, Room.__tablename__))
+    return result.scalar_one()
+
+
 async def get_student_room(db: AsyncSession, student_id: int) -> RoomAssignment | None:
     result = await db.execute(
         select(RoomAssignment)
@@ -69,6 +150,131 @@ async def get_student_room(db: AsyncSession, student_id: int) -> RoomAssignment
     return result.scalar_one_or_none()
 
 
+# ─── Allocation ────────────────────────────────────────────
+ALLOCATION_JOB = "hostel_allocation"
+
+
+async def start_allocation(data: AllocationRequest, user_id: int) -> Job:
+    """Start allocating every unassigned student in the background: one run at a time on this worker."""
+    if jobs.running(ALLOCATION_JOB, "all"):
+        raise ConflictException("Rooms are already being allocated")
+    return await jobs.submit(ALLOCATION_JOB, "all", user_id, partial(allocate_rooms, data))
+
+
+async def get_allocation_job(job_id: str) -> Job:
+    job = await jobs.get(job_id)
+    if job is None or job.kind != ALLOCATION_JOB:
+        raise NotFoundException("Job")
+    return job
+
+
+async def allocate_rooms(data: AllocationRequest, progress: Progress) -> dict[str, Any]:
+    """
+    The allocation job. Loads the active students without a room and the rooms
+    with free beds, solves in the solver pool, then writes every assignment and
+    the rooms' new occupancy in one transaction, unless dry_run. A student's
+    year is the year their account was created. Returns the report kept as the
+    job result.
+    """
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    await progress("loading", 0.0)
+    free_rooms = select(Room.id).where(Room.status != RoomStatus.MAINTENANCE, Room.occupied < Room.capacity)
+    if data.buildings:
+        free_rooms = free_rooms.where(Room.building.in_(data.buildings))
+    async with AsyncSessionLocal() as db:
+        students = (await db.execute(
+            select(User.id, User.department, User.created_at)
+            .where(User.role == UserRole.STUDENT, User.is_active.is_(True), User.id.not_in(
+                select(RoomAssignment.student_id).where(RoomAssignment.check_out.is_(None))
+            ))
+            .order_by(User.id)
+        )).all()
+        rooms = (await db.execute(
+            select(Room.id, Room.building, Room.room_type, Room.capacity - Room.occupied)
+            .where(Room.id.in_(free_rooms)).order_by(Room.building, Room.floor, Room.room_number)
+        )).all()
+        amenities: dict[int, set[str]] = defaultdict(set)
+        for room_id, key in await db.execute(
+            select(RoomAmenity.room_id, RoomAmenity.amenity).where(RoomAmenity.room_id.in_(free_rooms))
+        ):
+            amenities[room_id].add(key)
+        residents: dict[int, list[tuple[int, str]]] = defaultdict(list)
+        for room_id, department, created_at in await db.execute(
+            select(RoomAssignment.room_id, User.department, User.created_at)
+            .join(User, User.id == RoomAssignment.student_id)
+            .where(RoomAssignment.check_out.is_(None), RoomAssignment.room_id.in_(free_rooms))
+        ):
+            residents[room_id].append((created_at.year, department or ""))
+    if not students:
+        raise ValidationException("Every active student already has a room")
+    if not rooms:
+        raise ValidationException("No room has a free bed")
+
+    wanted = {preference.student_id: preference for preference in data.preferences}
+    applicants = []
+    for student_id, department, created_at in students:
+        preference = wanted.pop(student_id, None)
+        stated = {} if preference is None else {
+            "room_type": preference.room_type.value if preference.room_type else None,
+            "building": preference.building, "amenities": frozenset(map(amenity_key, preference.amenities)),
+            "roommates": tuple(preference.roommates),
+        }
+        applicants.append(Applicant(student_id, department or "", created_at.year, **stated))
+    beds = [FreeRoom(room_id, building, room_type.value, frozenset(amenities[room_id]), free, tuple(residents[room_id]))
+            for room_id, building, room_type, free in rooms]
+    timings["load"] = round(time.perf_counter() - started, 3)
+
+    phase = time.perf_counter()
+    await progress("solving", 0.2, students=len(applicants), rooms=len(beds))
+    allocation = await solver_pool.run(allocate, applicants, beds)
+    timings["solve"] = round(time.perf_counter() - phase, 3)
+
+    if not data.dry_run and allocation.placements:
+        phase = time.perf_counter()
+        await progress("saving", 0.8, assignments=len(allocation.placements))
+        taken = Counter(allocation.placements.values())
+        table = Room.__table__
+        async with AsyncSessionLocal() as db:
+            try:
+                # One transaction: rooms filled or students housed since loading fail the
+                # occupancy check or the one-room-per-student index, and nothing is saved.
+                await (await db.connection()).execute(
+                    update(table).where(table.c.id == bindparam("room"))
+                    .values(occupied=table.c.occupied + bindparam("taken"),
+                            status=_status_for(table.c.occupied + bindparam("taken"))),
+                    [{"room": room_id, "taken": count} for room_id, count in taken.items()],
+                )
+                closed = (await db.execute(
+                    select(func.count(Room.id)).where(Room.id.in_(taken), Room.status == RoomStatus.MAINTENANCE)
+                )).scalar_one()
+                if closed:
+                    raise ConflictException(f"{closed} rooms went under maintenance while allocating: run it again")
+                await db.execute(insert(RoomAssignment), [
+                    {"room_id": room_id, "student_id": student_id}
+                    for student_id, room_id in allocation.placements.items()
+                ])
+                await db.commit()
+            except IntegrityError:
+                raise ConflictException("Rooms were assigned while allocating: run it again") from None
+        await table_versions.bump(Room.__tablename__)
+        timings["save"] = round(time.perf_counter() - phase, 3)
+
+    result = {
+        "dry_run": data.dry_run,
+        **allocation.report,
+        "unhoused_students": allocation.unhoused,
+        "ignored_preferences": len(wanted),  # for students who have a room or are not active students
+        "timings": timings,
+    }
+    if data.dry_run:
+        result["assignments"] = [
+            {"student_id": student_id, "room_id": room_id}
+            for student_id, room_id in sorted(allocation.placements.items())
+        ]
+    return result
+
+
 # ─── Maintenance ───────────────────────────────────────────
 async def create_maintenance_request(
     db: AsyncSession, data: MaintenanceCreate, reported_by: int
@@ -109,8 +315,8 @@ async def update_maintenance_request(
 
 async def list_maintenance_requests(
     db: AsyncSession, room_id: int | None = None, status: RequestStatus | None = None,
-    skip: int = 0, limit: int = 50,
-) -> tuple[list[MaintenanceRequest], int]:
+    skip: int = 0, limit: int = 50, cursor: str | None = None, include_total: bool = True,
+) -> tuple[list[MaintenanceRequest], int | None, str | None]:
     query = select(MaintenanceRequest)
     count_q = select(func.count(MaintenanceRequest.id))
     if room_id:
@@ -119,6 +325,11 @@ async def list_maintenance_requests(
     if status:
         query = query.where(MaintenanceRequest.status == status)
         count_q = count_q.where(MaintenanceRequest.status == status)
-    total = (await db.execute(count_q)).scalar() or 0
-    result = await db.execute(query.offset(skip).limit(limit).order_by(MaintenanceRequest.created_at.desc()))
-    return list(result.scalars().all()), total
+    total = None
+    if include_total and cursor is None:
+        total = (await db.execute(count_q)).scalar() or 0
+    result = await db.execute(
+        paginate(query, MAINTENANCE_SORT_KEYS, descending=True, cursor=cursor, skip=skip, limit=limit)
+    )
+    requests, next_cursor = next_page(result.scalars().all(), MAINTENANCE_SORT_KEYS, limit)
+    return requests, total, next_cursor
@@ -1,32 +1,54 @@
 """
 Seed script: populates the database with sample data for development.
 Run with: python -m app.seed
+
+With size options it generates a synthetic university instead, for load tests:
+    python -m app.seed --students 100000 --courses 3000 --semesters 8
+See `python -m app.seed --help`.
 """
+import argparse
 import asyncio
+import enum
+import random
 import sys
 import os
+import time as clock
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from itertools import islice
+from typing import Any, Iterable, Iterator
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
 from app.core.database import AsyncSessionLocal, engine, Base
 from app.core.security import hash_password
+from app.core.startup import create_schema
 from app.users.models import User, UserRole
-from app.academics.models import Course, Semester, TimetableSlot, DayOfWeek
-from app.housing.models import Room, RoomType
-from app.communication.models import ChatRoom, ChatRoomMember
+from app.academics.models import (
+    Attendance, AttendanceStatus, Course, Enrollment, Result, Semester, TimetableSlot, DayOfWeek,
+)
+from app.housing.models import (
+    MaintenanceRequest, RequestPriority, RequestStatus, Room, RoomAmenity, RoomAssignment, RoomStatus, RoomType,
+    amenity_keys,
+)
+from app.communication.models import (
+    ChatMessage, ChatRoom, ChatRoomMember, Leave, LeaveStatus, LeaveType,
+)
 
 # Import all models
-from app.users import models as _  # noqa
-from app.academics import models as __  # noqa
-from app.housing import models as ___  # noqa
-from app.communication import models as ____  # noqa
+from app.users import models as users_models  # noqa: F401
+from app.academics import models as academics_models  # noqa: F401
+from app.housing import models as housing_models  # noqa: F401
+from app.communication import models as communication_models  # noqa: F401
 
 
 async def seed():
     # Create all tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await create_schema(engine)
 
     async with AsyncSessionLocal() as db:
         # ─── Users ─────────────────────────────────────────
@@ -109,7 +131,6 @@ async def seed():
         await db.flush()
 
         # ─── Timetable ────────────────────────────────────
-        from datetime import time
         timetable_slots = [
             TimetableSlot(course_id=cs101.id, day=DayOfWeek.MONDAY,
                 start_time=time(9, 0), end_time=time(10, 30), room="A-101"),
@@ -140,6 +161,8 @@ async def seed():
                  room_type=RoomType.SUITE, capacity=2, amenities='["WiFi","AC","Kitchen","Attached Bath"]'),
         ]
         db.add_all(rooms)
+        await db.flush()
+        db.add_all(RoomAmenity(room_id=room.id, amenity=key) for room in rooms for key in amenity_keys(room.amenities))
 
         # ─── Chat Rooms ───────────────────────────────────
         general = ChatRoom(name="General Discussion", room_type="group", created_by=admin.id)
@@ -171,5 +194,441 @@ async def seed():
         print(f"   Student: manohar.k@ums.edu / Student@123")
 
 
+# ─── Synthetic University ─────────────────────────────────
+SYNTHETIC_PASSWORD = "Synthetic@123"
+DEPARTMENTS = (
+    "Computer Science", "Mathematics", "Physics", "Chemistry",
+    "Electrical Engineering", "Mechanical Engineering", "Economics", "Biology",
+)
+CURRENT_TERM_START = date(2024, 8, 1)  # fixed anchor so output is reproducible
+ANCHOR = datetime(2024, 12, 1, tzinfo=timezone.utc)
+MAX_TERMS_PER_STUDENT = 8
+TEACHING_DAYS = (DayOfWeek.MONDAY, DayOfWeek.TUESDAY, DayOfWeek.WEDNESDAY,
+                 DayOfWeek.THURSDAY, DayOfWeek.FRIDAY)
+ROOM_CAPACITY = {RoomType.SINGLE: 1, RoomType.DOUBLE: 2, RoomType.TRIPLE: 3, RoomType.SUITE: 2}
+GRADES = ((90, "A+", 10.0), (80, "A", 9.0), (70, "B+", 8.0), (60, "B", 7.0),
+          (50, "C", 6.0), (40, "D", 5.0), (0, "F", 0.0))
+
+
+@dataclass
+class SyntheticUniversity:
+    """
+    Shape of a generated dataset. Users get sequential ids: 1 is the admin,
+    then the faculty, then the students. Every account uses SYNTHETIC_PASSWORD.
+
+    Terms alternate fall/spring going back from fall 2024 (the current term).
+    Each student is admitted in some term and takes 4-6 courses per term, mostly
+    from their own department; completed terms get published results, and the
+    most recent `attendance_terms` terms get `sessions` attendance rows per course.
+    """
+    students: int = 1_000
+    courses: int = 100
+    semesters: int = 1
+    faculty: int | None = None
+    sessions: int = 40
+    attendance_terms: int = 1
+    chat_messages: int = 20_000
+    housed_fraction: float = 0.6
+    seed: int = 42
+
+    def __post_init__(self):
+        if self.faculty is None:
+            self.faculty = max(1, self.courses // 10)
+
+    @property
+    def first_student_id(self) -> int:
+        return self.faculty + 2
+
+    @staticmethod
+    def student_email(i: int) -> str:
+        return f"student{i}@ums.edu"
+
+    @staticmethod
+    def faculty_email(i: int) -> str:
+        return f"faculty{i}@ums.edu"
+
+    def faculty_for_course(self, course_id: int) -> int:
+        """Index (not user id) of the faculty member teaching a course."""
+        return (course_id - 1) % self.faculty
+
+    def term(self, t: int) -> tuple[Semester, int, date]:
+        """Semester, year and start date of term t (0 = oldest, semesters-1 = current)."""
+        back = self.semesters - 1 - t
+        if back % 2 == 0:
+            year = CURRENT_TERM_START.year - back // 2
+            return Semester.FALL, year, date(year, 8, 1)
+        year = CURRENT_TERM_START.year - (back - 1) // 2
+        return Semester.SPRING, year, date(year, 1, 8)
+
+    def course_semester(self, course_index: int) -> Semester:
+        return Semester.FALL if course_index % 2 == 0 else Semester.SPRING
+
+    def _rng(self, stream: int, key: int = 0) -> random.Random:
+        """Independent, reproducible random stream per (table, entity)."""
+        return random.Random(self.seed * 1_000_003 + stream * 10_000_019 + key)
+
+    def student_plan(self, student: int, pools: dict[tuple[Semester, str], list[int]],
+                     by_semester: dict[Semester, list[int]]) -> list[tuple[int, int]]:
+        """(course_id, term) pairs the student took, regenerated identically on every call."""
+        rng = self._rng(1, student)
+        dept = DEPARTMENTS[student % len(DEPARTMENTS)]
+        admitted = rng.randrange(self.semesters)
+        taken: set[int] = set()
+        plan = []
+        for t in range(admitted, min(self.semesters, admitted + MAX_TERMS_PER_STUDENT)):
+            semester = self.term(t)[0]
+            own, anywhere = pools.get((semester, dept)) or by_semester[semester], by_semester[semester]
+            want = min(rng.choice((4, 5, 5, 6)), len(anywhere))
+            picked = 0
+            for _ in range(want * 10):  # bounded: small catalogues can run out of untaken courses
+                if picked == want:
+                    break
+                course_id = rng.choice(own if rng.random() < 0.7 else anywhere)
+                if course_id not in taken:
+                    taken.add(course_id)
+                    plan.append((course_id, t))
+                    picked += 1
+        return plan
+
+
+def _chunks(rows: Iterable[dict[str, Any]], size: int) -> Iterator[list[dict[str, Any]]]:
+    it = iter(rows)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def _copy_value(value: Any) -> Any:
+    # SQLAlchemy stores Python enums by member name.
+    return value.name if isinstance(value, enum.Enum) else value
+
+
+async def _write_chunk(conn: AsyncConnection, model, chunk: list[dict[str, Any]], use_copy: bool):
+    if use_copy:
+        columns = list(chunk[0])
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            model.__tablename__, columns=columns,
+            records=[tuple(_copy_value(row[c]) for c in columns) for row in chunk],
+        )
+    else:
+        await conn.execute(insert(model), chunk)
+
+
+class BulkWriter:
+    """Streams generated rows into tables in chunks and records rows/second per table."""
+
+    def __init__(self, chunk_size: int = 10_000):
+        self.chunk_size = chunk_size
+        self.use_copy = engine.dialect.name == "postgresql" and engine.dialect.driver == "asyncpg"
+        self.report: dict[str, tuple[int, float]] = {}
+
+    async def write(self, model, rows: Iterable[dict[str, Any]]) -> int:
+        total, start = 0, clock.perf_counter()
+        for chunk in _chunks(rows, self.chunk_size):
+            async with engine.begin() as conn:
+                await _write_chunk(conn, model, chunk, self.use_copy)
+            total += len(chunk)
+        self.report[model.__tablename__] = (total, clock.perf_counter() - start)
+        return total
+
+
+def _grade(total: float) -> tuple[str, float]:
+    return next((grade, gpa) for floor, grade, gpa in GRADES if total >= floor)
+
+
+async def generate(spec: SyntheticUniversity, chunk_size: int = 10_000) -> dict[str, tuple[int, float]]:
+    """
+    Insert a synthetic university into empty tables. Every row is a plain dict
+    built on the fly and written with Core bulk inserts (COPY on asyncpg), so
+    memory stays flat no matter the size. Returns {table: (rows, seconds)}.
+    """
+    writer = BulkWriter(chunk_size)
+    hashed = hash_password(SYNTHETIC_PASSWORD)  # one Argon2 hash shared by every account
+    first_student = spec.first_student_id
+
+    # ─── Users ───
+    def users():
+        yield {"email": "admin@ums.edu", "hashed_password": hashed, "full_name": "Synthetic Admin",
+               "role": UserRole.ADMIN, "enrollment_no": None, "department": "Administration",
+               "is_active": True, "created_at": ANCHOR, "updated_at": ANCHOR}
+        for i in range(spec.faculty):
+            yield {"email": spec.faculty_email(i), "hashed_password": hashed,
+                   "full_name": f"Faculty Member {i}", "role": UserRole.FACULTY, "enrollment_no": None,
+                   "department": DEPARTMENTS[i % len(DEPARTMENTS)], "is_active": True,
+                   "created_at": ANCHOR, "updated_at": ANCHOR}
+        for i in range(spec.students):
+            yield {"email": spec.student_email(i), "hashed_password": hashed,
+                   "full_name": f"Student {i}", "role": UserRole.STUDENT,
+                   "enrollment_no": f"S{i:07d}", "department": DEPARTMENTS[i % len(DEPARTMENTS)],
+                   "is_active": True, "created_at": ANCHOR - timedelta(seconds=spec.students - i), "updated_at": ANCHOR}
+
+    await writer.write(User, users())
+
+    # ─── Courses & timetable ───
+    pools: dict[tuple[Semester, str], list[int]] = {}
+    by_semester: dict[Semester, list[int]] = {Semester.FALL: [], Semester.SPRING: []}
+
+    def courses():
+        rng = spec._rng(3)
+        for i in range(spec.courses):
+            dept, semester = DEPARTMENTS[i % len(DEPARTMENTS)], spec.course_semester(i)
+            pools.setdefault((semester, dept), []).append(i + 1)
+            by_semester[semester].append(i + 1)
+            yield {"code": f"{dept[:2].upper()}{i:05d}", "name": f"{dept} {100 + i % 400}",
+                   "credits": rng.choice((2, 3, 3, 4, 4)), "department": dept, "semester": semester,
+                   "faculty_id": 2 + spec.faculty_for_course(i + 1),
+                   "description": None, "is_active": True}
+
+    await writer.write(Course, courses())
+    if not by_semester[Semester.SPRING]:
+        by_semester[Semester.SPRING] = by_semester[Semester.FALL]
+
+    def slots():
+        rng = spec._rng(4)
+        for course_id in range(1, spec.courses + 1):
+            hour = rng.randint(8, 16)
+            for day in rng.sample(TEACHING_DAYS, 2):
+                yield {"course_id": course_id, "day": day, "start_time": time(hour),
+                       "end_time": time(hour, 50), "room": f"L-{rng.randrange(1, 300):03d}"}
+
+    await writer.write(TimetableSlot, slots())
+
+    # ─── Enrollments, results, attendance ───
+    # Plans are regenerated per student in each pass instead of being held in memory.
+    def plans() -> Iterator[tuple[int, list[tuple[int, int]]]]:
+        for s in range(spec.students):
+            yield first_student + s, spec.student_plan(s, pools, by_semester)
+
+    def enrollments():
+        for student_id, plan in plans():
+            for course_id, t in plan:
+                yield {"student_id": student_id, "course_id": course_id,
+                       "enrolled_at": datetime.combine(spec.term(t)[2], time(9), timezone.utc)}
+
+    await writer.write(Enrollment, enrollments())
+
+    def results():
+        for student_id, plan in plans():
+            rng = spec._rng(5, student_id)
+            ability = rng.gauss(0, 8)
+            for course_id, t in plan:
+                if t == spec.semesters - 1:
+                    continue  # current term: no results yet
+                semester, year, _ = spec.term(t)
+                internal = round(min(40.0, max(0.0, rng.gauss(28, 5) + ability / 3)), 1)
+                external = round(min(60.0, max(0.0, rng.gauss(40, 9) + ability * 2 / 3)), 1)
+                grade, gpa = _grade(internal + external)
+                yield {"student_id": student_id, "course_id": course_id, "semester": semester,
+                       "year": year, "internal_marks": internal, "external_marks": external,
+                       "grade": grade, "gpa": gpa, "published": True}
+
+    await writer.write(Result, results())
+
+    statuses = (AttendanceStatus.ABSENT, AttendanceStatus.LATE, AttendanceStatus.EXCUSED)
+    first_attendance_term = spec.semesters - spec.attendance_terms
+
+    def attendance():
+        for student_id, plan in plans():
+            rng = spec._rng(6, student_id)
+            diligence = rng.betavariate(8, 1.5)  # most students attend ~85%, a long tail far less
+            for course_id, t in plan:
+                if t < first_attendance_term:
+                    continue
+                start = spec.term(t)[2] + timedelta(days=course_id % 2)
+                marked_by = 2 + spec.faculty_for_course(course_id)
+                for n in range(spec.sessions):
+                    status = (AttendanceStatus.PRESENT if rng.random() < diligence
+                              else rng.choices(statuses, (0.6, 0.3, 0.1))[0])
+                    yield {"student_id": student_id, "course_id": course_id,
+                           "date": start + timedelta(days=2 * n + 7 * (n // 3)), "status": status,
+                           "marked_by": marked_by}
+
+    await writer.write(Attendance, attendance())
+
+    # ─── Housing ───
+    housed = int(spec.students * spec.housed_fraction)
+    room_types = list(ROOM_CAPACITY)
+    room_weights = (0.15, 0.5, 0.25, 0.1)  # single, double, triple, suite
+    rng = spec._rng(7)
+    room_specs: list[RoomType] = []
+    beds = 0
+    while beds < housed * 1.1 or not room_specs:  # ~10% spare beds
+        room_type = rng.choices(room_types, room_weights)[0]
+        room_specs.append(room_type)
+        beds += ROOM_CAPACITY[room_type]
+    under_maintenance = {i for i in range(len(room_specs)) if rng.random() < 0.02}
+    residents = rng.sample(range(spec.students), housed)
+
+    occupancy: list[list[int]] = [[] for _ in room_specs]
+    room_index = 0
+    for s in residents:
+        while room_index in under_maintenance or (
+            room_index < len(room_specs) and len(occupancy[room_index]) >= ROOM_CAPACITY[room_specs[room_index]]
+        ):
+            room_index += 1
+        if room_index >= len(room_specs):
+            break
+        occupancy[room_index].append(first_student + s)
+
+    amenities = ('["WiFi","Fan"]', '["WiFi","AC"]', '["WiFi","AC","Attached Bath"]',
+                 '["WiFi","AC","Attached Bath","Study Desk"]')
+    amenity_choice = [min(3, room_types.index(room_type) + rng.randrange(2)) for room_type in room_specs]
+
+    def rooms():
+        for i, room_type in enumerate(room_specs):
+            if i in under_maintenance:
+                status = RoomStatus.MAINTENANCE
+            elif len(occupancy[i]) >= ROOM_CAPACITY[room_type]:
+                status = RoomStatus.OCCUPIED
+            else:
+                status = RoomStatus.AVAILABLE
+            building = i // 400
+            yield {"building": f"Hostel {chr(65 + building % 26)}{building // 26 or ''}",
+                   "floor": 1 + (i % 400) // 40, "room_number": f"H{i:06d}", "room_type": room_type,
+                   "capacity": ROOM_CAPACITY[room_type], "occupied": len(occupancy[i]), "status": status,
+                   "amenities": amenities[amenity_choice[i]]}
+
+    await writer.write(Room, rooms())
+    keys = [sorted(amenity_keys(choice)) for choice in amenities]
+    await writer.write(RoomAmenity, (
+        {"room_id": i + 1, "amenity": key} for i, choice in enumerate(amenity_choice) for key in keys[choice]
+    ))
+
+    def assignments():
+        for i, members in enumerate(occupancy):
+            for student_id in members:
+                check_in = ANCHOR - timedelta(days=rng.randint(30, 120))
+                yield {"room_id": i + 1, "student_id": student_id, "assigned_at": check_in,
+                       "check_in": check_in, "check_out": None}
+
+    await writer.write(RoomAssignment, assignments())
+
+    request_statuses = (RequestStatus.PENDING, RequestStatus.IN_PROGRESS,
+                        RequestStatus.RESOLVED, RequestStatus.REJECTED)
+    priorities = (RequestPriority.LOW, RequestPriority.MEDIUM, RequestPriority.HIGH, RequestPriority.URGENT)
+
+    def maintenance():
+        titles = ("Leaking tap", "Broken fan", "No hot water", "Window latch", "WiFi dead spot")
+        for i in range(max(1, len(room_specs) // 10)):
+            status = rng.choices(request_statuses, (0.3, 0.2, 0.45, 0.05))[0]
+            created = ANCHOR - timedelta(hours=rng.randint(1, 24 * 120))
+            yield {"room_id": rng.randint(1, len(room_specs)),
+                   "reported_by": first_student + rng.randrange(spec.students),
+                   "title": rng.choice(titles), "description": "Reported by resident.",
+                   "priority": rng.choices(priorities, (0.3, 0.45, 0.2, 0.05))[0],
+                   "status": status, "created_at": created,
+                   "resolved_at": created + timedelta(days=2) if status == RequestStatus.RESOLVED else None}
+
+    await writer.write(MaintenanceRequest, maintenance())
+
+    # ─── Chat: one room per course, members are current-term students ───
+    await writer.write(ChatRoom, (
+        {"name": f"Course {i + 1} discussion", "room_type": "group",
+         "created_by": 2 + spec.faculty_for_course(i + 1), "created_at": ANCHOR - timedelta(days=200)}
+        for i in range(spec.courses)
+    ))
+    room_members: list[list[int]] = [[] for _ in range(spec.courses)]
+
+    def members():
+        current = spec.semesters - 1
+        for student_id, plan in plans():
+            for course_id, t in plan:
+                if t == current:
+                    room_members[course_id - 1].append(student_id)
+                    yield {"room_id": course_id, "user_id": student_id,
+                           "joined_at": ANCHOR - timedelta(days=100)}
+
+    await writer.write(ChatRoomMember, members())
+
+    # Activity is heavy-tailed: a few rooms carry most of the traffic (Zipf, s=1.1).
+    active = [i for i, m in enumerate(room_members) if m]
+    rng.shuffle(active)
+    cumulative, acc = [], 0.0
+    for rank in range(1, len(active) + 1):
+        acc += 1 / rank ** 1.1
+        cumulative.append(acc)
+
+    def messages():
+        if not active:
+            return
+        window = timedelta(days=120).total_seconds()
+        for i in range(spec.chat_messages):
+            room = rng.choices(active, cum_weights=cumulative)[0]
+            yield {"room_id": room + 1, "sender_id": rng.choice(room_members[room]),
+                   "content": f"Message {i} about lecture {rng.randint(1, spec.sessions)}",
+                   "sent_at": ANCHOR - timedelta(seconds=window * (1 - i / spec.chat_messages))}
+
+    await writer.write(ChatMessage, messages())
+
+    leave_types = (LeaveType.SICK, LeaveType.CASUAL, LeaveType.EARNED, LeaveType.MATERNITY, LeaveType.DUTY)
+    leave_statuses = (LeaveStatus.PENDING, LeaveStatus.APPROVED, LeaveStatus.REJECTED, LeaveStatus.CANCELLED)
+
+    def leaves():
+        for i in range(max(1, spec.students // 20)):
+            start = CURRENT_TERM_START + timedelta(days=rng.randrange(120))
+            status = rng.choices(leave_statuses, (0.3, 0.55, 0.1, 0.05))[0]
+            yield {"applicant_id": first_student + rng.randrange(spec.students),
+                   "leave_type": rng.choices(leave_types, (0.35, 0.45, 0.1, 0.01, 0.09))[0],
+                   "start_date": start.isoformat(),
+                   "end_date": (start + timedelta(days=rng.randint(0, 4))).isoformat(),
+                   "reason": "Personal", "status": status,
+                   "reviewed_by": None if status == LeaveStatus.PENDING else 2 + rng.randrange(spec.faculty),
+                   "created_at": ANCHOR - timedelta(hours=i)}
+
+    await writer.write(Leave, leaves())
+    return writer.report
+
+
+async def seed_synthetic(spec: SyntheticUniversity, chunk_size: int, reset: bool):
+    if reset:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+    await create_schema(engine)
+    async with engine.begin() as conn:
+        if not reset and await conn.scalar(select(func.count()).select_from(User)):
+            raise SystemExit("Database already has users; pass --reset to replace it.")
+
+    start = clock.perf_counter()
+    report = await generate(spec, chunk_size)
+    elapsed = clock.perf_counter() - start
+    total = sum(rows for rows, _ in report.values())
+    print(f"{'table':<22} {'rows':>12} {'seconds':>9} {'rows/s':>11}")
+    for table, (rows, seconds) in report.items():
+        print(f"{table:<22} {rows:>12,} {seconds:>9.2f} {rows / seconds if seconds else 0:>11,.0f}")
+    print(f"{'total':<22} {total:>12,} {elapsed:>9.2f} {total / elapsed:>11,.0f}")
+    print(f"\n   Login: admin@ums.edu, faculty0@ums.edu, student0@ums.edu / {SYNTHETIC_PASSWORD}")
+    await engine.dispose()
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Seed demo data, or generate a synthetic university when --students is given.",
+    )
+    parser.add_argument("--students", type=int, help="number of students (enables synthetic mode)")
+    parser.add_argument("--courses", type=int, default=SyntheticUniversity.courses)
+    parser.add_argument("--semesters", type=int, default=SyntheticUniversity.semesters,
+                        help="terms of enrollment/result history, ending with the current term")
+    parser.add_argument("--faculty", type=int, help="default: one per 10 courses")
+    parser.add_argument("--sessions", type=int, default=SyntheticUniversity.sessions,
+                        help="attendance sessions per course per term")
+    parser.add_argument("--attendance-terms", type=int, default=SyntheticUniversity.attendance_terms,
+                        help="most recent terms that get attendance rows")
+    parser.add_argument("--chat-messages", type=int, default=SyntheticUniversity.chat_messages)
+    parser.add_argument("--seed", type=int, default=SyntheticUniversity.seed)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    args = parser.parse_args(argv)
+
+    if args.students is None:
+        asyncio.run(seed())
+        return
+    spec = SyntheticUniversity(
+        students=args.students, courses=args.courses, semesters=args.semesters, faculty=args.faculty,
+        sessions=args.sessions, attendance_terms=min(args.attendance_terms, args.semesters),
+        chat_messages=args.chat_messages, seed=args.seed,
+    )
+    asyncio.run(seed_synthetic(spec, args.chunk_size, args.reset))
+
+
 if __name__ == "__main__":
-    asyncio.run(seed())
+    main()
@@ -5,7 +5,8 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.deps import CurrentUser, require_role
+from app.core.deps import CurrentUser, get_read_db, require_role
+from app.core.serialization import rows_response
 from app.users.models import UserRole
 from app.users.schemas import UserCreate, UserListResponse, UserResponse, UserUpdate
 from app.users import service
@@ -25,9 +26,12 @@ async def create_user(
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_profile(current_user: CurrentUser):
+async def get_current_profile(
+    current_user: CurrentUser,
+    db: AsyncSession = Depends(get_read_db),
+):
     """Get the authenticated user's profile."""
-    return current_user
+    return await service.get_user_by_id(db, current_user.id)
 
 
 @router.patch("/me", response_model=UserResponse)
@@ -45,18 +49,22 @@ async def list_users(
     role: UserRole | None = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    cursor: str | None = None,
+    include_total: bool = True,
+    db: AsyncSession = Depends(get_read_db),
     _admin: None = Depends(require_role(UserRole.ADMIN)),
 ):
-    """Admin-only: list all users with optional role filtering."""
-    users, total = await service.list_users(db, role=role, skip=skip, limit=limit)
-    return UserListResponse(users=users, total=total)
+    """Admin-only: list all users with optional role filtering. Pass next_cursor back as cursor to page."""
+    users, total, next_cursor = await service.list_users(
+        db, role=role, skip=skip, limit=limit, cursor=cursor, include_total=include_total
+    )
+    return rows_response(UserResponse, users, key="users", extra={"total": total, "next_cursor": next_cursor})
 
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     _admin: None = Depends(require_role(UserRole.ADMIN)),
 ):
     """Admin-only: get a user by ID."""
@@ -44,4 +44,5 @@ class UserResponse(BaseModel):
 
 class UserListResponse(BaseModel):
     users: list[UserResponse]
-    total: int
+    total: int | None = None
+    next_cursor: str | None = None
@@ -4,8 +4,11 @@ User service: business logic for user CRUD operations.
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import principal_cache
+from app.core.database import after_commit
 from app.core.exceptions import ConflictException, NotFoundException
-from app.core.security import hash_password
+from app.core.pagination import next_page, paginate
+from app.core.security import hasher
 from app.users.models import User, UserRole
 from app.users.schemas import UserCreate, UserUpdate
 
@@ -18,7 +21,7 @@ async def create_user(db: AsyncSession, data: UserCreate) -> User:
 
     user = User(
         email=data.email,
-        hashed_password=hash_password(data.password),
+        hashed_password=await hasher.hash(data.password),
         full_name=data.full_name,
         role=data.role,
         enrollment_no=data.enrollment_no,
@@ -44,9 +47,14 @@ async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
     return result.scalar_one_or_none()
 
 
+USER_SORT_KEYS = (User.created_at, User.id)
+
+
 async def list_users(
-    db: AsyncSession, role: UserRole | None = None, skip: int = 0, limit: int = 50
-) -> tuple[list[User], int]:
+    db: AsyncSession, role: UserRole | None = None, skip: int = 0, limit: int = 50,
+    cursor: str | None = None, include_total: bool = True,
+) -> tuple[list[User], int | None, str | None]:
+    """Newest users first. The total is only counted for the first (non-cursor) page."""
     query = select(User)
     count_query = select(func.count(User.id))
 
@@ -54,11 +62,16 @@ async def list_users(
         query = query.where(User.role == role)
         count_query = count_query.where(User.role == role)
 
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
+    total = None
+    if include_total and cursor is None:
+        total_result = await db.execute(count_query)
+        total = total_result.scalar() or 0
 
-    result = await db.execute(query.offset(skip).limit(limit).order_by(User.created_at.desc()))
-    return list(result.scalars().all()), total
+    result = await db.execute(
+        paginate(query, USER_SORT_KEYS, descending=True, cursor=cursor, skip=skip, limit=limit)
+    )
+    users, next_cursor = next_page(result.scalars().all(), USER_SORT_KEYS, limit)
+    return users, total, next_cursor
 
 
 async def update_user(db: AsyncSession, user_id: int, data: UserUpdate) -> User:
@@ -68,6 +81,7 @@ async def update_user(db: AsyncSession, user_id: int, data: UserUpdate) -> User:
         setattr(user, field, value)
     await db.flush()
     await db.refresh(user)
+    after_commit(db, lambda: principal_cache.invalidate(user_id))
     return user
 
 
@@ -76,4 +90,5 @@ async def deactivate_user(db: AsyncSession, user_id: int) -> User:
     user.is_active = False
     await db.flush()
     await db.refresh(user)
+    after_commit(db, lambda: principal_cache.invalidate(user_id))
     return user
@@ -0,0 +1,4 @@
+"""
+Performance benchmarks for the UMS API.
+Run from apps/api, e.g.: python -m benchmarks.login_burst
+"""
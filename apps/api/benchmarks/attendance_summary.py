@@ -0,0 +1,87 @@
+"""
+Benchmark: query count and latency of the attendance summaries as enrollments grow.
+
+Run with: python -m benchmarks.attendance_summary [--max-courses 32] [--classes 40]
+"""
+import argparse
+import asyncio
+import random
+from datetime import date, timedelta
+
+from benchmarks.common import QueryCounter, configure_database, reset_schema, timer
+
+configure_database()
+
+from sqlalchemy import delete, insert  # noqa: E402
+
+from app.academics import service  # noqa: E402
+from app.academics.models import (  # noqa: E402
+    Attendance, AttendanceStatus, Course, Enrollment, Semester,
+)
+from app.core.database import AsyncSessionLocal, engine  # noqa: E402
+from app.users.models import User, UserRole  # noqa: E402
+
+STUDENTS_PER_COURSE = 60
+
+
+async def seed(max_courses: int, classes: int):
+    await reset_schema()
+    rng = random.Random(42)
+    statuses = list(AttendanceStatus)
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(User), [
+            {"id": i, "email": f"user{i}@ums.edu", "hashed_password": "x",
+             "full_name": f"User {i}", "role": UserRole.FACULTY if i == 1 else UserRole.STUDENT}
+            for i in range(1, STUDENTS_PER_COURSE + 2)
+        ])
+        await db.execute(insert(Course), [
+            {"id": c, "code": f"C{c}", "name": f"Course {c}", "credits": 3,
+             "department": "CS", "semester": Semester.FALL, "faculty_id": 1}
+            for c in range(1, max_courses + 1)
+        ])
+        students = range(2, STUDENTS_PER_COURSE + 2)
+        await db.execute(insert(Enrollment), [
+            {"student_id": s, "course_id": c}
+            for c in range(1, max_courses + 1) for s in students
+        ])
+        start = date(2026, 1, 5)
+        await db.execute(insert(Attendance), [
+            {"student_id": s, "course_id": c, "date": start + timedelta(days=d),
+             "status": rng.choice(statuses), "marked_by": 1}
+            for c in range(1, max_courses + 1) for s in students for d in range(classes)
+        ])
+        await db.commit()
+
+
+async def run(max_courses: int, classes: int):
+    await seed(max_courses, classes)
+    counter = QueryCounter()
+    print(f"{'courses':>8} {'queries':>8} {'ms':>8}   (student summary)")
+    n = 1
+    while n <= max_courses:
+        async with AsyncSessionLocal() as db:
+            # Trim one student's enrollments to the first n courses, measure, roll back.
+            student_id = 2 + n % STUDENTS_PER_COURSE
+            await db.execute(
+                delete(Enrollment).where(Enrollment.student_id == student_id, Enrollment.course_id > n)
+            )
+            with counter.track(), timer() as t:
+                summaries = await service.get_attendance_summary(db, student_id)
+            await db.rollback()
+        assert len(summaries) == n
+        print(f"{n:>8} {counter.count:>8} {t['seconds'] * 1000:>8.2f}")
+        n *= 2
+
+    async with AsyncSessionLocal() as db:
+        with counter.track(), timer() as t:
+            rows = await service.get_course_attendance_summary(db, 1)
+    print(f"\nCourse summary: {len(rows)} students, {counter.count} queries, {t['seconds'] * 1000:.2f} ms")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-courses", type=int, default=32)
+    parser.add_argument("--classes", type=int, default=40, help="attendance rows per student per course")
+    args = parser.parse_args()
+    asyncio.run(run(args.max_courses, args.classes))
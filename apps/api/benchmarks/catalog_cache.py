@@ -0,0 +1,156 @@
+"""
+Benchmark and check: the response cache on the course catalog and timetables.
+
+On a synthetic university:
+
+1. Statements and median latency per request for /academics/courses (one page
+   per department), /academics/courses/{id} and /academics/timetable/me, with
+   the response cache off and on (warm).
+2. Stampede: --burst concurrent requests for a cold catalog page are answered
+   by a single computation.
+3. Invalidation: creating a course, a timetable slot or an enrollment through
+   the API is visible on the next read; cached and uncached bodies match.
+
+Exits non-zero if any check fails.
+
+Run with: python -m benchmarks.catalog_cache [--students 3000] [--rounds 100] [--burst 50]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from benchmarks.common import QueryCounter, configure_database, reset_schema
+
+configure_database()
+
+import httpx  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from app.academics.models import Course, Enrollment  # noqa: E402
+from app.core.database import AsyncSessionLocal  # noqa: E402
+from app.core.response_cache import response_cache  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.seed import SyntheticUniversity, generate  # noqa: E402
+from app.users.models import User, UserRole  # noqa: E402
+from main import app  # noqa: E402
+
+COURSES = "/api/v1/academics/courses"
+TIMETABLE = "/api/v1/academics/timetable/me"
+
+results: list[tuple[str, bool]] = []
+
+
+def check(name: str, ok: bool):
+    results.append((name, ok))
+    print(f"{'PASS' if ok else 'FAIL'}  {name}")
+
+
+def bearer(user_id: int) -> dict[str, str]:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+async def fixtures() -> tuple[list[str], int, int, int]:
+    """Departments, a course id, an enrolled student and an admin."""
+    async with AsyncSessionLocal() as db:
+        departments = list((await db.execute(select(Course.department).distinct())).scalars())
+        course_id = (await db.execute(select(Course.id).limit(1))).scalar_one()
+        student_id = (await db.execute(select(Enrollment.student_id).limit(1))).scalar_one()
+        admin_id = (await db.execute(select(User.id).where(User.role == UserRole.ADMIN).limit(1))).scalar_one()
+    return departments, course_id, student_id, admin_id
+
+
+async def measure(client: httpx.AsyncClient, requests: list[tuple[str, dict]], headers: dict[str, str],
+                  rounds: int) -> tuple[float, float]:
+    """(statements per request, median ms per request) over `rounds` passes of `requests`."""
+    samples = []
+    with QueryCounter().track() as counter:
+        for _ in range(rounds):
+            for path, params in requests:
+                start = time.perf_counter()
+                (await client.get(path, params=params, headers=headers)).raise_for_status()
+                samples.append(time.perf_counter() - start)
+    return counter.count / len(samples), statistics.median(samples) * 1000
+
+
+async def body(client: httpx.AsyncClient, path: str, headers: dict[str, str], **params) -> bytes:
+    response = await client.get(path, params=params, headers=headers)
+    response.raise_for_status()
+    return response.content
+
+
+async def run(students: int, rounds: int, burst: int) -> int:
+    await reset_schema()
+    await generate(SyntheticUniversity(students=students, courses=300))
+    departments, course_id, student_id, admin_id = await fixtures()
+    student, admin = bearer(student_id), bearer(admin_id)
+
+    cases = {
+        "catalog pages": [(COURSES, {"department": d, "limit": 100}) for d in departments],
+        "course detail": [(f"{COURSES}/{course_id}", {})],
+        "timetable/me": [(TIMETABLE, {})],
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=transport, base_url="http://catalog-cache"
+    ) as client:
+        await client.get(TIMETABLE, headers=student)  # principal cache
+
+        print(f"statements and median ms per request ({rounds} rounds)")
+        print(f"{'case':<16} {'off stmts':>10} {'off ms':>8} {'on stmts':>10} {'on ms':>8}")
+        for name, requests in cases.items():
+            response_cache.enabled = False
+            uncached = [await body(client, path, student, **params) for path, params in requests]
+            off = await measure(client, requests, student, rounds)
+            response_cache.enabled = True
+            await measure(client, requests, student, 1)
+            on = await measure(client, requests, student, rounds)
+            cached = [await body(client, path, student, **params) for path, params in requests]
+            print(f"{name:<16} {off[0]:>10.1f} {off[1]:>8.2f} {on[0]:>10.1f} {on[1]:>8.2f}")
+            check(f"{name}: cached bodies match uncached ones", cached == uncached)
+        print()
+
+        computed = response_cache.stats()["computed"]
+        with QueryCounter().track() as counter:
+            responses = await asyncio.gather(*(
+                client.get(COURSES, params={"limit": 7}, headers=student) for _ in range(burst)
+            ))
+        check(f"{burst} concurrent cold requests: {response_cache.stats()['computed'] - computed} computation, "
+              f"{counter.count} statements",
+              all(r.status_code == 200 for r in responses)
+              and response_cache.stats()["computed"] - computed == 1
+              and len({r.content for r in responses}) == 1)
+
+        page = await body(client, COURSES, student, limit=100, department=departments[0])
+        template = (await client.get(f"{COURSES}/{course_id}", headers=student)).json()
+        created = await client.post(COURSES, headers=admin, json={
+            "code": "CCH101", "name": "Cache Coherence", "credits": 3, "department": departments[0],
+            "semester": template["semester"], "faculty_id": template["faculty_id"],
+        })
+        created.raise_for_status()
+        after = await body(client, COURSES, student, limit=100, department=departments[0])
+        check("creating a course invalidates the catalog", after != page and b"CCH101" in after)
+
+        before = await body(client, TIMETABLE, student)
+        (await client.post(f"/api/v1/academics/enroll/{created.json()['id']}", headers=student)).raise_for_status()
+        (await client.post("/api/v1/academics/timetable", headers=admin, json={
+            "course_id": created.json()["id"], "day": "saturday",
+            "start_time": "07:00:00", "end_time": "07:50:00", "room": "CC-1",
+        })).raise_for_status()
+        after = await body(client, TIMETABLE, student)
+        check("enrolling and adding a slot invalidate the timetable", after != before and b"CC-1" in after)
+
+        print(response_cache.stats())
+
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=3000)
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--burst", type=int, default=50)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.students, args.rounds, args.burst)))
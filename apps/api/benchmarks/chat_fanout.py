@@ -0,0 +1,88 @@
+"""
+Benchmark: broadcast fan-out to thousands of sockets in one room, with slow clients.
+
+Uses in-process fake sockets (no network) so the numbers isolate the
+ConnectionManager: time to enqueue a broadcast for every socket, time until
+every fast socket has received it, and what happens to the slow ones under
+each slow-consumer policy.
+
+Run with: python -m benchmarks.chat_fanout [--sockets 2000] [--slow 20] [--messages 200]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.common import configure_database, percentile
+
+configure_database()
+
+from app.communication.broker import InMemoryBroker  # noqa: E402
+from app.communication.service import ConnectionManager  # noqa: E402
+
+ROOM = 1
+
+
+class FakeSocket:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.received = 0
+        self.closed = False
+        self.last_arrival = 0.0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        if self.closed:
+            raise RuntimeError("socket closed")
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received += 1
+        self.last_arrival = time.perf_counter()
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        self.closed = True
+
+
+async def run_policy(policy: str, sockets: int, slow: int, messages: int, queue_size: int):
+    manager = ConnectionManager(InMemoryBroker(), queue_size=queue_size, slow_consumer_policy=policy)
+    fast = [FakeSocket() for _ in range(sockets - slow)]
+    laggards = [FakeSocket(delay=0.05) for _ in range(slow)]
+    for ws in fast + laggards:
+        await manager.connect(ws, ROOM)
+
+    enqueue_ms, delivered_ms = [], []
+    for i in range(messages):
+        start = time.perf_counter()
+        await manager.broadcast(ROOM, {"type": "message", "sender_id": 1, "content": f"msg {i}", "room_id": ROOM})
+        enqueue_ms.append((time.perf_counter() - start) * 1000)
+        # Wait until every fast socket has this message.
+        while any(ws.received <= i for ws in fast):
+            await asyncio.sleep(0)
+        delivered_ms.append((max(ws.last_arrival for ws in fast) - start) * 1000)
+
+    stats = manager.stats().get(ROOM, {})
+    print(f"policy={policy:<12} enqueue p50={statistics.median(enqueue_ms):.2f}ms "
+          f"p99={percentile(enqueue_ms, 0.99):.2f}ms | all-fast-delivered "
+          f"p50={statistics.median(delivered_ms):.2f}ms p99={percentile(delivered_ms, 0.99):.2f}ms")
+    print(f"{'':>13} connections left={stats.get('connections', 0)} dropped={stats.get('dropped', 0)} "
+          f"evicted={stats.get('evicted', 0)} slow sockets closed={sum(ws.closed for ws in laggards)}")
+    await manager.close()
+
+
+async def run(sockets: int, slow: int, messages: int, queue_size: int):
+    print(f"{sockets} sockets in one room ({slow} slow at 50ms/send), {messages} broadcasts, "
+          f"queue size {queue_size}")
+    for policy in ("drop_oldest", "disconnect"):
+        await run_policy(policy, sockets, slow, messages, queue_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sockets", type=int, default=2000)
+    parser.add_argument("--slow", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--queue-size", type=int, default=64)
+    args = parser.parse_args()
+    asyncio.run(run(args.sockets, args.slow, args.messages, args.queue_size))
@@ -0,0 +1,102 @@
+"""
+Integration check: chat messages fan out across separate uvicorn processes via Redis.
+
+Starts two API processes with CHAT_BROKER=redis, connects a WebSocket client to
+each, sends from one and asserts delivery on both. Uses REDIS_URL (default
+redis://localhost:6379/0); pass --fakeredis to run against an in-process
+fakeredis TCP server instead (pip install fakeredis).
+
+Run with: python -m benchmarks.chat_multiworker [--fakeredis] [--messages 200]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import websockets
+
+from benchmarks.common import configure_database, percentile
+
+PORTS = (8101, 8102)
+
+
+def start_fakeredis(port: int) -> str:
+    import threading
+    from fakeredis import TcpFakeServer
+
+    server = TcpFakeServer(("127.0.0.1", port), server_type="redis")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"redis://127.0.0.1:{port}/0"
+
+
+def start_worker(port: int, redis_url: str) -> subprocess.Popen:
+    env = {**os.environ, "CHAT_BROKER": "redis", "REDIS_URL": redis_url}
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+
+
+async def wait_ready(port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"http://127.0.0.1:{port}/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise TimeoutError(f"worker on port {port} did not start")
+
+
+async def run(messages: int, redis_url: str, workers: list[subprocess.Popen]) -> int:
+    # Started one at a time so the workers do not race each other creating tables.
+    for port in PORTS:
+        workers.append(start_worker(port, redis_url))
+        await wait_ready(port)
+    url = "ws://127.0.0.1:{}/api/v1/communication/ws/1"
+    async with websockets.connect(url.format(PORTS[0])) as sender, \
+            websockets.connect(url.format(PORTS[1])) as remote:
+        await asyncio.sleep(0.2)  # let both workers finish subscribing
+        latencies = []
+        for i in range(messages):
+            start = time.perf_counter()
+            await sender.send(json.dumps({"sender_id": 1, "content": f"hello {i}"}))
+            local = json.loads(await asyncio.wait_for(sender.recv(), 5))
+            received = json.loads(await asyncio.wait_for(remote.recv(), 5))
+            latencies.append((time.perf_counter() - start) * 1000)
+            if received["content"] != f"hello {i}" or local["content"] != received["content"]:
+                print(f"FAIL: unexpected message {received}")
+                return 1
+    print(f"OK: {messages} messages delivered across {len(PORTS)} workers")
+    print(f"cross-worker latency p50={percentile(latencies, 0.5):.2f}ms "
+          f"p99={percentile(latencies, 0.99):.2f}ms")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fakeredis", action="store_true")
+    parser.add_argument("--messages", type=int, default=200)
+    args = parser.parse_args()
+
+    configure_database()
+    redis_url = start_fakeredis(6390) if args.fakeredis else os.environ.get(
+        "REDIS_URL", "redis://localhost:6379/0"
+    )
+    workers: list[subprocess.Popen] = []
+    try:
+        return asyncio.run(run(args.messages, redis_url, workers))
+    finally:
+        for worker in workers:
+            worker.terminate()
+            worker.wait()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Benchmark and check: the write-behind chat message writer with bad messages.
+
+1. --messages valid messages go through MessageWriter with --bad malformed
+   ones spread through the middle of them (content of the wrong type, missing
+   content). Every valid message is stored, every bad one is counted as
+   rejected, and nothing is retried: a bad row falls back to row-by-row
+   inserts instead of blocking its batch.
+2. The database fails the first --outages inserts with a transient error.
+   Those batches are retried and nothing is lost or rejected.
+3. Over the WebSocket, a malformed payload gets an error frame and is neither
+   broadcast nor queued, and a valid one after it is broadcast and stored.
+
+Exits non-zero if any check fails.
+
+Run with: python -m benchmarks.chat_writer [--messages 20000] [--bad 5] [--outages 3]
+"""
+import argparse
+import asyncio
+import sys
+
+from benchmarks.common import configure_database, reset_schema, timer
+
+configure_database()
+
+from sqlalchemy import func, insert, select  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from starlette.testclient import TestClient  # noqa: E402
+
+from app.communication.models import ChatMessage, ChatRoom  # noqa: E402
+from app.communication.writer import MessageWriter  # noqa: E402
+from app.core.database import AsyncSessionLocal, engine  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.users.models import User, UserRole  # noqa: E402
+from main import app  # noqa: E402
+
+ROOM = 1
+BAD_CONTENT = ({"a": 1}, ["x"], None)
+
+results: list[tuple[str, bool]] = []
+
+
+def check(name: str, ok: bool):
+    results.append((name, ok))
+    print(f"{'PASS' if ok else 'FAIL'}  {name}")
+
+
+class FlakyWriter(MessageWriter):
+    """Fails the first `outages` inserts the way a locked or unreachable database does."""
+
+    def __init__(self, *args, outages: int, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.outages = outages
+
+    async def _insert(self, rows):
+        if self.outages:
+            self.outages -= 1
+            raise OperationalError("INSERT INTO chat_messages", {}, Exception("database is locked"))
+        await super()._insert(rows)
+
+
+async def stored(room_id: int) -> int:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(func.count(ChatMessage.id)).where(ChatMessage.room_id == room_id))).scalar_one()
+
+
+async def run_writer(messages: int, bad: int, outages: int) -> int:
+    await reset_schema()
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(User), [{"email": "admin@ums.edu", "hashed_password": "-", "full_name": "Admin",
+                                         "role": UserRole.ADMIN, "is_active": True}])
+        await db.execute(insert(ChatRoom), [{"id": r, "name": f"Room {r}", "created_by": 1} for r in (1, 2, 3)])
+        await db.commit()
+        admin_id = (await db.execute(select(User.id))).scalar_one()
+
+    writer = MessageWriter(AsyncSessionLocal, batch_size=200, flush_interval=0.05, max_backoff=0.2)
+    step = messages // (bad + 1)
+    with timer() as t:
+        for i in range(messages):
+            await writer.enqueue(ROOM, admin_id, f"message {i}")
+            if bad and i % step == step // 2 and i // step < bad:
+                await writer.enqueue(ROOM, admin_id, BAD_CONTENT[i // step % len(BAD_CONTENT)])
+        await writer.close()
+    count = await stored(ROOM)
+    print(f"  {messages} messages with {bad} bad ones in {t['seconds']:.2f}s "
+          f"({messages / t['seconds']:,.0f} msg/s), {writer.stats()}")
+    check(f"every valid message stored ({count} of {messages})", count == writer.written == messages)
+    check(f"every bad message dropped and counted ({writer.rejected} of {bad})", writer.rejected == bad)
+    check("bad messages are not retried", writer.retries == 0)
+
+    writer = FlakyWriter(AsyncSessionLocal, batch_size=200, flush_interval=0.05, max_backoff=0.2, outages=outages)
+    for i in range(1000):
+        await writer.enqueue(ROOM + 1, admin_id, f"message {i}")
+    await writer.close()
+    count = await stored(ROOM + 1)
+    check(f"transient failures retried ({writer.retries} retries), nothing lost or rejected",
+          writer.retries == outages and count == 1000 and writer.rejected == 0)
+
+    # The WebSocket check runs on TestClient's own event loop.
+    await engine.dispose()
+    return admin_id
+
+
+def run_socket(admin_id: int) -> None:
+    room = ROOM + 2
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(admin_id)})}"}
+    with TestClient(app) as client:
+        with client.websocket_connect(f"/api/v1/communication/ws/{room}") as ws:
+            frames = []
+            for payload in ('{"sender_id": 1, "content": {"a": 1}}', '{"sender_id": "1", "content": "hi"}',
+                            '{"sender_id": 1, "content": ""}', "not json"):
+                ws.send_text(payload)
+                frames.append(ws.receive_json())
+            ws.send_json({"sender_id": admin_id, "content": "hello"})
+            broadcast = ws.receive_json()
+        check("malformed WebSocket payloads get an error frame",
+              all(frame["type"] == "error" for frame in frames))
+        check("a valid message after them is broadcast",
+              broadcast["type"] == "message" and broadcast["content"] == "hello")
+    # Leaving the block shut the app down, which drains the writer.
+    with TestClient(app) as client:
+        history = client.get(f"/api/v1/communication/rooms/{room}/messages", headers=headers).json()
+    check("only the valid WebSocket message is stored", [m["content"] for m in history] == ["hello"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--bad", type=int, default=5)
+    parser.add_argument("--outages", type=int, default=3)
+    args = parser.parse_args()
+    run_socket(asyncio.run(run_writer(args.messages, args.bad, args.outages)))
+    sys.exit(0 if all(ok for _, ok in results) else 1)
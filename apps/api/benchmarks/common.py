@@ -0,0 +1,68 @@
+"""
+Shared helpers for benchmark scripts.
+
+Benchmarks run against a throwaway SQLite file unless BENCH_DATABASE_URL is set
+(e.g. a local Postgres). configure_database() must run before any app import,
+because the engine is created from settings at import time.
+"""
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+
+def configure_database() -> str:
+    url = os.environ.get("BENCH_DATABASE_URL")
+    if not url:
+        path = os.path.join(tempfile.mkdtemp(prefix="ums-bench-"), "bench.db")
+        url = f"sqlite+aiosqlite:///{path}"
+    os.environ["DATABASE_URL"] = url
+    return url
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def reset_schema():
+    from app.core.database import Base, engine
+    from app.core.startup import create_schema
+    import main  # noqa: F401  (registers every model on Base.metadata)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await create_schema(engine)
+
+
+class QueryCounter:
+    """Counts statements executed on the app engine while active."""
+
+    def __init__(self):
+        self.count = 0
+
+    def _on_execute(self, *_args):
+        self.count += 1
+
+    @contextmanager
+    def track(self):
+        from sqlalchemy import event
+        from app.core.database import engine
+
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+        try:
+            yield self
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+
+@contextmanager
+def timer():
+    """Yields a dict whose 'seconds' key is filled in on exit."""
+    result = {"seconds": 0.0}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["seconds"] = time.perf_counter() - start
@@ -0,0 +1,249 @@
+"""
+Benchmark: concurrent read/write throughput per connection-pool profile.
+
+Workers run a mixed workload on a small accounts table for --seconds each:
+point reads, 50-row range aggregates and, with probability --write-ratio, a
+two-row transfer in one transaction. Each profile gets a fresh database
+file, because SQLite's journal mode sticks to the file.
+
+SQLite profiles:
+  legacy     NullPool, no PRAGMAs (the configuration before the presets)
+  wal        PRAGMAs from Settings, NullPool (DATABASE_POOL_SIZE=0)
+  preset     PRAGMAs and the SQLite pool preset (the default)
+
+Postgres profiles (BENCH_DATABASE_URL=postgresql+asyncpg://...):
+  no-cache   asyncpg and SQLAlchemy statement caches disabled (PgBouncer mode)
+  preset     the Postgres pool preset and ASYNCPG_* cache sizes
+
+With --api, the same workers go through the app instead, one fresh process and
+demo-seeded database per pool size in API_POOLS: authenticated GETs of
+/users/me, /academics/courses and /housing/rooms, --cold of them with the
+principal cache emptied first (so the request also looks the user up), and
+--write-ratio leave applications. Errors there are failed requests, pool
+timeouts included.
+
+Run with: python -m benchmarks.db_presets [--concurrency 32] [--seconds 5] [--write-ratio 0.2]
+          [--api [--cold 0.5]]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.database import make_engine
+from benchmarks.common import percentile
+
+ACCOUNTS = 1000
+# (pool_size, max_overflow) per --api profile; 5+5 was the preset before it was measured here.
+API_POOLS = [(5, 5), (5, 10), (10, 10), (20, 10)]
+API_READS = ("/api/v1/users/me", "/api/v1/academics/courses?limit=50", "/api/v1/housing/rooms?limit=50")
+LEAVE = {"leave_type": "casual", "start_date": "2025-02-01", "end_date": "2025-02-02", "reason": "bench"}
+
+SETUP = [
+    "DROP TABLE IF EXISTS bench_accounts",
+    "CREATE TABLE bench_accounts (id INTEGER PRIMARY KEY, balance INTEGER NOT NULL, note VARCHAR(200))",
+]
+POINT_READ = text("SELECT balance, note FROM bench_accounts WHERE id = :id")
+RANGE_READ = text("SELECT count(*), sum(balance) FROM bench_accounts WHERE id BETWEEN :low AND :low + 50")
+DEBIT = text("UPDATE bench_accounts SET balance = balance - 1 WHERE id = :id")
+CREDIT = text("UPDATE bench_accounts SET balance = balance + 1 WHERE id = :id")
+
+
+def sqlite_profiles() -> dict[str, Callable[[], AsyncEngine]]:
+    def url(name: str) -> str:
+        return f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(prefix='ums-presets-'), name)}.db"
+
+    return {
+        "legacy": lambda: create_async_engine(url("legacy"), poolclass=NullPool),
+        "wal": lambda: make_engine(url("wal"), pool_size=0),
+        "preset": lambda: make_engine(url("preset")),
+    }
+
+
+def postgres_profiles(url: str) -> dict[str, Callable[[], AsyncEngine]]:
+    no_cache = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+    return {
+        "no-cache": lambda: make_engine(url, connect_args=no_cache),
+        "preset": lambda: make_engine(url),
+    }
+
+
+async def prepare(engine: AsyncEngine):
+    async with engine.begin() as conn:
+        for statement in SETUP:
+            await conn.execute(text(statement))
+        await conn.execute(
+            text("INSERT INTO bench_accounts (id, balance, note) VALUES (:id, 1000, :note)"),
+            [{"id": i, "note": f"account {i}"} for i in range(1, ACCOUNTS + 1)],
+        )
+
+
+async def worker(engine: AsyncEngine, deadline: float, write_ratio: float, seed: int,
+                 latencies: list[float], ops: Counter, errors: Counter):
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            if rng.random() < write_ratio:
+                source, target = rng.sample(range(1, ACCOUNTS + 1), 2)
+                async with engine.begin() as conn:
+                    await conn.execute(DEBIT, {"id": source})
+                    await conn.execute(CREDIT, {"id": target})
+                ops["write"] += 1
+            else:
+                async with engine.connect() as conn:
+                    await conn.execute(POINT_READ, {"id": rng.randint(1, ACCOUNTS)})
+                    await conn.execute(RANGE_READ, {"low": rng.randint(1, ACCOUNTS - 50)})
+                ops["read"] += 1
+            latencies.append(time.perf_counter() - start)
+        except Exception as exc:
+            errors[str(getattr(exc, "orig", exc)).splitlines()[0][:60]] += 1
+
+
+async def run_profile(build: Callable[[], AsyncEngine], concurrency: int, seconds: float,
+                      write_ratio: float) -> dict:
+    engine = build()
+    try:
+        await prepare(engine)
+        latencies: list[float] = []
+        ops, errors = Counter(), Counter()
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(*(
+            worker(engine, deadline, write_ratio, seed, latencies, ops, errors) for seed in range(concurrency)
+        ))
+        async with engine.begin() as conn:
+            total = (await conn.execute(text("SELECT sum(balance) FROM bench_accounts"))).scalar_one()
+    finally:
+        await engine.dispose()
+    return {
+        "reads": ops["read"] / seconds,
+        "writes": ops["write"] / seconds,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "errors": errors,
+        "consistent": total == ACCOUNTS * 1000,
+    }
+
+
+async def main(concurrency: int, seconds: float, write_ratio: float):
+    url = os.environ.get("BENCH_DATABASE_URL")
+    profiles = postgres_profiles(url) if url and not url.startswith("sqlite") else sqlite_profiles()
+    print(f"{concurrency} workers, {seconds}s per profile, {write_ratio:.0%} transfers")
+    print(f"{'profile':<10} {'reads/s':>9} {'writes/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}  balanced")
+    for name, build in profiles.items():
+        r = await run_profile(build, concurrency, seconds, write_ratio)
+        print(f"{name:<10} {r['reads']:>9.0f} {r['writes']:>9.0f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+              f"{sum(r['errors'].values()):>7}  {'yes' if r['consistent'] else 'NO'}")
+        for message, count in r["errors"].most_common(3):
+            print(f"{'':<10} {count} x {message}")
+
+
+# ─── Through the API ───────────────────────────────────────
+async def api_worker(client, tokens: list[tuple[int, dict]], deadline: float, write_ratio: float, cold: float,
+                     seed: int, latencies: list[float], ops: Counter, errors: Counter):
+    from app.core.cache import principal_cache
+
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        user_id, headers = rng.choice(tokens)
+        if rng.random() < cold:
+            await principal_cache.invalidate(user_id)
+        start = time.perf_counter()
+        try:
+            if rng.random() < write_ratio:
+                response = await client.post("/api/v1/communication/leaves", json=LEAVE, headers=headers)
+                kind = "write"
+            else:
+                response = await client.get(rng.choice(API_READS), headers=headers)
+                kind = "read"
+            if response.status_code >= 400:
+                errors[f"HTTP {response.status_code}"] += 1
+                continue
+            ops[kind] += 1
+            latencies.append(time.perf_counter() - start)
+        except Exception as exc:
+            errors[str(getattr(exc, "orig", exc)).splitlines()[0][:60]] += 1
+
+
+async def api_profile(concurrency: int, seconds: float, write_ratio: float, cold: float) -> dict:
+    """Runs in a child process whose DATABASE_* variables select the database and its pool."""
+    import httpx
+    from sqlalchemy import select
+
+    from app.core.database import AsyncSessionLocal, engine
+    from app.core.security import create_access_token
+    from app.seed import seed
+    from app.users.models import User, UserRole
+    from main import app
+
+    await seed()
+    async with AsyncSessionLocal() as db:
+        students = (await db.execute(select(User.id).where(User.role == UserRole.STUDENT))).scalars().all()
+    tokens = [(user_id, {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"})
+              for user_id in students]
+    latencies: list[float] = []
+    ops, errors = Counter(), Counter()
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://db-presets", timeout=None
+    ) as client:
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(*(
+            api_worker(client, tokens, deadline, write_ratio, cold, seed, latencies, ops, errors)
+            for seed in range(concurrency)
+        ))
+        pool = engine.sync_engine.pool
+        label = f"{pool.size()}+{pool._max_overflow}"
+    return {
+        "profile": label,
+        "reads": ops["read"] / seconds,
+        "writes": ops["write"] / seconds,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "errors": dict(errors),
+    }
+
+
+def api_main(concurrency: int, seconds: float, write_ratio: float, cold: float):
+    print(f"{concurrency} clients through the API, {seconds}s per pool, {cold:.0%} cold, {write_ratio:.0%} writes")
+    print(f"{'pool':<10} {'reads/s':>9} {'writes/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for size, overflow in API_POOLS:
+        env = {**os.environ, "DATABASE_POOL_SIZE": str(size), "DATABASE_MAX_OVERFLOW": str(overflow),
+               "DATABASE_URL": f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='ums-presets-')}/api.db"}
+        child = subprocess.run(
+            [sys.executable, "-m", "benchmarks.db_presets", "--api-child", "--concurrency", str(concurrency),
+             "--seconds", str(seconds), "--write-ratio", str(write_ratio), "--cold", str(cold)],
+            env=env, capture_output=True, text=True, check=True,
+        )
+        r = json.loads(child.stdout.strip().splitlines()[-1])
+        print(f"{r['profile']:<10} {r['reads']:>9.0f} {r['writes']:>9.0f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+              f"{sum(r['errors'].values()):>7}")
+        for message, count in Counter(r["errors"]).most_common(3):
+            print(f"{'':<10} {count} x {message}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--api", action="store_true", help="drive authenticated routes, one run per API_POOLS entry")
+    parser.add_argument("--cold", type=float, default=0.5, help="share of API requests with the principal uncached")
+    parser.add_argument("--api-child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.api_child:
+        print(json.dumps(asyncio.run(api_profile(args.concurrency, args.seconds, args.write_ratio, args.cold))))
+    elif args.api:
+        api_main(args.concurrency, args.seconds, args.write_ratio, args.cold)
+    else:
+        asyncio.run(main(args.concurrency, args.seconds, args.write_ratio))
@@ -0,0 +1,158 @@
+"""
+Check: every hot-path query issued by the service layer is served by an index.
+
+Seeds a small dataset, runs the service functions while capturing the SELECTs
+they emit, then EXPLAINs each one. Exits non-zero if any plan contains a full
+table scan ("SCAN <table>" on SQLite, "Seq Scan" on Postgres with
+enable_seqscan=off). Set BENCH_DATABASE_URL to check against Postgres.
+
+Run with: python -m benchmarks.explain_hot_paths
+"""
+import asyncio
+import re
+import sys
+from datetime import date, datetime, timedelta, timezone
+
+from benchmarks.common import configure_database, reset_schema
+
+configure_database()
+
+from sqlalchemy import event, insert  # noqa: E402
+
+from app.academics import service as academics  # noqa: E402
+from app.academics.models import (  # noqa: E402
+    Attendance, AttendanceStatus, Course, Enrollment, Result, Semester, TimetableSlot, DayOfWeek,
+)
+from app.communication import service as communication  # noqa: E402
+from app.communication.models import ChatMessage, ChatRoom, ChatRoomMember, Leave, LeaveType  # noqa: E402
+from app.core.database import AsyncSessionLocal, engine  # noqa: E402
+from app.housing import service as housing  # noqa: E402
+from app.housing.models import MaintenanceRequest, Room, RoomAmenity, RoomAssignment, RoomType  # noqa: E402
+from app.users import service as users  # noqa: E402
+from app.users.models import User, UserRole  # noqa: E402
+
+SQLITE_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+async def seed():
+    await reset_schema()
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(User), [
+            {"id": i, "email": f"u{i}@ums.edu", "hashed_password": "x", "full_name": f"User {i}",
+             "role": UserRole.FACULTY if i <= 5 else UserRole.STUDENT, "department": f"D{i % 4}"}
+            for i in range(1, 201)
+        ])
+        await db.execute(insert(Course), [
+            {"id": c, "code": f"C{c}", "name": f"Course {c}", "credits": 3, "department": f"D{c % 4}",
+             "semester": Semester.FALL, "faculty_id": 1 + c % 5}
+            for c in range(1, 41)
+        ])
+        await db.execute(insert(Enrollment), [
+            {"student_id": s, "course_id": 1 + (s + k) % 40} for s in range(6, 201) for k in range(4)
+        ])
+        await db.execute(insert(Attendance), [
+            {"student_id": s, "course_id": 1 + s % 40, "date": date(2026, 1, 5) + timedelta(days=d),
+             "status": AttendanceStatus.PRESENT, "marked_by": 1}
+            for s in range(6, 201) for d in range(10)
+        ])
+        await db.execute(insert(Result), [
+            {"student_id": s, "course_id": 1 + s % 40, "semester": Semester.FALL, "year": 2025}
+            for s in range(6, 201)
+        ])
+        await db.execute(insert(TimetableSlot), [
+            {"course_id": c, "day": DayOfWeek.MONDAY, "start_time": datetime(2026, 1, 1, 9).time(),
+             "end_time": datetime(2026, 1, 1, 10).time(), "room": f"R{c}"}
+            for c in range(1, 41)
+        ])
+        await db.execute(insert(Room), [
+            {"id": r, "building": f"Hostel {r % 3}", "floor": 1, "room_number": f"H{r}",
+             "room_type": RoomType.DOUBLE, "capacity": 2}
+            for r in range(1, 51)
+        ])
+        await db.execute(insert(RoomAmenity), [
+            {"room_id": r, "amenity": amenity} for r in range(1, 51) for amenity in ("wifi", "ac")[:1 + r % 2]
+        ])
+        await db.execute(insert(RoomAssignment), [
+            {"room_id": 1 + s % 50, "student_id": s} for s in range(6, 101)
+        ])
+        await db.execute(insert(MaintenanceRequest), [
+            {"room_id": 1 + i % 50, "reported_by": 6 + i, "title": "Leak", "description": "Tap",
+             "created_at": now - timedelta(hours=i)}
+            for i in range(100)
+        ])
+        await db.execute(insert(ChatRoom), [{"id": r, "name": f"Room {r}", "created_by": 1} for r in range(1, 11)])
+        await db.execute(insert(ChatRoomMember), [
+            {"room_id": 1 + u % 10, "user_id": u} for u in range(1, 201)
+        ])
+        await db.execute(insert(ChatMessage), [
+            {"room_id": 1 + i % 10, "sender_id": 1 + i % 200, "content": "hi",
+             "sent_at": now - timedelta(seconds=i)}
+            for i in range(1000)
+        ])
+        await db.execute(insert(Leave), [
+            {"applicant_id": 6 + i % 50, "leave_type": LeaveType.SICK, "start_date": "2026-01-01",
+             "end_date": "2026-01-02", "reason": "ill", "created_at": now - timedelta(hours=i)}
+            for i in range(200)
+        ])
+        await db.commit()
+
+
+async def hot_paths(db):
+    await users.get_user_by_id(db, 42)
+    await users.get_user_by_email(db, "u42@ums.edu")
+    await users.list_users(db, role=UserRole.STUDENT)
+    await academics.list_courses(db, department="D1")
+    await academics.get_course(db, 7)
+    await academics.get_student_courses(db, 42)
+    await academics.get_attendance_summary(db, 42)
+    await academics.get_course_attendance_summary(db, 7)
+    await academics.get_student_results(db, 42)
+    await academics.get_timetable(db, 42)
+    await housing.list_rooms(db, building="Hostel 1")
+    await housing.list_rooms(db, amenities=["AC", "WiFi"])
+    await housing.get_student_room(db, 42)
+    await housing.list_maintenance_requests(db, room_id=3)
+    await communication.get_user_rooms(db, 42)
+    await communication.get_room_messages(db, 3)
+    await communication.get_leaves(db, user_id=42)
+
+
+async def run() -> int:
+    await seed()
+    captured: list[tuple[str, object]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    async with AsyncSessionLocal() as db:
+        await hot_paths(db)
+    event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    is_sqlite = engine.dialect.name == "sqlite"
+    failures = 0
+    async with engine.connect() as conn:
+        if not is_sqlite:
+            await conn.exec_driver_sql("SET enable_seqscan = off")
+        for statement, parameters in captured:
+            prefix = "EXPLAIN QUERY PLAN " if is_sqlite else "EXPLAIN "
+            rows = (await conn.exec_driver_sql(prefix + statement, parameters)).all()
+            plan = [row[-1] if is_sqlite else row[0] for row in rows]
+            if is_sqlite:
+                scans = [line for line in plan if SQLITE_FULL_SCAN.match(line.strip())]
+            else:
+                scans = [line for line in plan if "Seq Scan" in line]
+            status = "FAIL" if scans else "ok"
+            failures += bool(scans)
+            print(f"[{status:>4}] {' '.join(statement.split())[:110]}")
+            for line in plan:
+                print(f"         {line.strip()}")
+    await engine.dispose()
+    print(f"\n{len(captured)} statements checked, {failures} with sequential scans")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run()))
@@ -0,0 +1,251 @@
+"""
+Benchmark and check: start-of-year hostel allocation.
+
+A synthetic university of --students students houses --housed of them, and
+new hostels bring the rooms to --rooms. Students state preferences at random:
+a room type (60%), a building (40%), one or two amenities (30%), and
+--pairs of them ask for each other as roommates.
+
+1. A dry run (POST /housing/allocations with dry_run) finishes within --limit
+   seconds and saves nothing. Its assignments never put more students in a
+   room than it has free beds, house every student while beds last, and keep
+   every roommate pair together.
+2. They cost no more, by the allocator's own weights, than a greedy
+   allocation that gives each student in turn the best bed still free.
+3. The real run saves the same number of assignments in one transaction:
+   `occupied` matches the active assignments of every room, never above its
+   capacity, and status follows it.
+4. With the beds gone, a second run fails with a clear error.
+
+Exits non-zero if any check fails.
+
+Run with: python -m benchmarks.hostel_allocation [--students 20000] [--rooms 5000]
+          [--housed 0.1] [--pairs 0.1] [--limit 30]
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+
+from benchmarks.common import configure_database, reset_schema, timer
+
+configure_database()
+
+import httpx  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+
+from app.core.database import AsyncSessionLocal  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.housing.allocation import ROOMMATE, mismatch  # noqa: E402
+from app.housing.models import Room, RoomAmenity, RoomAssignment, RoomStatus, RoomType, amenity_keys  # noqa: E402
+from app.seed import ROOM_CAPACITY, BulkWriter, SyntheticUniversity, generate  # noqa: E402
+from app.users.models import User, UserRole  # noqa: E402
+from main import app  # noqa: E402
+
+ALLOCATE = "/api/v1/housing/allocations"
+AMENITIES = ('["WiFi","Fan"]', '["WiFi","AC"]', '["WiFi","AC","Attached Bath"]',
+             '["WiFi","AC","Attached Bath","Study Desk"]')
+
+results: list[tuple[str, bool]] = []
+
+
+def check(name: str, ok: bool):
+    results.append((name, ok))
+    print(f"{'PASS' if ok else 'FAIL'}  {name}")
+
+
+def preferences(rng: random.Random, students: list[int], buildings: list[str], pairs: float) -> list[dict]:
+    wanted = {}
+    for student_id in students:
+        preference = {"student_id": student_id}
+        if rng.random() < 0.6:
+            preference["room_type"] = rng.choice(list(RoomType)).value
+        if rng.random() < 0.4:
+            preference["building"] = rng.choice(buildings)
+        if rng.random() < 0.3:
+            preference["amenities"] = rng.sample(["AC", "Attached Bath", "Study Desk"], rng.randint(1, 2))
+        wanted[student_id] = preference
+    paired = rng.sample(students, int(len(students) * pairs) // 2 * 2)
+    for a, b in zip(paired[::2], paired[1::2]):
+        wanted[a]["roommates"], wanted[b]["roommates"] = [b], [a]
+    return list(wanted.values())
+
+
+def weighted_cost(placements: dict[int, int], wanted: dict[int, dict], rooms: dict[int, tuple]) -> int:
+    """Cost of an allocation by the allocator's weights: missed preferences, and split roommate pairs."""
+    cost = 0
+    for student_id, room_id in placements.items():
+        preference = wanted.get(student_id, {})
+        building, room_type, amenities, _ = rooms[room_id]
+        cost += mismatch((preference.get("room_type", ""), preference.get("building", ""),
+                          tuple(preference.get("amenities", ()))), building, room_type, amenities)
+        cost += sum(ROOMMATE for other in preference.get("roommates", ()) if placements.get(other) != room_id)
+    return cost
+
+
+def greedy(students: list[int], wanted: dict[int, dict], rooms: dict[int, tuple]) -> dict[int, int]:
+    """Each student in turn takes the free bed that misses the least; a roommate follows into the same room."""
+    free = {room_id: beds for room_id, (_, _, _, beds) in rooms.items()}
+    by_class = defaultdict(list)
+    for room_id, (building, room_type, amenities, _) in rooms.items():
+        by_class[building, room_type, amenities].append(room_id)
+    placements = {}
+    for student_id in students:
+        if student_id in placements:
+            continue
+        preference = wanted.get(student_id, {})
+        key = (preference.get("room_type", ""), preference.get("building", ""), tuple(preference.get("amenities", ())))
+        open_classes = [(mismatch(key, *room_class), room_class) for room_class, ids in by_class.items()
+                        if any(free[room_id] for room_id in ids)]
+        if not open_classes:
+            break
+        room_id = next(room_id for room_id in by_class[min(open_classes)[1]] if free[room_id])
+        placements[student_id] = room_id
+        free[room_id] -= 1
+        for other in preference.get("roommates", ()):
+            if free[room_id] and other not in placements:
+                placements[other] = room_id
+                free[room_id] -= 1
+    return placements
+
+
+async def verify_rooms() -> None:
+    async with AsyncSessionLocal() as db:
+        active = (
+            select(RoomAssignment.room_id, func.count().label("n"))
+            .where(RoomAssignment.check_out.is_(None)).group_by(RoomAssignment.room_id).subquery()
+        )
+        rooms = (await db.execute(
+            select(Room.capacity, Room.occupied, Room.status, func.coalesce(active.c.n, 0))
+            .outerjoin(active, active.c.room_id == Room.id)
+        )).all()
+    check("saved: occupied matches the active assignments, never above capacity",
+          all(occupied == count <= capacity for capacity, occupied, _, count in rooms))
+    check("saved: status follows occupancy", all(
+        status == RoomStatus.MAINTENANCE
+        or status == (RoomStatus.OCCUPIED if occupied >= capacity else RoomStatus.AVAILABLE)
+        for capacity, occupied, status, _ in rooms
+    ))
+
+
+async def run_job(client: httpx.AsyncClient, payload: dict) -> tuple[dict, float]:
+    start = time.perf_counter()
+    response = await client.post(ALLOCATE, json=payload)
+    response.raise_for_status()
+    job = response.json()
+    while job["status"] == "running":
+        await asyncio.sleep(0.1)
+        job = (await client.get(f"{ALLOCATE}/jobs/{job['id']}")).json()
+    return job, time.perf_counter() - start
+
+
+async def run(students: int, rooms: int, housed: float, pairs: float, limit: float) -> int:
+    await reset_schema()
+    rng = random.Random(5)
+    with timer() as t:
+        await generate(SyntheticUniversity(students=students, courses=20, sessions=0, chat_messages=0,
+                                           housed_fraction=housed))
+        async with AsyncSessionLocal() as db:
+            existing, last_id = (await db.execute(select(func.count(Room.id), func.max(Room.id)))).one()
+        types, weights = list(ROOM_CAPACITY), (0.15, 0.5, 0.25, 0.1)
+        writer = BulkWriter()
+        await writer.write(Room, (
+            {"building": f"New Hostel {i // 400 + 1}", "floor": 1 + (i % 400) // 40, "room_number": f"N{i:06d}",
+             "room_type": room_type, "capacity": ROOM_CAPACITY[room_type], "occupied": 0,
+             "status": RoomStatus.AVAILABLE, "amenities": AMENITIES[min(3, types.index(room_type) + rng.randrange(2))]}
+            for i, room_type in enumerate(rng.choices(types, weights, k=max(0, rooms - existing)))
+        ))
+        async with AsyncSessionLocal() as db:
+            new_rooms = (await db.execute(select(Room.id, Room.amenities).where(Room.id > (last_id or 0)))).all()
+        await writer.write(RoomAmenity, (
+            {"room_id": room_id, "amenity": key} for room_id, amenities in new_rooms for key in amenity_keys(amenities)
+        ))
+    async with AsyncSessionLocal() as db:
+        admin_id = (await db.execute(select(User.id).where(User.role == UserRole.ADMIN).limit(1))).scalar_one()
+        unassigned = list((await db.execute(
+            select(User.id).where(User.role == UserRole.STUDENT, User.id.not_in(
+                select(RoomAssignment.student_id).where(RoomAssignment.check_out.is_(None))
+            )).order_by(User.id)
+        )).scalars())
+        room_rows = (await db.execute(
+            select(Room.id, Room.building, Room.room_type, Room.amenities, Room.capacity - Room.occupied)
+            .where(Room.status != RoomStatus.MAINTENANCE, Room.occupied < Room.capacity)
+        )).all()
+        assignments_before = (await db.execute(select(func.count(RoomAssignment.id)))).scalar_one()
+    free_rooms = {room_id: (building, room_type.value, frozenset(json.loads(amenities or "[]")), free)
+                  for room_id, building, room_type, amenities, free in room_rows}
+    beds = sum(free for *_, free in free_rooms.values())
+    buildings = sorted({building for building, *_ in free_rooms.values()})
+    wanted = {p["student_id"]: p for p in preferences(rng, unassigned, buildings, pairs)}
+    print(f"generated {students} students ({len(unassigned)} without a room), {rooms} rooms "
+          f"({len(free_rooms)} with {beds} free beds) in {t['seconds']:.1f}s")
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(admin_id)})}"}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=transport, base_url="http://hostel-allocation", headers=headers, timeout=limit * 2
+    ) as client:
+        payload = {"preferences": list(wanted.values())}
+        job, seconds = await run_job(client, payload | {"dry_run": True})
+        if job["status"] != "succeeded":
+            print(f"  error: {job['error']}")
+            return 1
+        report = job["result"]
+        print(f"  {report['housed']} housed, {report['unhoused']} unhoused in {seconds:.2f}s "
+              f"(solve {report['timings']['solve']:.2f}s): {report['preferences']}, {report['roommate_groups']}, "
+              f"cohorts {report['cohorts']}")
+        placements = {a["student_id"]: a["room_id"] for a in report["assignments"]}
+        async with AsyncSessionLocal() as db:
+            saved = (await db.execute(select(func.count(RoomAssignment.id)))).scalar_one()
+        check(f"dry run in {seconds:.1f}s (limit {limit:.0f}s), nothing saved",
+              seconds < limit and saved == assignments_before)
+        check("no room gets more students than free beds",
+              all(count <= free_rooms[room_id][3] for room_id, count in Counter(placements.values()).items()))
+        check(f"every student housed while beds last ({len(placements)} of {min(beds, len(unassigned))})",
+              len(placements) == min(beds, len(unassigned)) and set(placements) <= set(unassigned))
+        groups = report["roommate_groups"]
+        check(f"every roommate pair kept together ({groups['together']} of {groups['requested']})",
+              groups["together"] == groups["requested"] and all(
+                  placements.get(p["roommates"][0]) == room_id
+                  for student_id, room_id in placements.items() if (p := wanted[student_id]).get("roommates")
+              ))
+
+        with timer() as t:
+            baseline = greedy(unassigned, wanted, free_rooms)
+        ours, theirs = weighted_cost(placements, wanted, free_rooms), weighted_cost(baseline, wanted, free_rooms)
+        print(f"  greedy baseline: {len(baseline)} housed, cost {theirs} in {t['seconds']:.2f}s; allocator cost {ours}")
+        check("allocator costs no more than greedy", len(placements) >= len(baseline) and ours <= theirs)
+
+        first = await client.post(ALLOCATE, json=payload)
+        second = await client.post(ALLOCATE, json=payload)
+        check("a second run is refused while one is running", first.status_code == 202 and second.status_code == 409)
+        job = first.json()
+        while job["status"] == "running":
+            await asyncio.sleep(0.1)
+            job = (await client.get(f"{ALLOCATE}/jobs/{job['id']}")).json()
+        async with AsyncSessionLocal() as db:
+            saved = (await db.execute(select(func.count(RoomAssignment.id)))).scalar_one()
+        check(f"real run saved {saved - assignments_before} assignments "
+              f"(save {(job['result'] or {}).get('timings', {}).get('save', 0):.2f}s)",
+              job["status"] == "succeeded" and saved - assignments_before == job["result"]["housed"] == len(placements))
+        await verify_rooms()
+
+        job, _ = await run_job(client, payload)
+        check(f"a run with no free beds left fails: {job['error']!r}",
+              job["status"] == "failed" and bool(job["error"]))
+
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=20_000)
+    parser.add_argument("--rooms", type=int, default=5000)
+    parser.add_argument("--housed", type=float, default=0.1)
+    parser.add_argument("--pairs", type=float, default=0.1)
+    parser.add_argument("--limit", type=float, default=30.0)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.students, args.rooms, args.housed, args.pairs, args.limit)))
@@ -0,0 +1,171 @@
+"""
+Stress check: concurrent room assignments never overbook a room.
+
+A synthetic university houses --housed of its students, leaving single, double,
+triple and suite rooms full or partly full (and a few under maintenance), and a
+new hostel of --new-rooms empty rooms opens. Then:
+
+1. --requests concurrent POST /housing/assign for unhoused students: half aim at
+   a handful of hot rooms, the rest spread over every room with a free bed and
+   those under maintenance, and some students are sent twice. Every response
+   is 201 or 409, and the assignments must finish at --min-throughput per
+   second or better.
+2. Every room has at most `capacity` active assignments, `occupied` equals
+   that count, status follows it (OCCUPIED when full, AVAILABLE below,
+   MAINTENANCE untouched) and no student holds two rooms.
+3. Half of the new assignments are checked out concurrently while the freed
+   beds are being assigned again; the invariants of 2. still hold.
+
+Exits non-zero if any check fails.
+
+Run with: python -m benchmarks.housing_assignments [--students 5000] [--housed 0.3]
+          [--new-rooms 300] [--requests 1000] [--hot-rooms 10] [--min-throughput 100]
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import Counter
+
+from benchmarks.common import configure_database, reset_schema, timer
+
+configure_database()
+
+import httpx  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+
+from app.core.database import AsyncSessionLocal  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.housing.models import Room, RoomAssignment, RoomStatus  # noqa: E402
+from app.seed import ROOM_CAPACITY, BulkWriter, SyntheticUniversity, generate  # noqa: E402
+from app.users.models import User, UserRole  # noqa: E402
+from main import app  # noqa: E402
+
+API = "/api/v1/housing"
+
+results: list[tuple[str, bool]] = []
+
+
+def check(name: str, ok: bool):
+    results.append((name, ok))
+    print(f"{'PASS' if ok else 'FAIL'}  {name}")
+
+
+async def verify(name: str) -> None:
+    async with AsyncSessionLocal() as db:
+        active = (
+            select(RoomAssignment.room_id, func.count().label("n"))
+            .where(RoomAssignment.check_out.is_(None)).group_by(RoomAssignment.room_id).subquery()
+        )
+        rooms = (await db.execute(
+            select(Room.capacity, Room.occupied, Room.status, func.coalesce(active.c.n, 0))
+            .outerjoin(active, active.c.room_id == Room.id)
+        )).all()
+        holders = (await db.execute(
+            select(func.count()).select_from(
+                select(RoomAssignment.student_id).where(RoomAssignment.check_out.is_(None))
+                .group_by(RoomAssignment.student_id).having(func.count() > 1).subquery()
+            )
+        )).scalar_one()
+    check(f"{name}: no room has more active assignments than beds",
+          all(count <= capacity for capacity, _, _, count in rooms))
+    check(f"{name}: occupied matches the active assignments of every room",
+          all(occupied == count for _, occupied, _, count in rooms))
+    check(f"{name}: status follows occupancy", all(
+        status == RoomStatus.MAINTENANCE
+        or status == (RoomStatus.OCCUPIED if occupied >= capacity else RoomStatus.AVAILABLE)
+        for capacity, occupied, status, _ in rooms
+    ))
+    check(f"{name}: no student holds two rooms", holders == 0)
+
+
+async def fire(client: httpx.AsyncClient, requests: list[tuple[str, str, dict | None]]) -> tuple[Counter, float]:
+    async def one(method: str, url: str, payload: dict | None) -> int:
+        return (await client.request(method, url, json=payload)).status_code
+
+    start = time.perf_counter()
+    codes = await asyncio.gather(*(one(*request) for request in requests))
+    return Counter(codes), time.perf_counter() - start
+
+
+async def run(students: int, housed: float, new_rooms: int, requests: int, hot_rooms: int,
+              min_throughput: float) -> int:
+    await reset_schema()
+    rng = random.Random(11)
+    with timer() as t:
+        await generate(SyntheticUniversity(students=students, courses=20, sessions=0, chat_messages=0,
+                                           housed_fraction=housed))
+        await BulkWriter().write(Room, (
+            {"building": "New Hostel", "floor": 1 + i // 40, "room_number": f"N{i:05d}", "room_type": room_type,
+             "capacity": ROOM_CAPACITY[room_type], "occupied": 0, "status": RoomStatus.AVAILABLE}
+            for i, room_type in enumerate(rng.choices(list(ROOM_CAPACITY), k=new_rooms))
+        ))
+    async with AsyncSessionLocal() as db:
+        admin_id = (await db.execute(select(User.id).where(User.role == UserRole.ADMIN).limit(1))).scalar_one()
+        rooms = (await db.execute(select(Room.id, Room.capacity - Room.occupied, Room.status))).all()
+        unhoused = list((await db.execute(
+            select(User.id).where(User.role == UserRole.STUDENT, User.id.not_in(
+                select(RoomAssignment.student_id).where(RoomAssignment.check_out.is_(None))
+            ))
+        )).scalars())
+    free = sum(spare for _, spare, status in rooms if status != RoomStatus.MAINTENANCE)
+    print(f"generated {students} students, {len(rooms)} rooms with {free} free beds, "
+          f"{len(unhoused)} unhoused students in {t['seconds']:.1f}s")
+
+    room_ids = [room_id for room_id, spare, status in rooms if spare or status == RoomStatus.MAINTENANCE]
+    hot = rng.sample(room_ids, min(hot_rooms, len(room_ids)))
+    applicants = rng.sample(unhoused, min(len(unhoused), requests * 9 // 10))
+    applicants += rng.choices(applicants, k=requests - len(applicants))  # sent twice
+    rng.shuffle(applicants)
+    assign = [
+        ("POST", f"{API}/assign", {"student_id": student_id,
+                                   "room_id": rng.choice(hot) if rng.random() < 0.5 else rng.choice(room_ids)})
+        for student_id in applicants
+    ]
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(admin_id)})}"}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=transport, base_url="http://housing-assignments", headers=headers, timeout=120
+    ) as client:
+        codes, seconds = await fire(client, assign)
+        throughput = len(assign) / seconds
+        print(f"  {len(assign)} assignments in {seconds:.2f}s ({throughput:.0f}/s): {dict(codes)}")
+        check("every assignment answered 201 or 409", set(codes) <= {201, 409})
+        check(f"{throughput:.0f} assignments/s (minimum {min_throughput:.0f}/s)", throughput >= min_throughput)
+        await verify("assign")
+
+        async with AsyncSessionLocal() as db:
+            made = (await db.execute(
+                select(RoomAssignment.id, RoomAssignment.room_id)
+                .where(RoomAssignment.check_out.is_(None), RoomAssignment.student_id.in_(applicants))
+            )).all()
+        leaving = rng.sample(made, len(made) // 2)
+        housed_now = set(applicants)
+        waiting = [student_id for student_id in unhoused if student_id not in housed_now]
+        churn = [("POST", f"{API}/assignments/{assignment_id}/check-out", None) for assignment_id, _ in leaving]
+        churn += [("POST", f"{API}/assign", {"student_id": student_id, "room_id": room_id})
+                  for student_id, (_, room_id) in zip(waiting, leaving)]
+        rng.shuffle(churn)
+        codes, seconds = await fire(client, churn)
+        print(f"  {len(leaving)} check-outs and {len(churn) - len(leaving)} re-assignments "
+              f"in {seconds:.2f}s: {dict(codes)}")
+        check("every check-out and re-assignment answered 200, 201 or 409", set(codes) <= {200, 201, 409})
+        check("every check-out succeeded", codes[200] == len(leaving))
+        await verify("churn")
+
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--housed", type=float, default=0.3)
+    parser.add_argument("--new-rooms", type=int, default=300)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--hot-rooms", type=int, default=10)
+    parser.add_argument("--min-throughput", type=float, default=100.0)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.students, args.housed, args.new_rooms, args.requests, args.hot_rooms,
+                             args.min_throughput)))
@@ -0,0 +1,151 @@
+"""
+Check: conditional GETs on the catalog routes.
+
+Against the demo seed, for /academics/courses, /academics/courses/{id},
+/academics/timetable/me and /housing/rooms:
+
+1. A first GET returns 200 with ETag, Last-Modified and Cache-Control.
+2. Revalidating with If-None-Match (or only If-Modified-Since) returns a
+   bodiless 304 and executes zero database statements.
+3. Per-user routes get a different ETag per user.
+4. A write through the API bumps only the tables it touched: the routes built
+   on them answer 200 with a new ETag, the others keep answering 304.
+
+Then the median latency of a full 200 and of a 304 revalidation is printed.
+
+Exits non-zero if any check fails.
+
+Run with: python -m benchmarks.http_caching [--rounds 200]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from benchmarks.common import QueryCounter, configure_database
+
+configure_database()
+
+import httpx  # noqa: E402
+
+from app.seed import seed  # noqa: E402
+from main import app  # noqa: E402
+
+COURSES = "/api/v1/academics/courses"
+TIMETABLE = "/api/v1/academics/timetable/me"
+ROOMS = "/api/v1/housing/rooms"
+
+results: list[tuple[str, bool]] = []
+
+
+def check(name: str, ok: bool):
+    results.append((name, ok))
+    print(f"{'PASS' if ok else 'FAIL'}  {name}")
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> dict[str, str]:
+    response = await client.post("/api/v1/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def revalidate(client: httpx.AsyncClient, path: str, headers: dict[str, str],
+                     etag: str) -> tuple[httpx.Response, int]:
+    """The conditional request and the number of statements it executed."""
+    with QueryCounter().track() as counter:
+        response = await client.get(path, headers={**headers, "If-None-Match": etag})
+    return response, counter.count
+
+
+async def median_ms(client: httpx.AsyncClient, path: str, headers: dict[str, str], rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        (await client.get(path, headers=headers)).content
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+async def run(rounds: int) -> int:
+    await seed()
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=transport, base_url="http://http-caching"
+    ) as client:
+        admin = await login(client, "admin@ums.edu", "Admin@123")
+        student = await login(client, "manohar.k@ums.edu", "Student@123")
+        other = await login(client, "rahul.m@ums.edu", "Student@123")
+
+        first = await client.get(COURSES, headers=student)
+        course = first.json()["courses"][0]
+        paths = [COURSES, f"{COURSES}/{course['id']}", TIMETABLE, ROOMS]
+
+        etags = {}
+        for path in paths:
+            response = await client.get(path, headers=student)
+            etags[path] = response.headers.get("etag")
+            cache_control = response.headers.get("cache-control")
+            check(f"GET {path}: 200 with ETag, Last-Modified and Cache-Control ({cache_control})",
+                  response.status_code == 200 and etags[path] is not None
+                  and "last-modified" in response.headers and "cache-control" in response.headers)
+
+            response, queries = await revalidate(client, path, student, etags[path])
+            check(f"If-None-Match {path}: 304, empty body, {queries} queries",
+                  response.status_code == 304 and not response.content and queries == 0
+                  and response.headers.get("etag") == etags[path])
+
+        with QueryCounter().track() as counter:
+            response = await client.get(COURSES, headers={
+                **student, "If-Modified-Since": first.headers["last-modified"],
+            })
+        check(f"If-Modified-Since {COURSES}: 304, {counter.count} queries",
+              response.status_code == 304 and counter.count == 0)
+
+        response = await client.get(f"{COURSES}?limit=5", headers=student)
+        check("another query string has another ETag", response.headers["etag"] != etags[COURSES])
+        response = await client.get(TIMETABLE, headers=other)
+        check("timetable ETags are per user", response.headers["etag"] != etags[TIMETABLE])
+        response = await client.get(COURSES, headers=other)
+        check("the course catalog ETag is shared by all users", response.headers["etag"] == etags[COURSES])
+
+        created = await client.post(COURSES, headers=admin, json={
+            "code": "ETG101", "name": "Entity Tags", "credits": 3, "department": course["department"],
+            "semester": course["semester"], "faculty_id": course["faculty_id"],
+        })
+        created.raise_for_status()
+        response, _ = await revalidate(client, COURSES, student, etags[COURSES])
+        check("creating a course: the catalog answers 200 with a new ETag",
+              response.status_code == 200 and response.headers["etag"] != etags[COURSES]
+              and any(c["code"] == "ETG101" for c in response.json()["courses"]))
+        response, _ = await revalidate(client, ROOMS, student, etags[ROOMS])
+        check("creating a course: rooms still answer 304", response.status_code == 304)
+
+        (await client.post(f"/api/v1/academics/enroll/{created.json()['id']}", headers=student)).raise_for_status()
+        response, _ = await revalidate(client, TIMETABLE, student, etags[TIMETABLE])
+        check("enrolling: the timetable answers 200 with a new ETag",
+              response.status_code == 200 and response.headers["etag"] != etags[TIMETABLE])
+
+        (await client.post(f"{ROOMS}", headers=admin, json={
+            "building": "Block Z", "floor": 1, "room_number": "Z-101", "room_type": "single", "capacity": 1,
+        })).raise_for_status()
+        response, _ = await revalidate(client, ROOMS, student, etags[ROOMS])
+        check("creating a room: rooms answer 200 with a new ETag",
+              response.status_code == 200 and response.headers["etag"] != etags[ROOMS])
+
+        print(f"\nmedian ms per request ({rounds} rounds)")
+        print(f"{'path':<40} {'200':>8} {'304':>8}")
+        for path in (COURSES, ROOMS):
+            current = (await client.get(path, headers=student)).headers["etag"]
+            full = await median_ms(client, path, student, rounds)
+            cached = await median_ms(client, path, {**student, "If-None-Match": current}, rounds)
+            print(f"{path:<40} {full:>8.2f} {cached:>8.2f}")
+
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.rounds)))
@@ -0,0 +1,93 @@
+"""
+Benchmark: /health latency while a burst of logins hits the Argon2 worker pool.
+
+Run with: python -m benchmarks.login_burst [--logins 500]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.common import configure_database, percentile, reset_schema
+
+configure_database()
+
+import httpx  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, engine  # noqa: E402
+from app.core.security import hash_password, hasher  # noqa: E402
+from app.users.models import User, UserRole  # noqa: E402
+from main import app  # noqa: E402
+
+EMAIL = "bench.student@ums.edu"
+PASSWORD = "Bench@123"
+
+
+async def setup_db():
+    await reset_schema()
+    async with AsyncSessionLocal() as db:
+        db.add(User(
+            email=EMAIL, hashed_password=hash_password(PASSWORD),
+            full_name="Bench Student", role=UserRole.STUDENT,
+        ))
+        await db.commit()
+
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> list[float]:
+    samples = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return samples
+
+
+async def login(client: httpx.AsyncClient) -> int:
+    while True:
+        resp = await client.post(
+            "/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD}
+        )
+        if resp.status_code != 503:
+            return resp.status_code
+        await asyncio.sleep(float(resp.headers.get("Retry-After", "1")))
+
+
+async def run(logins: int, interval: float):
+    await setup_db()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Baseline: idle server
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_health(client, stop, interval))
+        await asyncio.sleep(2)
+        stop.set()
+        idle = await probe
+
+        # Burst: N concurrent logins
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_health(client, stop, interval))
+        start = time.perf_counter()
+        codes = await asyncio.gather(*(login(client) for _ in range(logins)))
+        burst_seconds = time.perf_counter() - start
+        stop.set()
+        burst = await probe
+
+    print(f"Logins: {logins} in {burst_seconds:.2f}s "
+          f"({logins / burst_seconds:.1f}/s), ok={codes.count(200)}, "
+          f"rejected(503, retried)={hasher.rejected}")
+    print(f"Hashing: {hasher.stats()}")
+    print(f"{'':>8} {'samples':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for label, samples in (("idle", idle), ("burst", burst)):
+        print(f"{label:>8} {len(samples):>8} {statistics.median(samples):>8.2f} "
+              f"{percentile(samples, 0.99):>8.2f} {max(samples):>8.2f}")
+    hasher.shutdown()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=500)
+    parser.add_argument("--interval", type=float, default=0.01, help="seconds between /health probes")
+    args = parser.parse_args()
+    asyncio.run(run(args.logins, args.interval))
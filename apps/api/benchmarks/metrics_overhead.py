@@ -0,0 +1,156 @@
+"""
+Benchmark: CPU overhead of MetricsMiddleware at 5k requests/second.
+
+1. Isolated cost: the middleware wrapped around a trivial ASGI app versus the
+   trivial app alone, over many calls. This is precise to a fraction of a
+   microsecond, unlike an end-to-end A/B whose noise is larger than the effect.
+2. Request cost: CPU per request of the full main.app stack on --path (a cheap,
+   DB-free route by default, the worst case for relative overhead).
+3. Paced A/B (cross-check): two main.app stacks differing only in the
+   middleware, driven in alternating open-loop rounds at --rps with raw ASGI
+   calls. If the host cannot sustain --rps, the achieved rate is shown.
+
+Passes (exit 0) when the isolated cost is under --budget percent of both the
+per-request CPU and one core at --rps.
+
+Run with: python -m benchmarks.metrics_overhead [--rps 5000] [--seconds 3] [--rounds 5]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from benchmarks.common import configure_database, percentile
+
+configure_database()
+
+from app.core.metrics import MetricsMiddleware  # noqa: E402
+from main import app  # noqa: E402
+
+
+class _Route:
+    path = "/api/v1/bench/{item_id}"
+
+
+async def _trivial_app(scope, receive, send):
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _discard(message):
+    pass
+
+
+async def isolated_cost(calls: int, rounds: int) -> float:
+    """Median extra microseconds per request added by the middleware."""
+    wrapped = MetricsMiddleware(_trivial_app)
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/bench/1"}
+    samples = {"bare": [], "wrapped": []}
+    for _ in range(rounds):
+        for name, asgi in (("bare", _trivial_app), ("wrapped", wrapped)):
+            start = time.process_time()
+            for _ in range(calls):
+                await asgi(dict(scope), None, _discard)
+            samples[name].append((time.process_time() - start) / calls * 1e6)
+    return statistics.median(samples["wrapped"]) - statistics.median(samples["bare"])
+
+
+def build_stacks():
+    with_metrics = app.build_middleware_stack()
+    saved = app.user_middleware
+    app.user_middleware = [m for m in saved if m.cls is not MetricsMiddleware]
+    try:
+        without_metrics = app.build_middleware_stack()
+    finally:
+        app.user_middleware = saved
+    return with_metrics, without_metrics
+
+
+async def call(asgi, path: str) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] >= 400:
+            raise RuntimeError(f"{path} returned {message['status']}")
+
+    start = time.perf_counter()
+    await asgi(scope, receive, send)
+    return time.perf_counter() - start
+
+
+async def request_cost(asgi, path: str, calls: int) -> float:
+    """CPU microseconds per request through the full stack."""
+    start = time.process_time()
+    for _ in range(calls):
+        await call(asgi, path)
+    return (time.process_time() - start) / calls * 1e6
+
+
+async def paced_round(asgi, path: str, rps: int, seconds: float) -> dict[str, float]:
+    """Open-loop load: request i is started at i / rps seconds, whatever the server's pace."""
+    total = int(rps * seconds)
+    tasks = []
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    while len(tasks) < total:
+        due = min(total, int((time.perf_counter() - wall_start) * rps) + 1)
+        while len(tasks) < due:
+            tasks.append(asyncio.create_task(call(asgi, path)))
+        await asyncio.sleep(0.0005)
+    latencies = await asyncio.gather(*tasks)
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    return {
+        "cpu_us": cpu / total * 1e6,
+        "achieved_rps": total / wall,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def run(path: str, rps: int, seconds: float, rounds: int, budget: float) -> int:
+    middleware_us = await isolated_cost(calls=100_000, rounds=rounds)
+    with_metrics, without_metrics = build_stacks()
+    async with app.router.lifespan_context(app):
+        await request_cost(with_metrics, path, 2000)  # warm-up
+        stack_us = statistics.median([await request_cost(with_metrics, path, 5000) for _ in range(rounds)])
+        paced: dict[str, list[dict[str, float]]] = {"without": [], "with": []}
+        for _ in range(rounds):
+            paced["without"].append(await paced_round(without_metrics, path, rps, seconds))
+            paced["with"].append(await paced_round(with_metrics, path, rps, seconds))
+
+    share_of_request = middleware_us / stack_us * 100
+    share_of_core = middleware_us * rps / 1e4
+    print(f"Middleware cost (isolated):  {middleware_us:.2f} us/request")
+    print(f"Full stack, GET {path}:        {stack_us:.1f} us CPU/request")
+    print(f"Overhead: {share_of_request:.2f}% of request CPU, {share_of_core:.2f}% of one core "
+          f"at {rps} req/s (budget {budget}%)")
+
+    print(f"\nPaced A/B cross-check at {rps} req/s, {rounds} alternating rounds of {seconds}s "
+          "(informational: round-to-round noise on a shared host exceeds the effect)")
+    print(f"{'stack':<16} {'CPU us/req':>11} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, rows in paced.items():
+        print(f"{name + ' metrics':<16} {statistics.median(r['cpu_us'] for r in rows):>11.1f} "
+              f"{statistics.median(r['achieved_rps'] for r in rows):>9.0f} "
+              f"{statistics.median(r['p50_ms'] for r in rows):>8.2f} "
+              f"{statistics.median(r['p99_ms'] for r in rows):>8.2f}")
+    return 0 if share_of_request < budget and share_of_core < budget else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default="/", help="route to drive; must not need auth")
+    parser.add_argument("--rps", type=int, default=5000)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=2.0, help="max overhead in percent")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.path, args.rps, args.seconds, args.rounds, args.budget)))
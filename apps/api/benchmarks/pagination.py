@@ -0,0 +1,84 @@
+"""
+Benchmark: OFFSET vs keyset (cursor) page fetches deep into chat history.
+
+Run with: python -m benchmarks.pagination [--messages 200000] [--offset 100000]
+"""
+import argparse
+import asyncio
+import statistics
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import configure_database, reset_schema, timer
+
+configure_database()
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.communication import service  # noqa: E402
+from app.communication.models import ChatMessage, ChatRoom  # noqa: E402
+from app.core.database import AsyncSessionLocal, engine  # noqa: E402
+from app.core.pagination import encode_cursor  # noqa: E402
+from app.users.models import User, UserRole  # noqa: E402
+
+CHUNK = 10_000
+PAGE = 50
+ROUNDS = 20
+
+
+async def seed(messages: int):
+    await reset_schema()
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(User).values(
+            id=1, email="bench@ums.edu", hashed_password="x", full_name="Bench", role=UserRole.STUDENT
+        ))
+        await db.execute(insert(ChatRoom).values(id=1, name="Lecture", created_by=1))
+        for offset in range(0, messages, CHUNK):
+            await db.execute(insert(ChatMessage), [
+                {"room_id": 1, "sender_id": 1, "content": f"message {i}",
+                 "sent_at": start + timedelta(seconds=i)}
+                for i in range(offset, min(offset + CHUNK, messages))
+            ])
+        await db.commit()
+
+
+async def measure(fetch) -> float:
+    samples = []
+    for _ in range(ROUNDS):
+        async with AsyncSessionLocal() as db:
+            with timer() as t:
+                messages, _ = await fetch(db)
+            assert len(messages) == PAGE
+        samples.append(t["seconds"] * 1000)
+    return statistics.median(samples)
+
+
+async def run(messages: int, offset: int):
+    await seed(messages)
+    async with AsyncSessionLocal() as db:
+        # Cursor pointing at the same position as OFFSET `offset`.
+        row = (await db.execute(
+            select(ChatMessage.sent_at, ChatMessage.id).where(ChatMessage.room_id == 1)
+            .order_by(ChatMessage.sent_at.desc(), ChatMessage.id.desc()).offset(offset - 1).limit(1)
+        )).one()
+    cursor = encode_cursor([row.sent_at, row.id])
+
+    print(f"{messages} messages, page size {PAGE}, median of {ROUNDS} fetches")
+    results = [
+        ("first page", await measure(lambda db: service.get_room_messages(db, 1, limit=PAGE))),
+        (f"OFFSET {offset}", await measure(
+            lambda db: service.get_room_messages(db, 1, skip=offset, limit=PAGE))),
+        (f"cursor @{offset}", await measure(
+            lambda db: service.get_room_messages(db, 1, limit=PAGE, cursor=cursor))),
+    ]
+    for label, ms in results:
+        print(f"{label:>16} {ms:>8.2f} ms")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--offset", type=int, default=100_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.messages, args.offset))
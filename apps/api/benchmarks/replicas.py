@@ -0,0 +1,159 @@
+"""
+Check: read-replica routing with two local SQLite files.
+
+The primary is seeded and copied to a replica file, so afterwards the copy only
+changes when the script says so. A course created through the API lands on the
+primary alone, which makes it visible which database served each read:
+
+1. A user who has not written reads from the replica (course missing).
+2. The admin who wrote reads from the primary for READ_YOUR_WRITES_SECONDS,
+   then from the replica again.
+3. A second, unreachable replica URL is benched and reads keep working.
+4. A replica reporting lag above REPLICA_MAX_LAG_SECONDS is skipped.
+5. With reads on the primary, more concurrent first-time requests than the
+   primary pool has connections all succeed within a POOL_TIMEOUT_SECONDS
+   pool timeout: no request holds two connections from the same pool.
+
+With BENCH_DATABASE_URL and BENCH_REPLICA_URL set (e.g. two local Postgres
+databases), the same checks run there; the replica must be a separate database
+with the same data, not a streaming standby, so it stays stale on purpose.
+
+Exits non-zero if any check fails.
+
+Run with: python -m benchmarks.replicas
+"""
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+WINDOW_SECONDS = 2
+RECHECK_SECONDS = 1
+POOL_TIMEOUT_SECONDS = 3
+
+
+def configure() -> tuple[str, str | None]:
+    """Point the app at a primary and replicas before anything imports settings."""
+    primary, replica = os.environ.get("BENCH_DATABASE_URL"), os.environ.get("BENCH_REPLICA_URL")
+    copy_to = None
+    if not primary:
+        workdir = tempfile.mkdtemp(prefix="ums-replicas-")
+        primary = f"sqlite+aiosqlite:///{workdir}/primary.db"
+        replica = f"sqlite+aiosqlite:///{workdir}/replica.db"
+        copy_to = f"{workdir}/replica.db"
+    unreachable = "sqlite+aiosqlite:////nonexistent-ums-dir/replica.db"
+    os.environ.update(
+        DATABASE_URL=primary,
+        DATABASE_REPLICA_URLS=json.dumps([replica, unreachable]),
+        READ_YOUR_WRITES_SECONDS=str(WINDOW_SECONDS),
+        REPLICA_RECHECK_SECONDS=str(RECHECK_SECONDS),
+        REPLICA_MAX_LAG_SECONDS="5",
+        DATABASE_POOL_TIMEOUT_SECONDS=str(POOL_TIMEOUT_SECONDS),
+    )
+    return primary, copy_to
+
+
+PRIMARY_URL, REPLICA_COPY = configure()
+
+import httpx  # noqa: E402
+
+from app.core.cache import principal_cache  # noqa: E402
+from app.core.database import engine  # noqa: E402
+from app.core.replicas import replica_router  # noqa: E402
+from app.seed import seed  # noqa: E402
+from main import app  # noqa: E402
+
+results: list[tuple[str, bool]] = []
+
+
+def check(name: str, ok: bool):
+    results.append((name, ok))
+    print(f"{'PASS' if ok else 'FAIL'}  {name}")
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> dict[str, str]:
+    response = await client.post("/api/v1/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def course_codes(client: httpx.AsyncClient, headers: dict[str, str]) -> set[str]:
+    response = await client.get("/api/v1/academics/courses", headers=headers, params={"limit": 100})
+    response.raise_for_status()
+    return {course["code"] for course in response.json()["courses"]}
+
+
+async def run() -> int:
+    await seed()
+    await engine.dispose()
+    if REPLICA_COPY:
+        shutil.copyfile(PRIMARY_URL.split("///", 1)[1], REPLICA_COPY)
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=transport, base_url="http://replicas"
+    ) as client:
+        admin = await login(client, "admin@ums.edu", "Admin@123")
+        student = await login(client, "manohar.k@ums.edu", "Student@123")
+
+        template = (await client.get("/api/v1/academics/courses", headers=admin)).json()["courses"][0]
+        created = await client.post("/api/v1/academics/courses", headers=admin, json={
+            "code": "RPL101", "name": "Replication Lag", "credits": 3,
+            "department": template["department"], "semester": template["semester"],
+            "faculty_id": template["faculty_id"],
+        })
+        created.raise_for_status()
+
+        student_view = [await course_codes(client, student) for _ in range(4)]
+        check("reads without a recent write are served by the replica",
+              all("RPL101" not in codes for codes in student_view))
+        check("the writer reads its own write from the primary",
+              "RPL101" in await course_codes(client, admin))
+
+        await asyncio.sleep(WINDOW_SECONDS + 0.5)
+        check("after the read-your-writes window the writer reads from the replica again",
+              "RPL101" not in await course_codes(client, admin))
+
+        stats = replica_router.stats()
+        good, bad = stats["replicas"]
+        check("the unreachable replica is benched", bad["state"] == "down" and bad["failures"] >= 1)
+        check("the healthy replica served the reads", good["served"] >= 5)
+
+        replica = replica_router.replicas[0]
+
+        async def lagging(session):
+            await session.connection()
+            return 60.0
+
+        replica.measure_lag = lagging
+        await asyncio.sleep(RECHECK_SECONDS + 0.1)
+        check("a lagging replica is skipped and reads fall back to the primary",
+              "RPL101" in await course_codes(client, student))
+        check("the lagging replica is reported", replica_router.stats()["replicas"][0]["state"] == "lagging")
+
+        # Every request misses the principal cache and reads from the primary.
+        pool = engine.sync_engine.pool
+        burst = pool.size() + pool._max_overflow + 10
+        users = [admin, student]
+        for user_id in range(1, 50):
+            await principal_cache.invalidate(user_id)
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *(client.get("/api/v1/users/me", headers=users[i % 2]) for i in range(burst)), return_exceptions=True
+        )
+        elapsed = time.perf_counter() - start
+        ok = sum(isinstance(r, httpx.Response) and r.status_code == 200 for r in responses)
+        check(f"{burst} concurrent first-time GET /users/me on a pool of {pool.size()}+{pool._max_overflow}: "
+              f"{ok} succeeded in {elapsed:.2f}s", ok == burst and elapsed < POOL_TIMEOUT_SECONDS)
+
+        health = (await client.get("/health")).json()["read_replicas"]
+        print(json.dumps(health, indent=2))
+
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run()))
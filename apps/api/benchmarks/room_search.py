@@ -0,0 +1,176 @@
+"""
+Benchmark and check: room search by amenities, type and capacity.
+
+--rooms rooms get random amenities from a fixed list, from WiFi in nearly
+every room down to a kitchen in a few. Each search runs through
+housing.service.list_rooms (first page of 50 and the total), --repeats times,
+and the same search is done the way the JSON column alone allowed: load every
+room and parse its amenities in Python. The pages and totals must match, and
+each indexed search must be at least --min-speedup times faster. One search
+also goes through GET /housing/rooms.
+
+Run with: python -m benchmarks.room_search [--rooms 100000] [--repeats 20] [--min-speedup 5]
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+
+from benchmarks.common import configure_database, reset_schema, timer
+
+configure_database()
+
+import httpx  # noqa: E402
+from sqlalchemy import event, select  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, engine  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.housing import service  # noqa: E402
+from app.housing.models import Room, RoomAmenity, RoomStatus, RoomType, amenity_key, amenity_keys  # noqa: E402
+from app.seed import ROOM_CAPACITY, BulkWriter  # noqa: E402
+from app.users.models import User, UserRole  # noqa: E402
+from main import app  # noqa: E402
+
+AMENITIES = {"WiFi": 0.95, "Wardrobe": 0.7, "AC": 0.6, "Study Desk": 0.5, "Fan": 0.4, "Attached Bath": 0.35,
+             "Geyser": 0.3, "Balcony": 0.1, "Mini Fridge": 0.05, "Kitchen": 0.03}
+SEARCHES = [
+    ("AC + attached bath", {"amenities": ["AC", "Attached Bath"]}),
+    ("kitchen (3%)", {"amenities": ["Kitchen"]}),
+    ("double, AC", {"room_type": RoomType.DOUBLE, "amenities": ["ac"]}),
+    ("available, 2+ beds, study desk", {"status": RoomStatus.AVAILABLE, "min_capacity": 2,
+                                        "amenities": ["Study Desk"]}),
+    ("suite, balcony, mini fridge, kitchen", {"room_type": RoomType.SUITE,
+                                              "amenities": ["Balcony", "Mini Fridge", "Kitchen"]}),
+    ("WiFi (95%)", {"amenities": ["WiFi"]}),
+    ("single, 1 bed", {"room_type": RoomType.SINGLE, "max_capacity": 1}),
+]
+
+results: list[tuple[str, bool]] = []
+
+
+def check(name: str, ok: bool):
+    results.append((name, ok))
+    print(f"{'PASS' if ok else 'FAIL'}  {name}")
+
+
+async def seed(rooms: int) -> None:
+    rng = random.Random(3)
+    statuses = (RoomStatus.AVAILABLE, RoomStatus.OCCUPIED, RoomStatus.MAINTENANCE)
+    specs = []
+    for i in range(rooms):
+        room_type = rng.choice(list(RoomType))
+        names = [name for name, share in AMENITIES.items() if rng.random() < share]
+        specs.append((room_type, json.dumps(names, separators=(",", ":"))))
+    writer = BulkWriter()
+    await writer.write(Room, (
+        {"building": f"Hostel {i // 500}", "floor": 1 + (i % 500) // 50, "room_number": f"R{i:06d}",
+         "room_type": room_type, "capacity": ROOM_CAPACITY[room_type], "occupied": 0,
+         "status": rng.choices(statuses, (0.6, 0.35, 0.05))[0], "amenities": amenities}
+        for i, (room_type, amenities) in enumerate(specs)
+    ))
+    await writer.write(RoomAmenity, (
+        {"room_id": i + 1, "amenity": key} for i, (_, amenities) in enumerate(specs) for key in amenity_keys(amenities)
+    ))
+    await writer.write(User, [{"email": "admin@ums.edu", "hashed_password": "-", "full_name": "Admin",
+                               "role": UserRole.ADMIN, "is_active": True}])
+
+
+async def scan(filters: dict) -> tuple[list[int], int]:
+    """The search without room_amenities: every room loaded, its JSON parsed."""
+    wanted = {amenity_key(name) for name in filters.get("amenities", ())}
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            select(Room.id, Room.room_type, Room.capacity, Room.status, Room.amenities).order_by(Room.id)
+        )).all()
+    matches = [
+        room_id for room_id, room_type, capacity, status, amenities in rows
+        if wanted <= {amenity_key(name) for name in json.loads(amenities or "[]")}
+        and filters.get("room_type", room_type) == room_type and filters.get("status", status) == status
+        and capacity >= filters.get("min_capacity", 0) and capacity <= filters.get("max_capacity", capacity)
+    ]
+    return matches[:50], len(matches)
+
+
+async def search(filters: dict) -> tuple[list[int], int]:
+    async with AsyncSessionLocal() as db:
+        rooms, total, _ = await service.list_rooms(db, limit=50, **filters)
+    return [room.id for room in rooms], total
+
+
+async def timed(fn, filters: dict, repeats: int) -> tuple[tuple[list[int], int], float]:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        answer = await fn(filters)
+        samples.append(time.perf_counter() - start)
+    return answer, statistics.median(samples)
+
+
+async def plans(filters: dict) -> list[str]:
+    if engine.dialect.name != "sqlite":
+        return []
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    await search(filters)
+    event.remove(engine.sync_engine, "before_cursor_execute", capture)
+    lines = []
+    async with engine.connect() as conn:
+        for statement, parameters in captured:
+            if statement.lstrip().upper().startswith("SELECT"):
+                rows = (await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)).all()
+                lines += [row[-1] for row in rows]
+    return lines
+
+
+async def run(rooms: int, repeats: int, min_speedup: float) -> int:
+    await reset_schema()
+    with timer() as t:
+        await seed(rooms)
+    print(f"generated {rooms} rooms in {t['seconds']:.1f}s")
+
+    for label, filters in SEARCHES:
+        (page, total), indexed = await timed(search, filters, repeats)
+        (expected_page, expected_total), scanned = await timed(scan, filters, max(1, repeats // 5))
+        print(f"  {label:<38} {total:>6} rooms   indexed {indexed * 1000:7.1f} ms   "
+              f"scan + parse {scanned * 1000:7.1f} ms   ({scanned / indexed:.0f}x)")
+        check(f"{label}: same page and total as parsing every room",
+              page == expected_page and total == expected_total)
+        check(f"{label}: at least {min_speedup:.0f}x faster than parsing every room",
+              scanned / indexed >= min_speedup)
+
+    for line in await plans(SEARCHES[0][1]):
+        print(f"    plan: {line}")
+
+    async with AsyncSessionLocal() as db:
+        admin_id = (await db.execute(select(User.id).where(User.role == UserRole.ADMIN))).scalar_one()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(admin_id)})}"}
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://room-search", headers=headers
+    ) as client:
+        response = await client.get("/api/v1/housing/rooms", params={
+            "amenity": ["AC", "attached  bath"], "room_type": "double", "min_capacity": 2, "limit": 50,
+        })
+        expected_page, expected_total = await scan({"amenities": ["AC", "Attached Bath"],
+                                                     "room_type": RoomType.DOUBLE, "min_capacity": 2})
+        body = response.json()
+        check("GET /housing/rooms?amenity=AC&amenity=attached bath&room_type=double&min_capacity=2",
+              response.status_code == 200 and body["total"] == expected_total
+              and [room["id"] for room in body["rooms"]] == expected_page)
+
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--min-speedup", type=float, default=5.0)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.rooms, args.repeats, args.min_speedup)))
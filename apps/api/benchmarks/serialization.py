@@ -0,0 +1,196 @@
+"""
+Benchmark: JSON serialization of the 100-item list endpoints, before and after
+the fast encoder.
+
+For each endpoint, the same 100 ORM rows are encoded three ways:
+  pydantic   the previous path: the endpoint returns the model (or rows), FastAPI
+             validates it against response_model, dumps it to python and
+             JSONResponse encodes it with the stdlib json module
+  orjson     the same, with ORJSONResponse (FAST_JSON, no endpoint changes)
+  rows       rows_response(): rows read straight into dicts, one orjson call
+
+Then each endpoint is requested end to end through the app (?limit=100), next
+to a copy of the route using the previous return value and JSONResponse.
+
+Run with: python -m benchmarks.serialization [--students 3000] [--rounds 200]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from benchmarks.common import configure_database, reset_schema
+
+configure_database()
+
+import httpx  # noqa: E402
+from fastapi import Depends  # noqa: E402
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import APIRoute, serialize_response  # noqa: E402
+from pydantic import BaseModel  # noqa: E402
+
+from app.academics import service as academics  # noqa: E402
+from app.academics.schemas import CourseListResponse, CourseResponse  # noqa: E402
+from app.communication import service as communication  # noqa: E402
+from app.communication.schemas import ChatMessageResponse, LeaveResponse  # noqa: E402
+from app.core.database import AsyncSessionLocal  # noqa: E402
+from app.core.deps import CurrentUser, get_read_db  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.core.serialization import rows_response  # noqa: E402
+from app.housing import service as housing  # noqa: E402
+from app.housing.schemas import MaintenanceResponse, RoomListResponse, RoomResponse  # noqa: E402
+from app.seed import SyntheticUniversity, generate  # noqa: E402
+from app.users import service as users  # noqa: E402
+from app.users.schemas import UserListResponse, UserResponse  # noqa: E402
+from main import app  # noqa: E402
+
+LIMIT = 100
+
+
+@dataclass
+class Case:
+    path: str
+    item: type[BaseModel]
+    load: Callable[[Any], Awaitable[tuple[list, dict]]]  # db -> (rows, page info)
+    wrapper: type[BaseModel] | None = None  # list model the endpoint used to return
+    key: str | None = None
+
+
+async def _courses(db):
+    rows, total, cursor = await academics.list_courses(db, limit=LIMIT)
+    return rows, {"total": total, "next_cursor": cursor}
+
+
+async def _users(db):
+    rows, total, cursor = await users.list_users(db, limit=LIMIT)
+    return rows, {"total": total, "next_cursor": cursor}
+
+
+async def _rooms(db):
+    rows, total, cursor = await housing.list_rooms(db, limit=LIMIT)
+    return rows, {"total": total, "next_cursor": cursor}
+
+
+async def _maintenance(db):
+    rows, _, cursor = await housing.list_maintenance_requests(db, limit=LIMIT, include_total=False)
+    return rows, {}
+
+
+async def _messages(db):
+    rows, cursor = await communication.get_room_messages(db, 1, limit=LIMIT)
+    return rows, {}
+
+
+async def _leaves(db):
+    rows, cursor = await communication.get_leaves(db, limit=LIMIT)
+    return rows, {}
+
+
+CASES = [
+    Case("/api/v1/academics/courses", CourseResponse, _courses, CourseListResponse, "courses"),
+    Case("/api/v1/users/", UserResponse, _users, UserListResponse, "users"),
+    Case("/api/v1/housing/rooms", RoomResponse, _rooms, RoomListResponse, "rooms"),
+    Case("/api/v1/housing/maintenance", MaintenanceResponse, _maintenance),
+    Case("/api/v1/communication/rooms/1/messages", ChatMessageResponse, _messages),
+    Case("/api/v1/communication/leaves", LeaveResponse, _leaves),
+]
+
+
+def previous_value(case: Case, rows: list, page: dict) -> Any:
+    return case.wrapper(**{case.key: rows}, **page) if case.wrapper else rows
+
+
+def response_field(path: str):
+    for route in app.routes:
+        if (isinstance(route, APIRoute) and "GET" in route.methods
+                and route.path == path.replace("/rooms/1/", "/rooms/{room_id}/")):
+            return route.secure_cloned_response_field
+    raise LookupError(path)
+
+
+async def time_us(fn: Callable[[], Awaitable[bytes]], rounds: int) -> float:
+    for _ in range(10):
+        await fn()
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+async def isolated(case: Case, rounds: int) -> tuple[int, dict[str, float]]:
+    async with AsyncSessionLocal() as db:
+        rows, page = await case.load(db)
+    field = response_field(case.path)
+
+    async def via_fastapi(response_class) -> bytes:
+        content = await serialize_response(field=field, response_content=previous_value(case, rows, page))
+        return response_class(content).body
+
+    async def via_rows() -> bytes:
+        return rows_response(case.item, rows, key=case.key, extra=page if case.key else None).body
+
+    assert (await via_fastapi(JSONResponse)).replace(b" ", b"") == (await via_rows()).replace(b" ", b"")
+    return len(rows), {
+        "pydantic": await time_us(lambda: via_fastapi(JSONResponse), rounds),
+        "orjson": await time_us(lambda: via_fastapi(ORJSONResponse), rounds),
+        "rows": await time_us(via_rows, rounds),
+    }
+
+
+def add_previous_routes():
+    """/bench-before/... copies of each endpoint returning what they used to, through JSONResponse."""
+    for case in CASES:
+        def make(case: Case):
+            async def endpoint(_user: CurrentUser, db=Depends(get_read_db)):
+                rows, page = await case.load(db)
+                return previous_value(case, rows, page)
+            return endpoint
+
+        app.router.routes.insert(0, APIRoute(
+            "/bench-before" + case.path, make(case), methods=["GET"],
+            response_model=case.wrapper or list[case.item], response_class=JSONResponse,
+        ))
+
+
+async def end_to_end(client: httpx.AsyncClient, path: str, rounds: int) -> float:
+    async def get() -> bytes:
+        response = await client.get(path, params={"limit": LIMIT})
+        response.raise_for_status()
+        return response.content
+    return await time_us(get, rounds) / 1000
+
+
+async def run(students: int, rounds: int):
+    await reset_schema()
+    await generate(SyntheticUniversity(students=students, courses=300, chat_messages=20_000))
+    add_previous_routes()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1'})}"}
+
+    print(f"Serialization only, median us per response ({rounds} rounds)")
+    print(f"{'endpoint':<40} {'items':>5} {'pydantic':>9} {'orjson':>9} {'rows':>9} {'speedup':>8}")
+    async with app.router.lifespan_context(app):
+        for case in CASES:
+            count, us = await isolated(case, rounds)
+            print(f"{case.path:<40} {count:>5} {us['pydantic']:>9.0f} {us['orjson']:>9.0f} {us['rows']:>9.0f} "
+                  f"{us['pydantic'] / us['rows']:>7.1f}x")
+
+        print(f"\nEnd to end, median ms per request ({rounds // 4} rounds)")
+        print(f"{'endpoint':<40} {'before':>9} {'after':>9}")
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+            for case in CASES:
+                before = await end_to_end(client, "/bench-before" + case.path, rounds // 4)
+                after = await end_to_end(client, case.path, rounds // 4)
+                print(f"{case.path:<40} {before:>9.2f} {after:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=3000)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.students, args.rounds))
@@ -0,0 +1,104 @@
+"""
+Benchmark: cold start of the whole app, per startup configuration.
+
+Each sample is a fresh interpreter (imports are only cold once per process)
+that reports:
+  import   `import main` (every module, router and model)
+  startup  the lifespan startup phase (schema handling and warm-up)
+  first    the first request to each of --paths, back to back
+  warm     the same requests again
+  total    process start to the last first-request response, as seen by the parent
+
+The database is migrated with `alembic upgrade head` and given the demo seed,
+so every STARTUP_SCHEMA_MODE works against it.
+
+Run with: python -m benchmarks.startup [--runs 5] [--paths /api/v1/academics/courses ...]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.common import configure_database
+
+CONFIGS = {
+    "create": {"STARTUP_SCHEMA_MODE": "create", "STARTUP_WARM_CONNECTIONS": "0", "STARTUP_WARM_STATEMENTS": "false"},
+    "verify": {"STARTUP_SCHEMA_MODE": "verify", "STARTUP_WARM_CONNECTIONS": "0", "STARTUP_WARM_STATEMENTS": "false"},
+    "verify+warm": {"STARTUP_SCHEMA_MODE": "verify"},
+    "skip+warm": {"STARTUP_SCHEMA_MODE": "skip"},
+}
+
+CHILD = """
+import time
+t0 = time.perf_counter()
+import main
+t_import = time.perf_counter()
+import asyncio, json, sys
+import httpx
+from app.core.security import create_access_token
+
+async def run(paths):
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "1"})}
+    t_start = time.perf_counter()
+    async with main.app.router.lifespan_context(main.app):
+        t_ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            timings = {}
+            for label in ("first", "warm"):
+                start = time.perf_counter()
+                for path in paths:
+                    (await client.get(path, headers=headers)).raise_for_status()
+                timings[label] = (time.perf_counter() - start) * 1000
+            print(json.dumps({
+                "import": (t_import - t0) * 1000,
+                "startup": (t_ready - t_start) * 1000,
+                **timings,
+            }), flush=True)
+
+asyncio.run(run(sys.argv[1:]))
+"""
+
+
+def prepare(env: dict[str, str]):
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], env=env, check=True,
+                   capture_output=True)
+    subprocess.run([sys.executable, "-m", "app.seed"], env=env, check=True, capture_output=True)
+
+
+def sample(env: dict[str, str], paths: list[str]) -> dict[str, float]:
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", CHILD, *paths], env=env, check=True,
+                          capture_output=True, text=True)
+    total = (time.perf_counter() - start) * 1000
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    # The child's last line is printed after the warm requests; take them off the total.
+    result["total"] = total - result["warm"]
+    return result
+
+
+def main(runs: int, paths: list[str]):
+    configure_database()
+    env = {**os.environ, "PYTHONPATH": os.getcwd()}
+    prepare(env)
+    columns = ("import", "startup", "first", "warm", "total")
+    print(f"median of {runs} cold starts, GET {' '.join(paths)}")
+    print(f"{'config':<12}" + "".join(f"{name + ' ms':>12}" for name in columns))
+    for name, overrides in CONFIGS.items():
+        samples = [sample({**env, **overrides}, paths) for _ in range(runs)]
+        print(f"{name:<12}" + "".join(
+            f"{statistics.median(s[column] for s in samples):>12.1f}" for column in columns
+        ))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--paths", nargs="+", default=[
+        "/api/v1/academics/courses", "/api/v1/academics/timetable/me", "/api/v1/housing/rooms",
+    ])
+    args = parser.parse_args()
+    main(args.runs, args.paths)
@@ -0,0 +1,361 @@
+"""
+Load-test suite covering every router mounted in main.py.
+
+Seeds a synthetic university (app.seed.generate), then drives each
+endpoint with a fixed number of requests at a fixed concurrency and reports
+throughput, p50/p95/p99 latency and database queries per request.
+
+Two modes:
+  in-process (default)  httpx over ASGITransport against main.app.
+  --workers N           N uvicorn worker processes on --port, driven over real
+                        HTTP.
+
+Queries and DB time per request come from the Server-Timing header
+(QUERY_TIMING_ENABLED); with it off, in-process runs count statements on the
+app engine instead and worker runs report none.
+
+Runs against a throwaway SQLite file, or BENCH_DATABASE_URL (e.g. a local
+Postgres). With BENCH_DATABASE_URL set, --skip-seed reuses a database seeded
+earlier with the same --scale and --seed. Results go to --output as JSON;
+--compare BASELINE.json prints the change against an earlier run and exits 1
+when any endpoint's p95 regressed by more than --threshold percent.
+
+Run with:
+  python -m benchmarks.suite --scale 0.01 --requests 200 --output bench.json
+  BENCH_DATABASE_URL=... python -m benchmarks.suite --skip-seed --workers 4 --compare bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable
+
+from benchmarks.common import QueryCounter, configure_database, percentile, reset_schema
+
+DATABASE_URL = configure_database()
+
+import httpx  # noqa: E402
+
+from app.seed import SYNTHETIC_PASSWORD, SyntheticUniversity, generate  # noqa: E402
+
+API = "/api/v1"
+# 50k students x ~5 courses x 40 sessions gives ~10M attendance rows.
+FULL_SIZE = {"students": 50_000, "courses": 2_000, "chat_messages": 1_000_000}
+SERVER_TIMING_DB = re.compile(r'db;dur=(?P<dur>[\d.]+);desc="(?P<queries>\d+) queries"')
+TOKEN_POOL = 20  # distinct students / faculty logged in, so requests don't all hit one user's rows
+
+
+@dataclass
+class Endpoint:
+    router: str
+    name: str
+    method: str
+    role: str  # "admin", "faculty", "student", "refresh" (student refresh token) or "anonymous"
+    # (rng, dataset spec, actor index) -> (path, json body or None)
+    build: Callable[[random.Random, SyntheticUniversity, int], tuple[str, Any]]
+
+
+def _get(path: str) -> Callable[[random.Random, SyntheticUniversity, int], tuple[str, Any]]:
+    return lambda rng, data, actor: (path, None)
+
+
+def _course(rng: random.Random, data: SyntheticUniversity) -> int:
+    return rng.randint(1, data.courses)
+
+
+def _faculty_course(rng: random.Random, data: SyntheticUniversity, faculty: int) -> int:
+    """A course taught by the given faculty index."""
+    per_faculty = max(1, (data.courses - faculty - 1) // data.faculty + 1)
+    return faculty + 1 + rng.randrange(per_faculty) * data.faculty
+
+
+ENDPOINTS = [
+    # ─── auth ───
+    Endpoint("auth", "login", "POST", "anonymous", lambda rng, data, actor: (
+        f"{API}/auth/login",
+        {"email": data.student_email(rng.randrange(data.students)), "password": SYNTHETIC_PASSWORD},
+    )),
+    Endpoint("auth", "refresh", "POST", "refresh", lambda rng, data, actor: (f"{API}/auth/refresh", None)),
+    # ─── users ───
+    Endpoint("users", "me", "GET", "student", _get(f"{API}/users/me")),
+    Endpoint("users", "list", "GET", "admin", _get(f"{API}/users/?limit=50")),
+    Endpoint("users", "list_no_total", "GET", "admin", _get(f"{API}/users/?limit=50&include_total=false")),
+    Endpoint("users", "get", "GET", "admin", lambda rng, data, actor: (
+        f"{API}/users/{data.first_student_id + rng.randrange(data.students)}", None,
+    )),
+    # ─── academics ───
+    Endpoint("academics", "courses", "GET", "student", _get(f"{API}/academics/courses?limit=50")),
+    Endpoint("academics", "course", "GET", "student", lambda rng, data, actor: (
+        f"{API}/academics/courses/{_course(rng, data)}", None,
+    )),
+    Endpoint("academics", "my_courses", "GET", "student", _get(f"{API}/academics/my-courses")),
+    Endpoint("academics", "my_attendance", "GET", "student", _get(f"{API}/academics/attendance/summary")),
+    Endpoint("academics", "course_attendance", "GET", "faculty", lambda rng, data, actor: (
+        f"{API}/academics/courses/{_faculty_course(rng, data, actor)}/attendance/summary", None,
+    )),
+    Endpoint("academics", "mark_attendance", "POST", "faculty", lambda rng, data, actor: (
+        f"{API}/academics/attendance",
+        {"student_id": data.first_student_id + rng.randrange(data.students),
+         "course_id": _faculty_course(rng, data, actor),
+         "date": (date(2025, 1, 6) + timedelta(days=rng.randrange(90))).isoformat(),
+         "status": rng.choice(["present", "absent", "late"])},
+    )),
+    Endpoint("academics", "my_results", "GET", "student", _get(f"{API}/academics/results/me")),
+    Endpoint("academics", "my_timetable", "GET", "student", _get(f"{API}/academics/timetable/me")),
+    # ─── housing ───
+    Endpoint("housing", "rooms", "GET", "student", _get(f"{API}/housing/rooms?limit=50")),
+    Endpoint("housing", "my_room", "GET", "student", _get(f"{API}/housing/my-room")),
+    Endpoint("housing", "maintenance", "GET", "admin", _get(f"{API}/housing/maintenance?limit=50")),
+    # ─── communication ───
+    Endpoint("communication", "chat_rooms", "GET", "student", _get(f"{API}/communication/rooms")),
+    Endpoint("communication", "messages", "GET", "student", lambda rng, data, actor: (
+        f"{API}/communication/rooms/{_course(rng, data)}/messages?limit=50", None,
+    )),
+    Endpoint("communication", "leaves", "GET", "admin", _get(f"{API}/communication/leaves?limit=50")),
+    Endpoint("communication", "my_leaves", "GET", "student", _get(f"{API}/communication/leaves/me")),
+    Endpoint("communication", "apply_leave", "POST", "student", lambda rng, data, actor: (
+        f"{API}/communication/leaves",
+        {"leave_type": "casual", "start_date": "2025-02-01", "end_date": "2025-02-02", "reason": "bench"},
+    )),
+]
+
+
+# ─── Sessions ──────────────────────────────────────────────
+class Actors:
+    """Access and refresh tokens for a pool of seeded users, per role."""
+
+    def __init__(self):
+        self.tokens: dict[str, list[str]] = {}
+        self.refresh: list[str] = []
+
+    async def login(self, client: httpx.AsyncClient, data: SyntheticUniversity):
+        async def token_pair(email: str) -> tuple[str, str]:
+            resp = await client.post(f"{API}/auth/login", json={"email": email, "password": SYNTHETIC_PASSWORD})
+            resp.raise_for_status()
+            body = resp.json()
+            return body["access_token"], body["refresh_token"]
+
+        admin = await token_pair("admin@ums.edu")
+        students = [await token_pair(data.student_email(i))
+                    for i in range(min(TOKEN_POOL, data.students))]
+        faculty = [await token_pair(data.faculty_email(i)) for i in range(min(TOKEN_POOL, data.faculty))]
+        self.tokens = {
+            "admin": [admin[0]],
+            "student": [access for access, _ in students],
+            "faculty": [access for access, _ in faculty],
+        }
+        self.refresh = [refresh for _, refresh in students]
+
+
+# ─── Driver ────────────────────────────────────────────────
+async def drive(
+    client: httpx.AsyncClient, endpoint: Endpoint, data: SyntheticUniversity, actors: Actors,
+    requests: int, concurrency: int, rng: random.Random,
+) -> tuple[list[float], dict[int, int], float, list[tuple[int, float]]]:
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    db: list[tuple[int, float]] = []  # (queries, DB ms) per request, from Server-Timing
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            headers = {}
+            if endpoint.role == "refresh":
+                actor = rng.randrange(len(actors.refresh))
+                path, body = endpoint.build(rng, data, actor)
+                body = {"refresh_token": actors.refresh[actor]}
+            else:
+                pool = actors.tokens.get(endpoint.role, [None])
+                actor = rng.randrange(len(pool))
+                path, body = endpoint.build(rng, data, actor)
+                if pool[actor]:
+                    headers["Authorization"] = f"Bearer {pool[actor]}"
+            start = time.perf_counter()
+            resp = await client.request(endpoint.method, path, json=body, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+            if match := SERVER_TIMING_DB.search(resp.headers.get("server-timing", "")):
+                db.append((int(match["queries"]), float(match["dur"])))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - start, db
+
+
+async def run_endpoints(
+    client: httpx.AsyncClient, data: SyntheticUniversity, args, count_queries: bool,
+) -> dict[str, dict[str, Any]]:
+    actors = Actors()
+    await actors.login(client, data)
+    rng = random.Random(args.seed)
+    counter = QueryCounter()
+    results = {}
+    selected = [e for e in ENDPOINTS if not args.only or e.router in args.only or e.name in args.only]
+    print(f"{'endpoint':<34} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'q/req':>6} {'db ms':>7}  status")
+    for endpoint in selected:
+        requests = max(1, args.requests // 10) if endpoint.name == "login" else args.requests
+        await drive(client, endpoint, data, actors, min(10, requests), args.concurrency, rng)  # warm-up
+        with counter.track() if count_queries else nullcontext():
+            latencies, statuses, elapsed, db = await drive(
+                client, endpoint, data, actors, requests, args.concurrency, rng,
+            )
+        key = f"{endpoint.router}.{endpoint.name}"
+        if db:
+            queries = round(sum(n for n, _ in db) / len(db), 2)
+        else:
+            queries = round(counter.count / requests, 2) if count_queries else None
+        results[key] = {
+            "method": endpoint.method,
+            "requests": requests,
+            "throughput_rps": round(requests / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 0.50), 3),
+            "p95_ms": round(percentile(latencies, 0.95), 3),
+            "p99_ms": round(percentile(latencies, 0.99), 3),
+            "max_ms": round(max(latencies), 3),
+            "queries_per_request": queries,
+            "db_ms_avg": round(sum(ms for _, ms in db) / len(db), 3) if db else None,
+            "status_codes": {str(code): n for code, n in sorted(statuses.items())},
+        }
+        r = results[key]
+        queries = f"{queries:>6.1f}" if queries is not None else f"{'-':>6}"
+        db_ms = f"{r['db_ms_avg']:>7.2f}" if db else f"{'-':>7}"
+        print(f"{key:<34} {r['throughput_rps']:>8.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+              f"{r['p99_ms']:>8.2f} {queries} {db_ms}  {r['status_codes']}")
+    return results
+
+
+# ─── Modes ─────────────────────────────────────────────────
+async def run_in_process(data: SyntheticUniversity, args) -> dict[str, dict[str, Any]]:
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            return await run_endpoints(client, data, args, count_queries=True)
+
+
+async def run_workers(data: SyntheticUniversity, args) -> dict[str, dict[str, Any]]:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        env={**os.environ, "DATABASE_URL": DATABASE_URL},
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    if time.monotonic() > deadline:
+                        raise
+                await asyncio.sleep(0.2)
+            return await run_endpoints(client, data, args, count_queries=False)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def compare(results: dict[str, Any], baseline_path: str, threshold: float) -> int:
+    with open(baseline_path) as fh:
+        baseline = json.load(fh)["endpoints"]
+    regressions = 0
+    print(f"\nCompared with {baseline_path} (regression threshold {threshold:.0f}% on p95)")
+    print(f"{'endpoint':<34} {'p95 ms':>17} {'change':>8} {'req/s':>19}")
+    for key, r in results.items():
+        old = baseline.get(key)
+        if not old:
+            continue
+        change = (r["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0.0
+        flag = "  REGRESSION" if change > threshold else ""
+        regressions += bool(flag)
+        print(f"{key:<34} {old['p95_ms']:>7.2f} -> {r['p95_ms']:>7.2f} {change:>+7.1f}% "
+              f"{old['throughput_rps']:>8.1f} -> {r['throughput_rps']:>8.1f}{flag}")
+    return 1 if regressions else 0
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args) -> int:
+    data = SyntheticUniversity(
+        students=max(1, int(FULL_SIZE["students"] * args.scale)),
+        courses=max(1, int(FULL_SIZE["courses"] * args.scale)),
+        chat_messages=max(1, int(FULL_SIZE["chat_messages"] * args.scale)),
+        semesters=args.semesters, seed=args.seed,
+    )
+    rows = None
+    if not args.skip_seed:
+        await reset_schema()
+        start = time.perf_counter()
+        report = await generate(data)
+        elapsed = time.perf_counter() - start
+        rows = {table: n for table, (n, _) in report.items()}
+        total = sum(rows.values())
+        print(f"Seeded {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s): "
+              + ", ".join(f"{table}={n:,}" for table, n in rows.items()))
+    if args.workers:
+        from app.core.database import engine
+
+        await engine.dispose()  # release the seeding connections before the workers start
+        results = await run_workers(data, args)
+    else:
+        results = await run_in_process(data, args)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "database": DATABASE_URL.split(":", 1)[0],
+            "mode": f"workers={args.workers}" if args.workers else "in-process",
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "dataset": {**vars(data), "rows": rows},
+        },
+        "endpoints": results,
+    }
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\nWrote {args.output}")
+    if args.compare:
+        return compare(results, args.compare, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="fraction of the full dataset (50k students, 10M attendance rows)")
+    parser.add_argument("--semesters", type=int, default=2, help="terms of enrollment/result history")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse an already seeded database")
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint (login gets 1/10)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=0, help="run N uvicorn workers instead of in-process")
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--only", nargs="*", help="routers or endpoint names to run")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=20.0, help="p95 regression threshold in percent")
+    sys.exit(asyncio.run(main(parser.parse_args())))
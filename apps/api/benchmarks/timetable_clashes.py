@@ -0,0 +1,130 @@
+"""
+Benchmark: timetable clash detection, interval-index engine vs. a full scan.
+
+A synthetic university with --students students and --courses courses (two
+slots each, so 20k slots by default) is generated, then:
+
+  build    ClashEngine.load() from the database (slots, courses, enrollments)
+  check    "does this new slot clash?" for --checks random slots: the engine,
+           and a naive check that scans every slot and every enrollment
+  batch    validating a whole uploaded semester (--upload rows) in one pass
+
+The naive and engine answers are compared on every naive check.
+
+Run with: python -m benchmarks.timetable_clashes [--students 50000] [--courses 10000]
+          [--checks 2000] [--naive-checks 50] [--upload 10000]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import defaultdict
+
+from benchmarks.common import configure_database, reset_schema, timer
+
+configure_database()
+
+from sqlalchemy import select  # noqa: E402
+
+from app.academics.clashes import ClashEngine, Slot  # noqa: E402
+from app.academics.models import Course, DayOfWeek, Enrollment, Semester  # noqa: E402
+from app.academics.schemas import ClashKind  # noqa: E402
+from app.core.database import AsyncSessionLocal  # noqa: E402
+from app.seed import SyntheticUniversity, generate  # noqa: E402
+
+TEACHING_DAYS = [day for day in DayOfWeek if day != DayOfWeek.SATURDAY]
+
+
+def random_slot(rng: random.Random, course_ids: list[int], row: int | None = None) -> Slot:
+    hour, minute = rng.randint(8, 16), rng.choice((0, 30))
+    return Slot(rng.choice(course_ids), rng.choice(TEACHING_DAYS), hour * 3600 + minute * 60,
+                (hour + 1) * 3600 + minute * 60 - 600, f"L-{rng.randrange(1, 300):03d}", row=row)
+
+
+def naive_conflicts(slot: Slot, slots: list[Slot], enrollments: list[tuple[int, int]],
+                    courses: dict[int, tuple[int, Semester]]) -> set[tuple]:
+    """Scan every slot for overlaps, then every enrollment for shared students."""
+    faculty_id, semester = courses[slot.course_id]
+    overlapping = [
+        other for other in slots
+        if other.day == slot.day and other.start < slot.end and other.end > slot.start
+        and courses[other.course_id][1] == semester
+    ]
+    found = set()
+    for other in overlapping:
+        if other.room_key == slot.room_key:
+            found.add((ClashKind.ROOM, other.id, None))
+        if courses[other.course_id][0] == faculty_id:
+            found.add((ClashKind.FACULTY, other.id, None))
+    wanted = {other.course_id for other in overlapping} | {slot.course_id}
+    cohorts: dict[int, set[int]] = defaultdict(set)
+    for student_id, course_id in enrollments:
+        if course_id in wanted:
+            cohorts[course_id].add(student_id)
+    for other in overlapping:
+        if other.course_id != slot.course_id:
+            shared = len(cohorts[slot.course_id] & cohorts[other.course_id])
+            if shared:
+                found.add((ClashKind.STUDENTS, other.id, shared))
+    return found
+
+
+def as_set(clashes) -> set[tuple]:
+    return {(clash.kind, clash.slot.id, clash.shared_students) for clash in clashes}
+
+
+async def run(students: int, courses: int, checks: int, naive_checks: int, upload: int):
+    await reset_schema()
+    with timer() as t:
+        await generate(SyntheticUniversity(students=students, courses=courses, sessions=0, chat_messages=0))
+    print(f"generated {students} students, {courses} courses in {t['seconds']:.1f}s")
+
+    async with AsyncSessionLocal() as db:
+        with timer() as t:
+            engine = await ClashEngine.load(db)
+        slot_count = len(engine.slot_ids)
+        enrollments = list(await db.execute(select(Enrollment.student_id, Enrollment.course_id)))
+        course_ids = list((await db.execute(select(Course.id))).scalars())
+    slots = [slot for index in engine.courses.values() for slot in index.slots]
+    print(f"build    {slot_count} slots, {len(enrollments)} enrollments: {t['seconds'] * 1000:.0f} ms")
+
+    rng = random.Random(7)
+    probes = [random_slot(rng, course_ids) for _ in range(checks)]
+    samples, hits = [], 0
+    for probe in probes:
+        start = time.perf_counter()
+        clashes = engine.conflicts(probe)
+        samples.append(time.perf_counter() - start)
+        hits += bool(clashes)
+    engine_us = statistics.median(samples) * 1e6
+    print(f"check    engine: median {engine_us:.0f} us, p99 {sorted(samples)[int(len(samples) * 0.99)] * 1e6:.0f} us "
+          f"({hits}/{checks} clash)")
+
+    samples, mismatches = [], 0
+    for probe in probes[:naive_checks]:
+        start = time.perf_counter()
+        expected = naive_conflicts(probe, slots, enrollments, engine.cohorts.courses)
+        samples.append(time.perf_counter() - start)
+        mismatches += expected != as_set(engine.conflicts(probe))
+    naive_us = statistics.median(samples) * 1e6
+    print(f"check    naive:  median {naive_us / 1000:.1f} ms ({naive_us / engine_us:.0f}x slower), "
+          f"{'answers match' if not mismatches else f'{mismatches} MISMATCHES'} on {naive_checks} checks")
+
+    rows = [random_slot(rng, course_ids, row) for row in range(upload)]
+    with timer() as t:
+        report = engine.validate(rows)
+    print(f"batch    {upload} uploaded rows in one pass: {t['seconds'] * 1000:.0f} ms, "
+          f"{sum(1 for clashes in report if clashes)} rows clash "
+          f"(naive estimate {upload * naive_us / 1e6:.0f} s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=50_000)
+    parser.add_argument("--courses", type=int, default=10_000)
+    parser.add_argument("--checks", type=int, default=2000)
+    parser.add_argument("--naive-checks", type=int, default=50)
+    parser.add_argument("--upload", type=int, default=10_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.students, args.courses, args.checks, args.naive_checks, args.upload))
@@ -0,0 +1,219 @@
+"""
+Benchmark and check: generating a semester's timetable.
+
+A synthetic university supplies the users and a catalog of 2 x --courses
+courses (half of them in the fall). The fall enrollments are then replaced by
+cohort-structured ones: groups of 20-60 students of one department taking five
+of its courses together, plus an elective from anywhere for --electives of
+them. Rooms are sized from the course sizes, with about 30% spare room-periods.
+
+1. POST /academics/timetable/generate for the fall semester, replacing the
+   seeded slots, and poll the job until it finishes (must take < --limit s).
+2. Every course has its sessions on different days, in rooms that seat it; the
+   clash engine finds no room or faculty clash in the result, and the student
+   clashes it finds add up to what the job reported.
+3. Keeping slots: the slots of --unscheduled courses are deleted and generated
+   again around the rest (replace_existing off); still no room or faculty clash.
+
+Exits non-zero if any check fails.
+
+Run with: python -m benchmarks.timetable_generator [--courses 3000] [--students 30000]
+          [--electives 0.05] [--limit 60]
+"""
+import argparse
+import asyncio
+import math
+import random
+import sys
+import time
+from collections import defaultdict
+
+from benchmarks.common import configure_database, reset_schema, timer
+
+configure_database()
+
+import httpx  # noqa: E402
+from sqlalchemy import delete, func, select  # noqa: E402
+
+from app.academics.clashes import ClashEngine, Slot  # noqa: E402
+from app.academics.models import Course, Enrollment, Semester, TimetableSlot  # noqa: E402
+from app.academics.schemas import ClashKind  # noqa: E402
+from app.core.database import AsyncSessionLocal  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.seed import BulkWriter, SyntheticUniversity, generate  # noqa: E402
+from app.users.models import User, UserRole  # noqa: E402
+from main import app  # noqa: E402
+
+GENERATE = "/api/v1/academics/timetable/generate"
+PERIODS_PER_WEEK = 5 * 9
+
+results: list[tuple[str, bool]] = []
+
+
+def check(name: str, ok: bool):
+    results.append((name, ok))
+    print(f"{'PASS' if ok else 'FAIL'}  {name}")
+
+
+async def cohort_enrollments(students: int, electives: float, seed: int = 7) -> dict[int, int]:
+    """Replace the fall enrollments with cohorts; returns students per fall course."""
+    rng = random.Random(seed)
+    async with AsyncSessionLocal() as db:
+        courses = (await db.execute(
+            select(Course.id, Course.department).where(Course.semester == Semester.FALL)
+        )).all()
+        student_ids = list((await db.execute(select(User.id).where(User.role == UserRole.STUDENT))).scalars())
+        await db.execute(delete(Enrollment))
+        await db.commit()
+    by_department = defaultdict(list)
+    for course_id, department in courses:
+        by_department[department].append(course_id)
+    everything = [course_id for course_id, _ in courses]
+
+    rows, sizes, next_student = [], defaultdict(int), 0
+    departments = list(by_department.values())
+    while next_student < min(students, len(student_ids)):
+        pool = departments[next_student % len(departments)]
+        picks = rng.sample(pool, min(5, len(pool)))
+        for student_id in student_ids[next_student:next_student + rng.randint(20, 60)]:
+            taken = picks + ([rng.choice(everything)] if rng.random() < electives else [])
+            for course_id in set(taken):
+                rows.append({"student_id": student_id, "course_id": course_id})
+                sizes[course_id] += 1
+            next_student += 1
+    await BulkWriter().write(Enrollment, rows)
+    return sizes
+
+
+def teaching_rooms(session_sizes: list[int], spare: float = 1.3) -> list[dict]:
+    """
+    Rooms for every session with `spare` room-periods: the sessions sorted by
+    size are split into one run per room, and each room seats the largest
+    session of its run.
+    """
+    ordered = sorted(session_sizes) or [30]
+    count = math.ceil(len(ordered) * spare / PERIODS_PER_WEEK)
+    capacities = [ordered[min(len(ordered), math.ceil((j + 1) / count * len(ordered))) - 1] for j in range(count)]
+    return [{"name": f"LH-{j:03d}", "capacity": max(10, math.ceil(c / 10) * 10)} for j, c in enumerate(capacities)]
+
+
+async def run_job(client: httpx.AsyncClient, headers: dict, payload: dict) -> tuple[dict, float]:
+    start = time.perf_counter()
+    response = await client.post(GENERATE, json=payload, headers=headers)
+    response.raise_for_status()
+    job, seen = response.json(), None
+    while job["status"] == "running":
+        await asyncio.sleep(0.2)
+        job = (await client.get(f"/api/v1/academics/timetable/jobs/{job['id']}", headers=headers)).json()
+        if (job["phase"], job["detail"].get("departments_done")) != seen:
+            seen = job["phase"], job["detail"].get("departments_done")
+            print(f"  {time.perf_counter() - start:6.1f}s  {job['phase']:<10} {job['progress']:.0%}")
+    return job, time.perf_counter() - start
+
+
+async def verify(name: str, expected_clashes: int | None) -> None:
+    """Hard constraints and reported student clashes, checked with the clash engine on the saved slots."""
+    async with AsyncSessionLocal() as db:
+        cohorts = (await ClashEngine.load(db)).cohorts
+        slots = [Slot.of(row) for row in await db.execute(
+            select(TimetableSlot.id, TimetableSlot.course_id, TimetableSlot.day, TimetableSlot.start_time,
+                   TimetableSlot.end_time, TimetableSlot.room)
+            .join(Course, Course.id == TimetableSlot.course_id).where(Course.semester == Semester.FALL)
+        )]
+        credits = dict((await db.execute(select(Course.id, Course.credits).where(Course.semester == Semester.FALL))).all())
+    with timer() as t:
+        report = ClashEngine(cohorts).validate(slots)
+    kinds = defaultdict(int)
+    students = 0
+    for clashes in report:
+        for clash in clashes:
+            kinds[clash.kind] += 1
+            students += clash.shared_students or 0
+    print(f"  {len(slots)} slots validated in {t['seconds'] * 1000:.0f} ms: {dict(kinds) or 'no clashes'}")
+    check(f"{name}: no room or faculty clash", not kinds[ClashKind.ROOM] and not kinds[ClashKind.FACULTY])
+    if expected_clashes is not None:
+        check(f"{name}: student clashes match the job's report ({students})", students == expected_clashes)
+
+    days = defaultdict(list)
+    for slot in slots:
+        days[slot.course_id].append(slot.day)
+    check(f"{name}: every course has min(credits, 5) sessions on different days", all(
+        len(days[course_id]) == min(count, 5) and len(set(days[course_id])) == len(days[course_id])
+        for course_id, count in credits.items()
+    ))
+
+
+async def run(courses: int, students: int, electives: float, limit: float, unscheduled: int) -> int:
+    await reset_schema()
+    with timer() as t:
+        await generate(SyntheticUniversity(students=students, courses=2 * courses, sessions=0, chat_messages=0,
+                                           housed_fraction=0))
+        sizes = await cohort_enrollments(students, electives)
+    async with AsyncSessionLocal() as db:
+        fall = dict((await db.execute(select(Course.id, Course.credits).where(Course.semester == Semester.FALL))).all())
+        admin_id = (await db.execute(select(User.id).where(User.role == UserRole.ADMIN).limit(1))).scalar_one()
+    session_sizes = [sizes.get(course_id, 0) for course_id, credits in fall.items() for _ in range(min(credits, 5))]
+    sessions = len(session_sizes)
+    rooms = teaching_rooms(session_sizes)
+    print(f"generated {len(fall)} fall courses ({sessions} sessions), {sum(sizes.values())} fall enrollments, "
+          f"{len(rooms)} rooms in {t['seconds']:.1f}s")
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(admin_id)})}"}
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=transport, base_url="http://timetable-generator", timeout=limit * 2
+    ) as client:
+        payload = {"semester": "fall", "rooms": rooms, "replace_existing": True}
+        job, seconds = await run_job(client, headers, payload)
+        print(f"  result: { {k: v for k, v in (job['result'] or {}).items() if k != 'unplaced'} }")
+        check(f"generated the fall timetable in {seconds:.1f}s (limit {limit:.0f}s)",
+              job["status"] == "succeeded" and seconds < limit)
+        if job["status"] != "succeeded":
+            print(f"  error: {job['error']}")
+            return 1
+        check("every session placed", not job["result"]["unplaced"])
+        await verify("replace", job["result"]["student_clashes"])
+        async with AsyncSessionLocal() as db:
+            before_preview = (await db.execute(select(func.count(TimetableSlot.id)))).scalar_one()
+
+        preview = payload | {"dry_run": True}
+        first = await client.post(GENERATE, json=preview, headers=headers)
+        second = await client.post(GENERATE, json=preview, headers=headers)
+        check("a second run for the same semester is refused while one is running",
+              first.status_code == 202 and second.status_code == 409)
+        job = first.json()
+        while job["status"] == "running":
+            await asyncio.sleep(0.2)
+            job = (await client.get(f"/api/v1/academics/timetable/jobs/{job['id']}", headers=headers)).json()
+        async with AsyncSessionLocal() as db:
+            saved = (await db.execute(select(func.count(TimetableSlot.id)))).scalar_one()
+        check("a dry run returns the slots and saves nothing",
+              job["status"] == "succeeded" and len(job["result"]["slots"]) == sessions
+              and saved == before_preview)
+
+        async with AsyncSessionLocal() as db:
+            dropped = list(random.Random(3).sample(sorted(fall), unscheduled))
+            await db.execute(delete(TimetableSlot).where(TimetableSlot.course_id.in_(dropped)))
+            await db.commit()
+        job, seconds = await run_job(client, headers, {"semester": "fall", "rooms": rooms})
+        async with AsyncSessionLocal() as db:
+            rescheduled = (await db.execute(
+                select(func.count(func.distinct(TimetableSlot.course_id))).where(TimetableSlot.course_id.in_(dropped))
+            )).scalar_one()
+        check(f"{unscheduled} unscheduled courses placed around the kept slots in {seconds:.1f}s",
+              job["status"] == "succeeded" and job["result"]["courses"] == unscheduled
+              and rescheduled == unscheduled)
+        await verify("keep", None)
+
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=3000)
+    parser.add_argument("--students", type=int, default=30_000)
+    parser.add_argument("--electives", type=float, default=0.05)
+    parser.add_argument("--limit", type=float, default=60.0)
+    parser.add_argument("--unscheduled", type=int, default=100)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.courses, args.students, args.electives, args.limit, args.unscheduled)))
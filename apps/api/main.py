@@ -5,13 +5,25 @@ Assembles all routers, middleware, and lifecycle events.
 """
 import logging
 from contextlib import asynccontextmanager
+from functools import partial
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from app.core.cache import principal_cache, recent_writers, table_versions
 from app.core.config import get_settings
-from app.core.database import engine, Base
+from app.core.database import AsyncSessionLocal, engine
+from app.core.deps import principal_query
+from app.core.instrumentation import QueryTimingMiddleware, instrument_engine
+from app.core.jobs import jobs, solver_pool
+from app.core.replicas import replica_router
+from app.core.response_cache import response_cache
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.security import hasher, token_cache
+from app.core.serialization import default_response_class
+from app.core.startup import prepare_database
+from app.communication.service import manager as chat_manager, message_writer
 
 # Import all models so Alembic / create_all can see them
 from app.users import models as _user_models  # noqa: F401
@@ -26,20 +38,49 @@ from app.academics.router import router as academics_router
 from app.housing.router import router as housing_router
 from app.communication.router import router as communication_router
 
+# Services whose queries are pre-compiled at startup
+from app.academics import service as academics_service
+from app.communication import service as communication_service
+from app.housing import service as housing_service
+from app.users import service as users_service
+
 settings = get_settings()
 logger = logging.getLogger("ums")
 
+# Run once per worker before serving (STARTUP_WARM_STATEMENTS). Id 0 matches no
+# row, so these stay cheap on any dataset while still compiling the SQL.
+HOT_STATEMENTS = [
+    lambda db: db.execute(principal_query(0)),
+    partial(academics_service.list_courses, limit=1),
+    partial(academics_service.get_student_courses, student_id=0),
+    partial(academics_service.get_attendance_summary, student_id=0),
+    partial(academics_service.get_student_results, student_id=0),
+    partial(academics_service.get_timetable, student_id=0),
+    partial(housing_service.list_rooms, limit=1),
+    partial(housing_service.get_student_room, student_id=0),
+    partial(communication_service.get_user_rooms, user_id=0),
+    partial(communication_service.get_leaves, user_id=0, limit=1),
+    partial(users_service.list_users, limit=1),
+]
 
 
 # ─── Lifecycle ─────────────────────────────────────────────
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Create tables on startup (dev convenience). Use Alembic in production."""
+    """Prepare the database (see STARTUP_SCHEMA_MODE) and warm the pool before serving."""
     logger.info("🚀 Starting UMS API v%s", settings.APP_VERSION)
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    logger.info("✅ Database tables ensured")
+    await prepare_database(engine, AsyncSessionLocal, HOT_STATEMENTS)
     yield
+    await chat_manager.close()
+    await message_writer.close()
+    await jobs.close()
+    solver_pool.shutdown()
+    hasher.shutdown()
+    await principal_cache.close()
+    await recent_writers.close()
+    await table_versions.close()
+    await response_cache.close()
+    await replica_router.close()
     await engine.dispose()
     logger.info("🛑 UMS API shut down")
 
@@ -52,9 +93,18 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     lifespan=lifespan,
+    default_response_class=default_response_class(),
 )
 
 # ─── Middleware ────────────────────────────────────────────
+if settings.QUERY_TIMING_ENABLED:
+    instrument_engine(engine.sync_engine)
+    for replica in replica_router.replicas:
+        instrument_engine(replica.engine.sync_engine)
+    app.add_middleware(QueryTimingMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     # allow_origins=settings.CORS_ORIGINS,
@@ -82,9 +132,59 @@ async def health_check():
         "status": "healthy",
         "version": settings.APP_VERSION,
         "service": settings.APP_NAME,
+        "hashing": hasher.stats(),
+        "principal_cache": principal_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "chat_writer": message_writer.stats(),
+        "read_replicas": replica_router.stats(),
+        "table_versions": table_versions.stats(),
+        "response_cache": response_cache.stats(),
+        "jobs": jobs.stats(),
     }
 
 
+# ─── Metrics ───────────────────────────────────────────────
+def _pool_connections() -> dict[tuple, float]:
+    pool = engine.sync_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {}
+    return {
+        ("size",): pool.size(),
+        ("checked_out",): pool.checkedout(),
+        ("overflow",): max(0, pool.overflow()),
+    }
+
+
+registry.gauge(
+    "ums_db_pool_connections", "Database pool size and connections in use.", ("state",),
+    collect=_pool_connections,
+)
+registry.gauge(
+    "ums_db_replica_lag_seconds", "Last measured replication lag per read replica.", ("replica",),
+    collect=lambda: {(replica.name,): replica.lag for replica in replica_router.replicas},
+)
+registry.gauge(
+    "ums_ws_connections", "Open chat WebSocket connections per room on this worker.", ("room",),
+    collect=lambda: {(room,): len(conns) for room, conns in chat_manager.active_connections.items()},
+)
+registry.gauge(
+    "ums_password_hash_queue_depth", "Hashing requests waiting for a worker.",
+    collect=lambda: {(): hasher.queue_depth},
+)
+registry.gauge(
+    "ums_chat_write_buffered", "Chat messages waiting to be persisted.",
+    collect=lambda: {(): message_writer.stats()["buffered"]},
+)
+
+
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+if settings.METRICS_ENABLED:
+    app.add_api_route("/metrics", metrics, methods=["GET"], tags=["System"], include_in_schema=False)
+
+
 # ─── Register Routers ─────────────────────────────────────
 app.include_router(auth_router, prefix=settings.API_PREFIX)
 app.include_router(users_router, prefix=settings.API_PREFIX)